@@ -1,7 +1,7 @@
 import { useState, useMemo } from 'react';
 import { Trash2, Download } from 'lucide-react';
-import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query';
-import { api } from '../utils/api';
+import { useQuery, useInfiniteQuery, useMutation, useQueryClient } from '@tanstack/react-query';
+import { api, getAllPages, getPage } from '../utils/api';
 import type { User, Absence, ApproveRejectRequest, AdminCreateAbsenceRequest, UpdateAbsenceRequest } from '../types/api';
 import BulkAbsenceModal from '../components/BulkAbsenceModal';
 
@@ -29,6 +29,58 @@ const STATUS_NAMES_NL: Record<string, string> = {
   rejected: 'Afgewezen',
 };
 
+const formatDate = (d: Date) =>
+  `${d.getFullYear()}-${String(d.getMonth() + 1).padStart(2, '0')}-${String(d.getDate()).padStart(2, '0')}`;
+
+// [from, to] of a date range filter as YYYY-MM-DD (undefined = open)
+function dateRangeBounds(range: string, customStart: string, customEnd: string): [string?, string?] {
+  const now = new Date();
+  const year = now.getFullYear();
+  const month = now.getMonth();
+
+  switch (range) {
+    case 'this-month':
+      return [formatDate(new Date(year, month, 1)), formatDate(new Date(year, month + 1, 0))];
+    case 'last-month':
+      return [formatDate(new Date(year, month - 1, 1)), formatDate(new Date(year, month, 0))];
+    case 'this-year':
+      return [formatDate(new Date(year, 0, 1)), formatDate(new Date(year, 11, 31))];
+    case 'custom':
+      return [customStart || undefined, customEnd || undefined];
+    default:
+      return [undefined, undefined];
+  }
+}
+
+function inDateRange(a: Absence, range: string, customStart: string, customEnd: string): boolean {
+  const now = new Date();
+  const currentYear = now.getFullYear();
+  const currentMonth = now.getMonth();
+  const absenceStart = new Date(a.start_date);
+  const absenceEnd = a.end_date ? new Date(a.end_date) : absenceStart;
+
+  switch (range) {
+    case 'this-month':
+      return absenceStart.getFullYear() === currentYear && absenceStart.getMonth() === currentMonth;
+    case 'last-month': {
+      const lastMonth = new Date(currentYear, currentMonth - 1);
+      return absenceStart.getFullYear() === lastMonth.getFullYear() && absenceStart.getMonth() === lastMonth.getMonth();
+    }
+    case 'this-year':
+      return absenceStart.getFullYear() === currentYear;
+    case 'custom': {
+      if (!customStart && !customEnd) return true;
+      const filterStart = customStart ? new Date(customStart) : null;
+      const filterEnd = customEnd ? new Date(customEnd) : null;
+      if (filterStart && absenceEnd < filterStart) return false;
+      if (filterEnd && absenceStart > filterEnd) return false;
+      return true;
+    }
+    default:
+      return true;
+  }
+}
+
 export default function AbsenceManagement() {
   const [selectedEmployee, setSelectedEmployee] = useState<number | 'all'>('all');
   const [selectedType, setSelectedType] = useState<string>('all');
@@ -55,69 +107,34 @@ export default function AbsenceManagement() {
     },
   });
 
-  // Fetch all absences in a single bulk query
-  const { data: allAbsences = [], isLoading } = useQuery({
-    queryKey: ['absences', 'all'],
-    queryFn: async () => {
-      const response = await api.get<Absence[]>('/api/absences/all');
-      return response.data;
-    },
+  // Employee, type, status and an overlapping date range are filtered by the backend
+  const serverFilters = useMemo(() => {
+    const params: Record<string, string | number> = {};
+    if (selectedEmployee !== 'all') params.user_id = selectedEmployee;
+    if (selectedType !== 'all') params.type = selectedType;
+    if (selectedStatus !== 'all') params.status = selectedStatus;
+
+    const [from, to] = dateRangeBounds(selectedDateRange, customStartDate, customEndDate);
+    if (from) params.from = from;
+    if (to) params.to = to;
+    return params;
+  }, [selectedEmployee, selectedType, selectedStatus, selectedDateRange, customStartDate, customEndDate]);
+
+  // Fetch the matching absences, one page at a time (newest first)
+  const { data, isLoading, hasNextPage, fetchNextPage, isFetchingNextPage } = useInfiniteQuery({
+    queryKey: ['absences', 'all', serverFilters],
+    queryFn: ({ pageParam }) => getPage<Absence>('/api/absences/all', { params: serverFilters }, pageParam),
+    initialPageParam: undefined as string | undefined,
+    getNextPageParam: (lastPage) => lastPage.nextCursor,
   });
 
-  // Filter absences based on selected filters
-  const filteredAbsences = useMemo(() => {
-    let filtered = [...allAbsences];
-
-    // Employee filter
-    if (selectedEmployee !== 'all') {
-      filtered = filtered.filter(a => a.user_id === selectedEmployee);
-    }
-
-    // Type filter
-    if (selectedType !== 'all') {
-      filtered = filtered.filter(a => a.type === selectedType);
-    }
-
-    // Status filter
-    if (selectedStatus !== 'all') {
-      filtered = filtered.filter(a => a.status === selectedStatus);
-    }
-
-    // Date range filter
-    if (selectedDateRange !== 'all') {
-      const now = new Date();
-      const currentYear = now.getFullYear();
-      const currentMonth = now.getMonth();
-
-      filtered = filtered.filter(a => {
-        const absenceStart = new Date(a.start_date);
-        const absenceEnd = a.end_date ? new Date(a.end_date) : absenceStart;
-
-        switch (selectedDateRange) {
-          case 'this-month':
-            return absenceStart.getFullYear() === currentYear && absenceStart.getMonth() === currentMonth;
-          case 'last-month': {
-            const lastMonth = new Date(currentYear, currentMonth - 1);
-            return absenceStart.getFullYear() === lastMonth.getFullYear() && absenceStart.getMonth() === lastMonth.getMonth();
-          }
-          case 'this-year':
-            return absenceStart.getFullYear() === currentYear;
-          case 'custom': {
-            if (!customStartDate && !customEndDate) return true;
-            const filterStart = customStartDate ? new Date(customStartDate) : null;
-            const filterEnd = customEndDate ? new Date(customEndDate) : null;
-            if (filterStart && absenceEnd < filterStart) return false;
-            if (filterEnd && absenceStart > filterEnd) return false;
-            return true;
-          }
-          default:
-            return true;
-        }
-      });
-    }
-
-    return filtered;
-  }, [allAbsences, selectedEmployee, selectedType, selectedStatus, selectedDateRange, customStartDate, customEndDate]);
+  // The month/year ranges match on the start date, which the backend's overlap filter doesn't
+  const filteredAbsences = useMemo(
+    () => (data?.pages.flatMap((page) => page.rows) ?? []).filter((a) =>
+      inDateRange(a, selectedDateRange, customStartDate, customEndDate)
+    ),
+    [data, selectedDateRange, customStartDate, customEndDate]
+  );
 
   // Group absences by employee — only include employees who have matching absences
   const absencesByEmployee = useMemo(() => {
@@ -149,13 +166,17 @@ export default function AbsenceManagement() {
     setExpandedEmployees(newExpanded);
   };
 
-  const downloadCSV = () => {
-    if (filteredAbsences.length === 0) {
+  const downloadCSV = async () => {
+    // Every matching absence, not only the pages loaded so far
+    const matching = (await getAllPages<Absence>('/api/absences/all', { params: serverFilters })).filter((a) =>
+      inDateRange(a, selectedDateRange, customStartDate, customEndDate)
+    );
+    if (matching.length === 0) {
       alert('Geen gegevens om te exporteren');
       return;
     }
 
-    const rows = filteredAbsences.map(absence => {
+    const rows = matching.map(absence => {
       const employee = users.find(u => u.id === absence.user_id);
       return {
         'Medewerker': employee?.username || absence.username || '',
@@ -347,6 +368,15 @@ export default function AbsenceManagement() {
             />
           ))
         )}
+        {hasNextPage && (
+          <button
+            onClick={() => fetchNextPage()}
+            disabled={isFetchingNextPage}
+            className="w-full py-3 bg-neutral-800 hover:bg-neutral-700 disabled:opacity-50 text-white rounded-lg transition"
+          >
+            {isFetchingNextPage ? 'Laden...' : 'Meer laden'}
+          </button>
+        )}
       </div>
 
       {/* Modals */}
@@ -1,7 +1,7 @@
 import { useState, useEffect } from 'react';
 import { Trash2 } from 'lucide-react';
 import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query';
-import { api } from '../utils/api';
+import { api, getAllPages } from '../utils/api';
 import type { CalendarEvent, CompanyHoliday, EventCategory, CreateCategoryRequest, CreateEventRequest, CreateHolidayRequest, User } from '../types/api';
 import BulkAbsenceModal from '../components/BulkAbsenceModal';
 
@@ -18,20 +18,28 @@ export default function Calendar() {
   const [showCategories, setShowCategories] = useState(false);
   const [showBulkAbsenceModal, setShowBulkAbsenceModal] = useState(false);
 
+  // Only the events of the month on screen
+  const formatDate = (d: Date) =>
+    `${d.getFullYear()}-${String(d.getMonth() + 1).padStart(2, '0')}-${String(d.getDate()).padStart(2, '0')}`;
+  const monthFrom = formatDate(new Date(currentMonth.getFullYear(), currentMonth.getMonth(), 1));
+  const monthTo = formatDate(new Date(currentMonth.getFullYear(), currentMonth.getMonth() + 1, 0));
+
   // Fetch data
   const { data: events = [] } = useQuery({
-    queryKey: ['calendar', 'events'],
+    queryKey: ['calendar', 'events', monthFrom, monthTo],
     queryFn: async () => {
-      const response = await api.get<CalendarEvent[]>('/api/calendar/events');
-      return response.data;
+      return getAllPages<CalendarEvent>('/api/calendar/events', {
+        params: { from: monthFrom, to: monthTo },
+      });
     },
   });
 
   const { data: holidays = [] } = useQuery({
-    queryKey: ['calendar', 'holidays'],
+    queryKey: ['calendar', 'holidays', monthFrom, monthTo],
     queryFn: async () => {
-      const response = await api.get<CompanyHoliday[]>('/api/calendar/holidays');
-      return response.data;
+      return getAllPages<CompanyHoliday>('/api/calendar/holidays', {
+        params: { from: monthFrom, to: monthTo },
+      });
     },
   });
 
@@ -1,8 +1,9 @@
-import { useState } from 'react';
-import { useQuery } from '@tanstack/react-query';
+import { useEffect, useState } from 'react';
+import { useQuery, useQueryClient } from '@tanstack/react-query';
 import { useNavigate } from 'react-router-dom';
 import { Users, CheckCircle, Activity, AlertTriangle, CircleDot, Circle, Car, Home as HomeIcon, ChevronDown, ChevronRight } from 'lucide-react';
 import { api } from '../utils/api';
+import { applyTodayStatusDelta, followTodayStatus } from '../utils/todayStatusStream';
 import type { TodayStatus, Absence } from '../types/api';
 
 const TYPE_COLORS = {
@@ -22,6 +23,8 @@ export default function Dashboard() {
   const [showClockedIn, setShowClockedIn] = useState(true);
   const [showOnLeave, setShowOnLeave] = useState(true);
   const [showMissing, setShowMissing] = useState(false);
+  const [streaming, setStreaming] = useState(false);
+  const queryClient = useQueryClient();
 
   // Fetch today's status
   const { data, isLoading } = useQuery({
@@ -30,9 +33,37 @@ export default function Dashboard() {
       const response = await api.get<TodayStatus>('/api/reports/today-status');
       return response.data;
     },
-    refetchInterval: 60000, // Refresh every minute
+    refetchInterval: streaming ? false : 60000, // Refresh every minute while the live stream is down
   });
 
+  // Live updates of today's status; polling takes over while the stream is down
+  useEffect(() => {
+    let stop = () => {};
+    let retry: ReturnType<typeof setTimeout> | undefined;
+    const connect = () => {
+      stop = followTodayStatus({
+        onSnapshot: (status) => {
+          setStreaming(true);
+          queryClient.setQueryData(['today-status'], status);
+        },
+        onDelta: (delta) => {
+          queryClient.setQueryData<TodayStatus>(['today-status'], (status) =>
+            status ? applyTodayStatusDelta(status, delta) : status
+          );
+        },
+        onClosed: () => {
+          setStreaming(false);
+          retry = setTimeout(connect, 30000);
+        },
+      });
+    };
+    connect();
+    return () => {
+      clearTimeout(retry);
+      stop();
+    };
+  }, [queryClient]);
+
   // Fetch pending absences
   const { data: pendingAbsences = [] } = useQuery({
     queryKey: ['absences', 'pending'],
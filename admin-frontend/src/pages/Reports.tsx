@@ -24,7 +24,7 @@ export default function Reports() {
     queryKey: ['balances', 'all', year, month],
     queryFn: async () => {
       const response = await api.get<BalanceResponse>('/api/reports/balance/all', {
-        params: { start_date: startDate, end_date: endDate },
+        params: { start_date: startDate, end_date: endDate, detail: 'none' },
       });
       return response.data.employees || [];
     },
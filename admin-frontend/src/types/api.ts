@@ -104,6 +104,7 @@ export interface EmployeeBalance {
 
 export interface TodayStatus {
   date: string;
+  generation: number;
   stats: {
     total_employees: number;
     clocked_in: number;
@@ -135,6 +136,20 @@ export interface TodayStatus {
   }>;
 }
 
+export type TodayStatusCategory = 'clocked_in' | 'on_leave' | 'expected_missing';
+
+// One event of /api/reports/today-status/stream after the snapshot
+export interface TodayStatusDelta {
+  date: string;
+  generation: number;
+  stats: TodayStatus['stats'];
+  changes: Array<{
+    user_id: number;
+    category: TodayStatusCategory | null;
+    entry: TodayStatus[TodayStatusCategory][number] | null;
+  }>;
+}
+
 export interface EventCategory {
   id: number;
   name: string;
@@ -1,4 +1,4 @@
-import axios from 'axios';
+import axios, { type AxiosRequestConfig } from 'axios';
 
 const API_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000';
 
@@ -27,4 +27,29 @@ api.interceptors.response.use(
     }
     return Promise.reject(error);
   }
-);
\ No newline at end of file
+);
+
+// One page of a paged list endpoint plus the cursor of the next page
+// (undefined on the last page), for lists with a "load more" button
+export async function getPage<T>(
+  url: string,
+  config: AxiosRequestConfig = {},
+  cursor?: string
+): Promise<{ rows: T[]; nextCursor?: string }> {
+  const response = await api.get<T[]>(url, { ...config, params: { ...config.params, cursor } });
+  return { rows: response.data, nextCursor: response.headers['x-next-cursor'] };
+}
+
+// Every row of a paged list endpoint: follows the X-Next-Cursor header from
+// page to page (each response is at most one page, see backend README).
+// Only for queries bounded by a from/to range, never for a whole history.
+export async function getAllPages<T>(url: string, config: AxiosRequestConfig = {}): Promise<T[]> {
+  const rows: T[] = [];
+  let cursor: string | undefined;
+  do {
+    const response = await api.get<T[]>(url, { ...config, params: { ...config.params, cursor } });
+    rows.push(...response.data);
+    cursor = response.headers['x-next-cursor'];
+  } while (cursor);
+  return rows;
+}
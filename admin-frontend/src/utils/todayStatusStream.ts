@@ -0,0 +1,73 @@
+import type { TodayStatus, TodayStatusCategory, TodayStatusDelta } from '../types/api';
+
+const API_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000';
+const CATEGORIES: TodayStatusCategory[] = ['clocked_in', 'on_leave', 'expected_missing'];
+
+// Applies a delta to the status it follows (lists stay ordered by user id)
+export function applyTodayStatusDelta(status: TodayStatus, delta: TodayStatusDelta): TodayStatus {
+  const next = { ...status, date: delta.date, generation: delta.generation, stats: delta.stats };
+  for (const category of CATEGORIES) {
+    next[category] = status[category].filter(
+      (entry) => !delta.changes.some((change) => change.user_id === entry.user_id)
+    ) as never;
+  }
+  for (const change of delta.changes) {
+    if (change.category && change.entry) {
+      const list = [...next[change.category], change.entry] as TodayStatus[TodayStatusCategory];
+      list.sort((a, b) => a.user_id - b.user_id);
+      next[change.category] = list as never;
+    }
+  }
+  return next;
+}
+
+// Follows /api/reports/today-status/stream until stop() is called. EventSource
+// cannot send the Authorization header, so the stream is read with fetch.
+// onClosed() reports a stream that failed or ended; the caller falls back to polling.
+export function followTodayStatus(handlers: {
+  onSnapshot: (status: TodayStatus) => void;
+  onDelta: (delta: TodayStatusDelta) => void;
+  onClosed: () => void;
+}): () => void {
+  const controller = new AbortController();
+
+  (async () => {
+    const response = await fetch(`${API_URL}/api/reports/today-status/stream`, {
+      headers: { Authorization: `Bearer ${localStorage.getItem('token')}` },
+      signal: controller.signal,
+    });
+    if (!response.ok || !response.body) {
+      throw new Error(`Stream unavailable (${response.status})`);
+    }
+
+    const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+    let buffer = '';
+    for (;;) {
+      const { value, done } = await reader.read();
+      if (done) break;
+      buffer += value;
+
+      let end;
+      while ((end = buffer.indexOf('\n\n')) !== -1) {
+        const message = buffer.slice(0, end);
+        buffer = buffer.slice(end + 2);
+
+        let event = 'message';
+        let data = '';
+        for (const line of message.split('\n')) {
+          if (line.startsWith('event: ')) event = line.slice(7);
+          else if (line.startsWith('data: ')) data += line.slice(6);
+        }
+        if (event === 'snapshot') handlers.onSnapshot(JSON.parse(data));
+        else if (event === 'delta') handlers.onDelta(JSON.parse(data));
+        // Comments (heartbeats) only keep the connection open
+      }
+    }
+  })()
+    .catch(() => undefined)
+    .finally(() => {
+      if (!controller.signal.aborted) handlers.onClosed();
+    });
+
+  return () => controller.abort();
+}
@@ -1,8 +1,6 @@
 from logging.config import fileConfig
-from sqlalchemy import engine_from_config
-from sqlalchemy import pool
 from alembic import context
-from app.database import Base  # Import your Base
+from app.database import Base, DATABASE_URL, create_db_engine  # Import your Base
 from app.models import *  # Import all models
 
 # this is the Alembic Config object
@@ -15,8 +13,9 @@ if config.config_file_name is not None:
 # Set target_metadata to your Base metadata
 target_metadata = Base.metadata
 
+# The database comes from the app settings (DATABASE_URL in .env), not alembic.ini
 def run_migrations_offline() -> None:
-    url = config.get_main_option("sqlalchemy.url")
+    url = DATABASE_URL
     context.configure(
         url=url,
         target_metadata=target_metadata,
@@ -28,11 +27,8 @@ def run_migrations_offline() -> None:
         context.run_migrations()
 
 def run_migrations_online() -> None:
-    connectable = engine_from_config(
-        config.get_section(config.config_ini_section, {}),
-        prefix="sqlalchemy.",
-        poolclass=pool.NullPool,
-    )
+    # Same engine profile as the app (pragmas etc.), without a connection pool
+    connectable = create_db_engine(DATABASE_URL, pooled=False)
 
     with connectable.connect() as connection:
         context.configure(
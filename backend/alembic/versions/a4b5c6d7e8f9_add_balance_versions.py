@@ -0,0 +1,37 @@
+"""Add balance_versions table for balance cache invalidation
+
+Revision ID: a4b5c6d7e8f9
+Revises: f3a4b5c6d7e8
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+revision: str = 'a4b5c6d7e8f9'
+down_revision: Union[str, Sequence[str], None] = 'f3a4b5c6d7e8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _table_exists(name: str) -> bool:
+    bind = op.get_bind()
+    return inspect(bind).has_table(name)
+
+
+def upgrade() -> None:
+    # Missing rows count as version 0
+    if not _table_exists('balance_versions'):
+        op.create_table(
+            'balance_versions',
+            sa.Column('user_id', sa.Integer(), primary_key=True, autoincrement=False),
+            sa.Column('version', sa.Integer(), nullable=False, server_default='0'),
+        )
+
+
+def downgrade() -> None:
+    if _table_exists('balance_versions'):
+        op.drop_table('balance_versions')
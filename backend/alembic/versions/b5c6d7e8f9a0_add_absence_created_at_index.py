@@ -0,0 +1,33 @@
+"""Add composite (created_at, id) index on absences
+
+Revision ID: b5c6d7e8f9a0
+Revises: a4b5c6d7e8f9
+Create Date: 2026-10-17 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+from sqlalchemy import inspect
+
+revision: str = 'b5c6d7e8f9a0'
+down_revision: Union[str, Sequence[str], None] = 'a4b5c6d7e8f9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEX_NAME = 'ix_absences_created_at_id'
+
+
+def _index_exists(table: str, name: str) -> bool:
+    bind = op.get_bind()
+    return any(index['name'] == name for index in inspect(bind).get_indexes(table))
+
+
+def upgrade() -> None:
+    if not _index_exists('absences', INDEX_NAME):
+        op.create_index(INDEX_NAME, 'absences', ['created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    if _index_exists('absences', INDEX_NAME):
+        op.drop_index(INDEX_NAME, table_name='absences')
@@ -0,0 +1,33 @@
+"""Add composite (status, date) index on calendar_events
+
+Revision ID: c6d7e8f9a0b1
+Revises: b5c6d7e8f9a0
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+from sqlalchemy import inspect
+
+revision: str = 'c6d7e8f9a0b1'
+down_revision: Union[str, Sequence[str], None] = 'b5c6d7e8f9a0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEX_NAME = 'ix_calendar_events_status_date'
+
+
+def _index_exists(table: str, name: str) -> bool:
+    bind = op.get_bind()
+    return any(index['name'] == name for index in inspect(bind).get_indexes(table))
+
+
+def upgrade() -> None:
+    if not _index_exists('calendar_events', INDEX_NAME):
+        op.create_index(INDEX_NAME, 'calendar_events', ['status', 'date'], unique=False)
+
+
+def downgrade() -> None:
+    if _index_exists('calendar_events', INDEX_NAME):
+        op.drop_index(INDEX_NAME, table_name='calendar_events')
@@ -0,0 +1,44 @@
+"""Add daily_ledger table for materialized per-day balances
+
+Revision ID: d1e2f3a4b5c6
+Revises: c1d2e3f4a5b6
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+revision: str = 'd1e2f3a4b5c6'
+down_revision: Union[str, Sequence[str], None] = 'c1d2e3f4a5b6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _table_exists(name: str) -> bool:
+    bind = op.get_bind()
+    return inspect(bind).has_table(name)
+
+
+def upgrade() -> None:
+    # Rows are built lazily on first read, so no backfill is needed
+    if not _table_exists('daily_ledger'):
+        op.create_table(
+            'daily_ledger',
+            sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id'), primary_key=True),
+            sa.Column('date', sa.Date(), primary_key=True),
+            sa.Column('type', sa.String(), nullable=False),
+            sa.Column('hours_worked', sa.Float(), nullable=False, server_default='0'),
+            sa.Column('hours_expected', sa.Float(), nullable=False, server_default='0'),
+            sa.Column('balance_change', sa.Float(), nullable=False, server_default='0'),
+            sa.Column('parking_cost', sa.Float(), nullable=False, server_default='0'),
+            sa.Column('km_driven', sa.Float(), nullable=False, server_default='0'),
+            sa.Column('updated_at', sa.DateTime(), nullable=True),
+        )
+
+
+def downgrade() -> None:
+    if _table_exists('daily_ledger'):
+        op.drop_table('daily_ledger')
@@ -0,0 +1,33 @@
+"""Add composite (user_id, event_id) index on event_assignments
+
+Revision ID: d7e8f9a0b1c2
+Revises: c6d7e8f9a0b1
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+from sqlalchemy import inspect
+
+revision: str = 'd7e8f9a0b1c2'
+down_revision: Union[str, Sequence[str], None] = 'c6d7e8f9a0b1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEX_NAME = 'ix_event_assignments_user_event'
+
+
+def _index_exists(table: str, name: str) -> bool:
+    bind = op.get_bind()
+    return any(index['name'] == name for index in inspect(bind).get_indexes(table))
+
+
+def upgrade() -> None:
+    if not _index_exists('event_assignments', INDEX_NAME):
+        op.create_index(INDEX_NAME, 'event_assignments', ['user_id', 'event_id'], unique=False)
+
+
+def downgrade() -> None:
+    if _index_exists('event_assignments', INDEX_NAME):
+        op.drop_index(INDEX_NAME, table_name='event_assignments')
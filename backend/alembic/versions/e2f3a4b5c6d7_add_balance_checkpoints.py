@@ -0,0 +1,48 @@
+"""Add balance_checkpoints table for monthly balance totals
+
+Revision ID: e2f3a4b5c6d7
+Revises: d1e2f3a4b5c6
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+revision: str = 'e2f3a4b5c6d7'
+down_revision: Union[str, Sequence[str], None] = 'd1e2f3a4b5c6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _table_exists(name: str) -> bool:
+    bind = op.get_bind()
+    return inspect(bind).has_table(name)
+
+
+def upgrade() -> None:
+    # Checkpoints are built from the ledger on first read, so no backfill is needed
+    if not _table_exists('balance_checkpoints'):
+        op.create_table(
+            'balance_checkpoints',
+            sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id'), primary_key=True),
+            sa.Column('month_start', sa.Date(), primary_key=True),
+            sa.Column('hours_worked', sa.Float(), nullable=False, server_default='0'),
+            sa.Column('hours_worked_low', sa.Float(), nullable=False, server_default='0'),
+            sa.Column('extra_hours', sa.Float(), nullable=False, server_default='0'),
+            sa.Column('extra_hours_low', sa.Float(), nullable=False, server_default='0'),
+            sa.Column('missing_hours', sa.Float(), nullable=False, server_default='0'),
+            sa.Column('missing_hours_low', sa.Float(), nullable=False, server_default='0'),
+            sa.Column('parking_cost', sa.Float(), nullable=False, server_default='0'),
+            sa.Column('parking_cost_low', sa.Float(), nullable=False, server_default='0'),
+            sa.Column('km_driven', sa.Float(), nullable=False, server_default='0'),
+            sa.Column('km_driven_low', sa.Float(), nullable=False, server_default='0'),
+            sa.Column('updated_at', sa.DateTime(), nullable=True),
+        )
+
+
+def downgrade() -> None:
+    if _table_exists('balance_checkpoints'):
+        op.drop_table('balance_checkpoints')
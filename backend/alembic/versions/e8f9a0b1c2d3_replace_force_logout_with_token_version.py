@@ -0,0 +1,53 @@
+"""Replace users.force_logout with token_version
+
+Revision ID: e8f9a0b1c2d3
+Revises: d7e8f9a0b1c2
+Create Date: 2026-10-17 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+revision: str = 'e8f9a0b1c2d3'
+down_revision: Union[str, Sequence[str], None] = 'd7e8f9a0b1c2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _column_exists(table: str, column: str) -> bool:
+    bind = op.get_bind()
+    cols = [c['name'] for c in inspect(bind).get_columns(table)]
+    return column in cols
+
+
+def upgrade() -> None:
+    if not _column_exists('users', 'token_version'):
+        op.add_column('users', sa.Column('token_version', sa.Integer(), nullable=False, server_default='0'))
+
+    if _column_exists('users', 'force_logout'):
+        # Tokens of users that were waiting for a forced logout (version 0)
+        # are no longer valid
+        users = sa.table(
+            'users',
+            sa.column('token_version', sa.Integer()),
+            sa.column('force_logout', sa.Boolean()),
+        )
+        op.execute(
+            sa.update(users)
+            .where(users.c.force_logout == sa.true())
+            .values(token_version=users.c.token_version + 1)
+        )
+        with op.batch_alter_table('users') as batch_op:
+            batch_op.drop_column('force_logout')
+
+
+def downgrade() -> None:
+    if not _column_exists('users', 'force_logout'):
+        op.add_column('users', sa.Column('force_logout', sa.Boolean(), nullable=True, server_default=sa.false()))
+
+    if _column_exists('users', 'token_version'):
+        with op.batch_alter_table('users') as batch_op:
+            batch_op.drop_column('token_version')
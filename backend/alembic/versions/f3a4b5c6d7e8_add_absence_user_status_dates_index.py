@@ -0,0 +1,33 @@
+"""Add composite (user_id, status, start_date, end_date) index on absences
+
+Revision ID: f3a4b5c6d7e8
+Revises: e2f3a4b5c6d7
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+from sqlalchemy import inspect
+
+revision: str = 'f3a4b5c6d7e8'
+down_revision: Union[str, Sequence[str], None] = 'e2f3a4b5c6d7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEX_NAME = 'ix_absences_user_status_dates'
+
+
+def _index_exists(table: str, name: str) -> bool:
+    bind = op.get_bind()
+    return any(index['name'] == name for index in inspect(bind).get_indexes(table))
+
+
+def upgrade() -> None:
+    if not _index_exists('absences', INDEX_NAME):
+        op.create_index(INDEX_NAME, 'absences', ['user_id', 'status', 'start_date', 'end_date'], unique=False)
+
+
+def downgrade() -> None:
+    if _index_exists('absences', INDEX_NAME):
+        op.drop_index(INDEX_NAME, table_name='absences')
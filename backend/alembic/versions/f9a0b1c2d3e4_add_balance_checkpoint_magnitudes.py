@@ -0,0 +1,44 @@
+"""Add absolute-value sums to balance_checkpoints
+
+Revision ID: f9a0b1c2d3e4
+Revises: e8f9a0b1c2d3
+Create Date: 2026-10-17 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+revision: str = 'f9a0b1c2d3e4'
+down_revision: Union[str, Sequence[str], None] = 'e8f9a0b1c2d3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+FIELDS = ('hours_worked', 'extra_hours', 'missing_hours', 'parking_cost', 'km_driven')
+
+
+def _column_exists(table: str, column: str) -> bool:
+    bind = op.get_bind()
+    cols = [c['name'] for c in inspect(bind).get_columns(table)]
+    return column in cols
+
+
+def upgrade() -> None:
+    for field in FIELDS:
+        if not _column_exists('balance_checkpoints', f'{field}_abs'):
+            op.add_column(
+                'balance_checkpoints',
+                sa.Column(f'{field}_abs', sa.Float(), nullable=False, server_default='0')
+            )
+
+    # Existing checkpoints have no absolute sums yet; they are rebuilt from the ledger
+    op.execute(sa.delete(sa.table('balance_checkpoints')))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('balance_checkpoints') as batch_op:
+        for field in FIELDS:
+            if _column_exists('balance_checkpoints', f'{field}_abs'):
+                batch_op.drop_column(f'{field}_abs')
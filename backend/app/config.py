@@ -5,6 +5,27 @@ _env_path = str(Path(__file__).parent.parent / ".env")
 
 class Settings(BaseSettings):
     DATABASE_URL: str = "sqlite:///./data/employees.db"
+
+    # Engine profile: "sqlite" or "postgresql" (empty = from DATABASE_URL).
+    # PostgreSQL needs psycopg2 and asyncpg installed (see requirements.txt).
+    DATABASE_PROFILE: str = ""
+    # Connection pool per engine (each API worker has a sync and an async engine)
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_PRE_PING: bool = True  # postgresql
+    # SQLite pragmas (cache_size < 0 is in KiB)
+    SQLITE_MMAP_SIZE: int = 268435456
+    SQLITE_CACHE_SIZE: int = -65536
+    SQLITE_BUSY_TIMEOUT_MS: int = 15000
+
+    # Log requests that run the same statement this many times (N+1 queries)
+    QUERY_REPEAT_WARN: int = 5
+
+    # Page size of the paged list endpoints without a limit parameter, and the
+    # largest limit they accept
+    DEFAULT_PAGE_SIZE: int = 100
+    MAX_PAGE_SIZE: int = 500
     JWT_SECRET: str
     JWT_ALGORITHM: str = "HS256"
     JWT_EXPIRE_MINUTES: int = 10080
@@ -23,6 +44,43 @@ class Settings(BaseSettings):
     VAPID_PUBLIC_KEY: str = ""
     VAPID_SUBJECT: str = "mailto:admin@example.com"
 
+    # Number of balance results kept in each worker's in-memory cache
+    BALANCE_CACHE_SIZE: int = 2048
+
+    # Worker processes per API worker for the all-employee balance report
+    # (0 = calculate in the request process)
+    BALANCE_POOL_WORKERS: int = 2
+
+    # Seconds an authenticated user stays cached per worker (0 = query each request)
+    PRINCIPAL_CACHE_TTL: int = 30
+    # Seconds between reloads of the token versions (logouts done by other workers)
+    TOKEN_VERSION_REFRESH_SECONDS: int = 5
+
+    # Argon2 password hashing (time cost = iterations, memory cost in KiB)
+    ARGON2_TIME_COST: int = 3
+    ARGON2_MEMORY_COST: int = 65536
+    ARGON2_PARALLELISM: int = 4
+    # Password hashes computed at once per worker, and how many may wait
+    PASSWORD_POOL_WORKERS: int = 2
+    PASSWORD_QUEUE_LIMIT: int = 64
+
+    # Seconds between rebuilds of the in-memory presence board (picks up
+    # clock-ins and absences handled by other workers)
+    PRESENCE_REFRESH_SECONDS: int = 30
+
+    # today-status stream (Server-Sent Events): concurrent streams per worker,
+    # and seconds between heartbeats on a stream with nothing to send
+    TODAY_STATUS_STREAM_MAX_SUBSCRIBERS: int = 20
+    TODAY_STATUS_STREAM_HEARTBEAT_SECONDS: int = 15
+
+    # Web Push deliveries in flight at once per worker, and seconds before a
+    # push service request counts as failed
+    PUSH_CONCURRENCY: int = 16
+    PUSH_TIMEOUT_SECONDS: float = 10
+    # Talk HTTP/2 to push services when httpx[http2] is installed (otherwise
+    # HTTP/1.1 keep-alive connections)
+    PUSH_HTTP2: bool = True
+
     # Legacy - kept for backward compatibility
     FRONTEND_URL: str = "http://localhost:3000"
 
@@ -1,19 +1,122 @@
-from sqlalchemy import create_engine
+from typing import Optional
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+from app.config import settings
+from app.utils.query_stats import install_query_hooks
+
+# Database location, from .env (default: SQLite file in ./data)
+DATABASE_URL = settings.DATABASE_URL
+
+# Async driver per database backend
+ASYNC_DRIVERS = {
+    'sqlite': 'aiosqlite',
+    'postgresql': 'asyncpg',
+}
+
+
+def engine_profile(url: str) -> str:
+    """Profile name for a database URL: DATABASE_PROFILE if set, else the backend ('sqlite', 'postgresql')."""
+    return settings.DATABASE_PROFILE or make_url(url).get_backend_name()
+
+
+def _in_memory(url) -> bool:
+    """Whether a URL is an in-memory SQLite database (sqlite://, :memory:, mode=memory)."""
+    url = make_url(url)
+    return url.get_backend_name() == 'sqlite' and (
+        url.database in (None, '', ':memory:') or url.query.get('mode') == 'memory'
+    )
+
+
+def _profile_options(url, profile: str, pooled: bool) -> dict:
+    """create_engine() keyword arguments of a profile."""
+
+    if profile == 'sqlite':
+        options = {'connect_args': {"check_same_thread": False}}  # Needed for SQLite
+    elif profile == 'postgresql':
+        options = {'pool_pre_ping': settings.DB_POOL_PRE_PING}
+    else:
+        raise ValueError(f"Unknown database profile: {profile}")
+
+    # In-memory SQLite gets a single-connection pool that takes no sizing
+    if pooled and not _in_memory(url):
+        options['pool_size'] = settings.DB_POOL_SIZE
+        options['max_overflow'] = settings.DB_MAX_OVERFLOW
+        options['pool_timeout'] = settings.DB_POOL_TIMEOUT
+    return options
+
+
+def _sqlite_pragmas(dbapi_connection, connection_record):
+    # WAL lets readers run while a write is in progress; synchronous=NORMAL
+    # is safe with WAL (a power cut can only lose the last commits)
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA mmap_size={settings.SQLITE_MMAP_SIZE}")
+    cursor.execute(f"PRAGMA cache_size={settings.SQLITE_CACHE_SIZE}")
+    cursor.execute(f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.close()
+
+
+def create_db_engine(url: Optional[str] = None, pooled: bool = True) -> Engine:
+    """
+    Engine for the app, scripts and alembic, configured by the database profile.
+
+    sqlite: WAL journal, synchronous=NORMAL, mmap, page cache and busy timeout
+    pragmas on every connection. postgresql: pre-ping. pooled=False uses no
+    connection pool (alembic), otherwise the pool is sized by DB_POOL_SIZE
+    (except for in-memory SQLite, which keeps a single connection).
+    """
+
+    url = url or DATABASE_URL
+    profile = engine_profile(url)
+    options = _profile_options(url, profile, pooled)
+    if not pooled:
+        options['poolclass'] = NullPool
+
+    db_engine = create_engine(url, **options)
+    if profile == 'sqlite':
+        event.listen(db_engine, "connect", _sqlite_pragmas)
+    install_query_hooks(db_engine)
+    return db_engine
+
+
+def create_async_db_engine(url: Optional[str] = None) -> AsyncEngine:
+    """create_db_engine() for the async session, on the async driver of the same database."""
+
+    url = make_url(url or DATABASE_URL)
+    profile = engine_profile(str(url))
+    options = _profile_options(url, profile, pooled=True)
+    if profile == 'sqlite':
+        # aiosqlite runs each connection in its own thread
+        options.pop('connect_args')
+
+    db_engine = create_async_engine(
+        url.set(drivername=f"{url.get_backend_name()}+{ASYNC_DRIVERS[url.get_backend_name()]}"),
+        **options
+    )
+    if profile == 'sqlite':
+        event.listen(db_engine.sync_engine, "connect", _sqlite_pragmas)
+    install_query_hooks(db_engine.sync_engine)
+    return db_engine
 
-# SQLite database file location
-DATABASE_URL = "sqlite:///./data/employees.db"
 
 # Create engine (connects to database)
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False}  # Needed for SQLite
-)
+engine = create_db_engine()
 
 # Session = how we talk to the database
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine on the same database (aiosqlite runs the queries in its own
+# thread, so async routes don't block the event loop while SQLite works)
+async_engine = create_async_db_engine()
+
+# Objects stay usable after commit, async sessions can't lazy-load them again
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
 # Base class for all models
 Base = declarative_base()
 
@@ -23,4 +126,9 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+# Dependency to get an async database session
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -1,19 +1,50 @@
-from typing import Optional
+from typing import Optional, Tuple
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.database import get_db
+from app.database import get_db, get_async_db
 from app.models import User
 from app.security import verify_token
+from app.utils import principal_cache, token_versions
+from app.utils.principal_cache import Principal
 
 security = HTTPBearer()
 
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db)
-) -> User:
-    """Get current authenticated user from JWT token"""
+) -> Principal:
+    """Get current authenticated user from JWT token (cached, see app.utils.principal_cache)"""
     
+    user_id, version = _token_claims(credentials)
+    
+    principal = principal_cache.get(user_id)
+    if principal is None:
+        user = db.query(User).filter(User.id == user_id).first()
+        principal = principal_cache.put(user) if user else None
+    return _check_session(principal, version)
+
+
+async def get_current_user_async(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_async_db)
+) -> Principal:
+    """get_current_user for routes on the async session"""
+    
+    user_id, version = _token_claims(credentials)
+    
+    principal = principal_cache.get(user_id)
+    if principal is None:
+        result = await db.execute(select(User).where(User.id == user_id))
+        user = result.scalars().first()
+        principal = principal_cache.put(user) if user else None
+    return _check_session(principal, version)
+
+
+def _token_claims(credentials: HTTPAuthorizationCredentials) -> Tuple[int, int]:
+    """User id and token version of a bearer token (version 0 for tokens without one)"""
     token = credentials.credentials
     payload = verify_token(token)
     
@@ -30,16 +61,18 @@ async def get_current_user(
             detail="Invalid token payload"
         )
     
-    user_id = int(user_id_str)
-    
-    user = db.query(User).filter(User.id == user_id, User.is_active == True).first()
-    if user is None:
+    return int(user_id_str), int(payload.get("ver", 0))
+
+
+def _check_session(user: Optional[Principal], version: int) -> Principal:
+    if user is None or not user.is_active:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found or inactive"
         )
 
-    if user.force_logout:
+    # Logged out everywhere after this token was issued
+    if version < max(user.token_version, token_versions.minimum(user.id)):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Session invalidated"
@@ -48,7 +81,7 @@ async def get_current_user(
     return user
 
 
-async def get_current_admin(current_user: User = Depends(get_current_user)) -> User:
+async def get_current_admin(current_user: User = Depends(get_current_user)) -> Principal:
     """Require admin or developer role"""
     if current_user.role not in ['admin', 'developer']:
         raise HTTPException(
@@ -58,7 +91,17 @@ async def get_current_admin(current_user: User = Depends(get_current_user)) -> U
     return current_user
 
 
-async def get_current_employee(current_user: User = Depends(get_current_user)) -> User:
+async def get_current_admin_async(current_user: User = Depends(get_current_user_async)) -> Principal:
+    """get_current_admin for routes on the async session"""
+    if current_user.role not in ['admin', 'developer']:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required"
+        )
+    return current_user
+
+
+async def get_current_employee(current_user: User = Depends(get_current_user)) -> Principal:
     """Require employee role (or higher)"""
     if current_user.role not in ['employee', 'admin', 'developer']:
         raise HTTPException(
@@ -5,16 +5,43 @@ from app.routes import auth, users, clock, absences, calendar, reports, exports,
 from app.routes import notifications
 from app.config import settings
 from app.scheduler import scheduler, sync_all_notifications
+from app.utils import ledger, presence_board, token_versions
+from app.utils.balance_pool import shutdown_pool
+from app.utils.password_pool import shutdown_pool as shutdown_password_pool
+from app.utils.push import shutdown_pool as shutdown_push_pool
+from app.utils.query_stats import QueryStatsMiddleware
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup: sync all active scheduled notifications, then start scheduler
     sync_all_notifications(scheduler)
+    # Token versions of logged out users, reloaded for logouts in other workers
+    token_versions.refresh()
+    scheduler.add_job(
+        token_versions.refresh, 'interval', seconds=settings.TOKEN_VERSION_REFRESH_SECONDS,
+        id='token_versions_refresh', replace_existing=True
+    )
+    # Today's presence board, rebuilt at midnight and for other workers' writes
+    presence_board.refresh()
+    scheduler.add_job(presence_board.refresh, 'cron', hour=0, minute=0, id='presence_board_midnight', replace_existing=True)
+    scheduler.add_job(
+        presence_board.refresh, 'interval', seconds=settings.PRESENCE_REFRESH_SECONDS,
+        id='presence_board_refresh', replace_existing=True
+    )
+    # Fill in the daily ledger off the event loop (the scheduler runs plain
+    # functions on a worker thread): now, and each night for the new month
+    scheduler.add_job(ledger.materialize_ledgers, id='ledger_materialize_startup', replace_existing=True)
+    scheduler.add_job(
+        ledger.materialize_ledgers, 'cron', hour=0, minute=15, id='ledger_materialize_nightly', replace_existing=True
+    )
     scheduler.start()
     yield
     # Shutdown
     scheduler.shutdown()
+    shutdown_pool()
+    shutdown_password_pool()
+    shutdown_push_pool()
 
 
 app = FastAPI(title="Employee Management API", lifespan=lifespan)
@@ -30,8 +57,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],  # Next page cursor of paged lists
 )
 
+# Query count and database time per request (Server-Timing header)
+app.add_middleware(QueryStatsMiddleware)
+
 # Include routers with prefixes
 app.include_router(auth.router, prefix="/api/auth", tags=["Authentication"])
 app.include_router(users.router, prefix="/api/users", tags=["Users"])
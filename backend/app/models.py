@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DECIMAL, DateTime, Date, Time, Text, ForeignKey, UniqueConstraint, JSON
+from sqlalchemy import Column, Integer, String, Boolean, DECIMAL, Float, DateTime, Date, Time, Text, ForeignKey, UniqueConstraint, Index, JSON
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.database import Base
@@ -17,7 +17,8 @@ class User(Base):
     has_km_compensation = Column(Boolean, default=False)
 
     # Session management
-    force_logout = Column(Boolean, default=False)
+    # Bumped to log the user out everywhere (see app.utils.token_versions)
+    token_version = Column(Integer, nullable=False, default=0, server_default='0')
 
     # Password reset fields
     reset_token = Column(String, nullable=True)
@@ -103,6 +104,10 @@ class Absence(Base):
     
     __table_args__ = (
         UniqueConstraint('user_id', 'start_date', name='unique_absence_user_start_date'),
+        # Date-bounded lookups of a user's approved absences (balance calculation)
+        Index('ix_absences_user_status_dates', 'user_id', 'status', 'start_date', 'end_date'),
+        # Keyset pages of the admin absence list (newest first)
+        Index('ix_absences_created_at_id', 'created_at', 'id'),
     )
 
 class EventCategory(Base):
@@ -138,6 +143,11 @@ class CalendarEvent(Base):
     category = relationship("EventCategory", back_populates="events")
     assignments = relationship("EventAssignment", back_populates="event", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        # Month views of the calendar (approved events in a date range)
+        Index('ix_calendar_events_status_date', 'status', 'date'),
+    )
+
 
 class EventAssignment(Base):
     __tablename__ = "event_assignments"
@@ -147,6 +157,12 @@ class EventAssignment(Base):
     
     event = relationship("CalendarEvent", back_populates="assignments")
 
+    __table_args__ = (
+        # Events assigned to a user (employee calendar); the primary key
+        # starts with event_id
+        Index('ix_event_assignments_user_event', 'user_id', 'event_id'),
+    )
+
 
 class CompanyHoliday(Base):
     __tablename__ = "company_holidays"
@@ -209,4 +225,56 @@ class ScheduledNotification(Base):
     target_employee_ids = Column(JSON, nullable=True)  # List of user IDs, only used when target_type='specific_users'
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
-    created_by = Column(Integer, ForeignKey("users.id"), nullable=True)
\ No newline at end of file
+    created_by = Column(Integer, ForeignKey("users.id"), nullable=True)
+
+
+class DailyLedger(Base):
+    """Materialized per-day balance outcome, kept in sync by app.utils.ledger."""
+    __tablename__ = "daily_ledger"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    date = Column(Date, primary_key=True)
+    type = Column(String, nullable=False)  # Same day types as the balance details
+    hours_worked = Column(Float, nullable=False, default=0)  # Hours counted towards total_hours_worked
+    hours_expected = Column(Float, nullable=False, default=0)
+    balance_change = Column(Float, nullable=False, default=0)
+    parking_cost = Column(Float, nullable=False, default=0)
+    km_driven = Column(Float, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class BalanceCheckpoint(Base):
+    """Per-month totals of a user's daily_ledger rows, stored for closed months."""
+    __tablename__ = "balance_checkpoints"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    month_start = Column(Date, primary_key=True)
+
+    # Each total is stored as a float plus its rounding remainder (*_low), so
+    # months add up to exactly the same value as summing every day, and with
+    # the sum of the days' absolute values (*_abs) to bound running-sum error
+    hours_worked = Column(Float, nullable=False, default=0)
+    hours_worked_low = Column(Float, nullable=False, default=0)
+    hours_worked_abs = Column(Float, nullable=False, default=0)
+    extra_hours = Column(Float, nullable=False, default=0)
+    extra_hours_low = Column(Float, nullable=False, default=0)
+    extra_hours_abs = Column(Float, nullable=False, default=0)
+    missing_hours = Column(Float, nullable=False, default=0)
+    missing_hours_low = Column(Float, nullable=False, default=0)
+    missing_hours_abs = Column(Float, nullable=False, default=0)
+    parking_cost = Column(Float, nullable=False, default=0)
+    parking_cost_low = Column(Float, nullable=False, default=0)
+    parking_cost_abs = Column(Float, nullable=False, default=0)
+    km_driven = Column(Float, nullable=False, default=0)
+    km_driven_low = Column(Float, nullable=False, default=0)
+    km_driven_abs = Column(Float, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class BalanceVersion(Base):
+    """Counter bumped on every write that changes a user's balance (app.utils.balance_cache)."""
+    __tablename__ = "balance_versions"
+
+    # user_id 0 is the company-wide counter, bumped by company holiday changes
+    user_id = Column(Integer, primary_key=True, autoincrement=False)
+    version = Column(Integer, nullable=False, default=0)
@@ -1,7 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import or_
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import datetime, timedelta, date as date_type
+from app.config import settings
 from app.database import get_db
 from app.models import User, Absence, ClockEvent, PushSubscription
 from app.schemas import (
@@ -14,6 +16,9 @@ from app.schemas import (
 from app.dependencies import get_current_user, get_current_admin
 from app.utils.email import send_email
 from app.utils.push import send_push
+from app.utils import balance_sync
+from app.utils.listings import absence_rows
+from app.utils.pagination import paginate
 
 router = APIRouter()
 
@@ -32,6 +37,16 @@ def format_date_nl(date_obj):
     ]
     return f"{date_obj.day} {months_nl[date_obj.month - 1]} {date_obj.year}"
 
+def filter_absences(query, date_from: Optional[date_type], date_to: Optional[date_type], status: Optional[str]):
+    """Only absences overlapping from/to (both inclusive, open-ended ones run on) with the status"""
+    if date_from:
+        query = query.filter(or_(Absence.end_date == None, Absence.end_date >= date_from))
+    if date_to:
+        query = query.filter(Absence.start_date <= date_to)
+    if status:
+        query = query.filter(Absence.status == status)
+    return query
+
 @router.post("/", response_model=AbsenceResponse)
 async def request_absence(
     absence_data: AbsenceRequest,
@@ -134,6 +149,8 @@ async def admin_create_absence(
     db.add(absence)
     db.commit()
     db.refresh(absence)
+    if absence.status == 'approved':
+        balance_sync.absence_changed(db, absence.user_id, (absence.start_date, absence.end_date))
 
     return absence
 
@@ -197,6 +214,10 @@ async def create_bulk_absences(
 
     db.commit()
 
+    if auto_approve:
+        for user_id in created_absences:
+            balance_sync.absence_changed(db, user_id, (start_date, end_date))
+
     return {
         "message": f"Created {len(created_absences)} absences",
         "created_count": len(created_absences),
@@ -207,14 +228,22 @@ async def create_bulk_absences(
 
 @router.get("/my-absences", response_model=List[AbsenceResponse])
 async def get_my_absences(
+    response: Response,
+    date_from: Optional[date_type] = Query(default=None, alias="from"),
+    date_to: Optional[date_type] = Query(default=None, alias="to"),
+    status: Optional[str] = Query(default=None),
+    limit: int = Query(default=settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(default=None),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get my absence requests"""
+    """Get my absence requests, latest start first, optionally only from/to a date or with a status (paged with limit/cursor, see X-Next-Cursor)"""
     
-    absences = db.query(Absence).filter(
-        Absence.user_id == current_user.id
-    ).order_by(Absence.start_date.desc()).all()
+    absences = paginate(
+        filter_absences(db.query(Absence).filter(Absence.user_id == current_user.id), date_from, date_to, status),
+        [Absence.start_date, Absence.id],
+        response, limit, cursor
+    )
     
     return absences
 
@@ -225,22 +254,18 @@ async def get_pending_absences(
 ):
     """Get all pending absence requests (admin only)"""
 
-    # Join with User to filter only active users
-    absences = db.query(Absence).join(
-        User, Absence.user_id == User.id
-    ).filter(
+    # One query with the username joined in, only active users
+    absences = absence_rows(db).filter(
         Absence.status == 'pending',
         User.is_active == True
     ).order_by(Absence.created_at.desc()).all()
 
-    # Add username to each absence
     result = []
     for absence in absences:
-        user = db.query(User).filter(User.id == absence.user_id).first()
         absence_dict = {
             "id": absence.id,
             "user_id": absence.user_id,
-            "username": user.username if user else "Unknown",
+            "username": absence.username,
             "start_date": absence.start_date,
             "end_date": absence.end_date,
             "type": absence.type,
@@ -256,21 +281,33 @@ async def get_pending_absences(
 
 @router.get("/all", response_model=List[AbsenceResponse])
 async def get_all_absences(
+    response: Response,
+    user_id: Optional[int] = Query(default=None),
+    absence_type: Optional[str] = Query(default=None, alias="type"),
+    date_from: Optional[date_type] = Query(default=None, alias="from"),
+    date_to: Optional[date_type] = Query(default=None, alias="to"),
+    status: Optional[str] = Query(default=None),
+    limit: int = Query(default=settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(default=None),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_admin)
 ):
-    """Get ALL absences for ALL employees (admin only)"""
+    """Get ALL absences for ALL employees, newest first, optionally filtered by employee, type, from/to and status (admin only, paged with limit/cursor)"""
 
-    absences = db.query(Absence).order_by(Absence.created_at.desc()).all()
+    # One query with the username joined in
+    absences = filter_absences(absence_rows(db), date_from, date_to, status)
+    if user_id:
+        absences = absences.filter(Absence.user_id == user_id)
+    if absence_type:
+        absences = absences.filter(Absence.type == absence_type)
+    absences = paginate(absences, [Absence.created_at, Absence.id], response, limit, cursor)
 
-    # Add username to each absence
     result = []
     for absence in absences:
-        user = db.query(User).filter(User.id == absence.user_id).first()
         absence_dict = {
             "id": absence.id,
             "user_id": absence.user_id,
-            "username": user.username if user else "Unknown",
+            "username": absence.username,
             "start_date": absence.start_date,
             "end_date": absence.end_date,
             "type": absence.type,
@@ -338,6 +375,7 @@ async def approve_absence(
 
     db.commit()
     db.refresh(absence)
+    balance_sync.absence_changed(db, absence.user_id, (absence.start_date, absence.end_date))
 
     # Send email notification
     user = db.query(User).filter(User.id == absence.user_id).first()
@@ -491,6 +529,7 @@ async def update_absence(
 
     # Update fields if provided (exclude_unset=True distinguishes "not provided" from "set to null")
     updates = request.model_dump(exclude_unset=True)
+    previous_span = (absence.start_date, absence.end_date)
 
     if "start_date" in updates:
         absence.start_date = updates["start_date"]
@@ -501,6 +540,7 @@ async def update_absence(
 
     db.commit()
     db.refresh(absence)
+    balance_sync.absence_changed(db, absence.user_id, previous_span, (absence.start_date, absence.end_date))
 
     return absence
 
@@ -531,8 +571,12 @@ async def delete_absence(
             detail="Can only delete pending absences" if current_user.role == 'employee' else "Cannot delete this absence"
         )
     
+    absence_user_id = absence.user_id
+    previous_span = (absence.start_date, absence.end_date)
+
     db.delete(absence)
     db.commit()
+    balance_sync.absence_changed(db, absence_user_id, previous_span)
     
     return {"message": "Absence deleted successfully"}
 @router.patch("/{absence_id}/edit")
@@ -549,6 +593,8 @@ async def edit_absence(
     absence = db.query(Absence).filter(Absence.id == absence_id).first()
     if not absence:
         raise HTTPException(status_code=404, detail="Absence not found")
+
+    previous_span = (absence.start_date, absence.end_date)
     
     # Update fields - PARSE DATES PROPERLY
     if 'type' in updates:
@@ -575,5 +621,6 @@ async def edit_absence(
     
     db.commit()
     db.refresh(absence)
+    balance_sync.absence_changed(db, absence.user_id, previous_span, (absence.start_date, absence.end_date))
     
     return absence
@@ -7,7 +7,9 @@ import os
 from app.database import get_db
 from app.models import User, PasswordResetToken
 from app.schemas import UserResponse
-from app.security import verify_password, create_access_token, get_password_hash
+from app.dependencies import get_current_admin
+from app.security import create_access_token
+from app.utils.password_pool import hash_password, pool_stats, verify_password
 from app.utils.email import send_email
 from app.config import settings
 
@@ -29,7 +31,15 @@ async def login(request: LoginRequest, db: Session = Depends(get_db)):
     
     user = db.query(User).filter(User.username == request.username).first()
     
-    if not user or not verify_password(request.password, user.password_hash):
+    if not user:
+        raise HTTPException(
+            status_code=401,
+            detail="Incorrect username or password"
+        )
+
+    # Argon2 runs on the password pool, not on the event loop
+    password_ok, new_hash = await verify_password(request.password, user.password_hash)
+    if not password_ok:
         raise HTTPException(
             status_code=401,
             detail="Incorrect username or password"
@@ -41,11 +51,13 @@ async def login(request: LoginRequest, db: Session = Depends(get_db)):
             detail="Account is inactive"
         )
 
-    if user.force_logout:
-        user.force_logout = False
+    # Hash made with older Argon2 parameters: store it with the current ones
+    if new_hash:
+        user.password_hash = new_hash
         db.commit()
 
-    access_token = create_access_token(data={"sub": str(user.id)})
+    # Valid until the user is logged out everywhere (token_version bumped)
+    access_token = create_access_token(data={"sub": str(user.id), "ver": user.token_version})
 
     return {
         "access_token": access_token,
@@ -130,10 +142,16 @@ async def reset_password(request: PasswordResetConfirm, db: Session = Depends(ge
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
-    user.password_hash = get_password_hash(request.new_password)
+    user.password_hash = await hash_password(request.new_password)
     
     reset_token.used = True
     
     db.commit()
     
-    return {"message": "Password reset successful"}
\ No newline at end of file
+    return {"message": "Password reset successful"}
+
+@router.get("/password-pool-stats")
+async def get_password_pool_stats(current_user: User = Depends(get_current_admin)):
+    """Password hashing queue of the worker handling the request (admin only)"""
+    
+    return pool_stats()
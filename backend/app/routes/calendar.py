@@ -1,8 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from datetime import datetime
+from datetime import date, datetime
 from holidays import country_holidays
+from app.config import settings
 from app.database import get_db
 from app.models import User, EventCategory, CalendarEvent, EventAssignment, CompanyHoliday
 from app.schemas import (
@@ -11,6 +13,9 @@ from app.schemas import (
     CompanyHolidayCreate, CompanyHolidayResponse, CalendarEventUpdate
 )
 from app.dependencies import get_current_user, get_current_admin
+from app.utils import balance_sync
+from app.utils.listings import calendar_event_rows, calendar_feed_rows
+from app.utils.pagination import paginate
 
 router = APIRouter()
 
@@ -156,53 +161,61 @@ async def create_event(
 
 @router.get("/events")
 async def get_events(
+    response: Response,
+    date_from: Optional[date] = Query(default=None, alias="from"),
+    date_to: Optional[date] = Query(default=None, alias="to"),
+    limit: int = Query(default=settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(default=None),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get calendar events with category info (approved only, pending events shown only in Approvals page)"""
+    """Get calendar events with category info (approved only, pending events shown only in Approvals page), newest first, optionally only from/to a date, paged with limit/cursor"""
+
+    # One query with the category joined in
+    events = calendar_feed_rows(db)
 
     if current_user.role in ['admin', 'developer']:
         # Admin sees ONLY approved events in calendar
         # Pending/rejected events are shown in Approvals page only
-        events = db.query(CalendarEvent).filter(
+        events = events.filter(
             CalendarEvent.status == 'approved'
-        ).order_by(CalendarEvent.date.desc()).all()
+        )
     else:
         # Employee sees:
         # 1. All events with visibility='all' and status='approved'
         # 2. Events assigned to them with status='approved'
         # 3. Events they created with status='pending' or 'approved' (NOT rejected)
 
-        # Get event IDs assigned to this user
-        assigned_event_ids = [
-            ea.event_id for ea in db.query(EventAssignment).filter(
-                EventAssignment.user_id == current_user.id
-            ).all()
-        ]
+        # Events assigned to this user, as a subquery the database answers
+        # from the (user_id, event_id) index instead of a list of ids
+        assigned = CalendarEvent.id.in_(
+            select(EventAssignment.event_id).where(EventAssignment.user_id == current_user.id)
+        )
 
-        events = db.query(CalendarEvent).filter(
+        events = events.filter(
             (
                 # Public approved events
                 (CalendarEvent.visibility == 'all') & (CalendarEvent.status == 'approved')
             ) | (
                 # Assigned events (approved only)
-                (CalendarEvent.id.in_(assigned_event_ids)) & (CalendarEvent.status == 'approved')
+                assigned & (CalendarEvent.status == 'approved')
             ) | (
                 # Own events (pending or approved, NOT rejected)
                 (CalendarEvent.created_by == current_user.id) & (CalendarEvent.status.in_(['pending', 'approved']))
             )
-        ).order_by(CalendarEvent.date.desc()).all()
+        )
+
+    # Date range of the calendar view (both inclusive)
+    if date_from:
+        events = events.filter(CalendarEvent.date >= date_from)
+    if date_to:
+        events = events.filter(CalendarEvent.date <= date_to)
+
+    events = paginate(events, [CalendarEvent.date, CalendarEvent.id], response, limit, cursor)
 
     # Format response with category info
     result = []
     for event in events:
-        # Get category details if exists
-        category = None
-        if event.category_id:
-            category = db.query(EventCategory).filter(
-                EventCategory.id == event.category_id
-            ).first()
-
         event_dict = {
             "id": event.id,
             "title": event.title,
@@ -211,8 +224,9 @@ async def get_events(
             "time_start": event.time_start,
             "time_end": event.time_end,
             "category_id": event.category_id,
-            "category_name": category.name if category else None,
-            "category_color": category.color if category else "#6b7280",  # Gray default
+            "category_name": event.category_name,
+            # Gray default without a category
+            "category_color": event.category_color if event.category_name is not None else "#6b7280",
             "visibility": event.visibility,
             "status": event.status,
             "created_by": event.created_by,
@@ -231,14 +245,13 @@ async def get_pending_events(
 ):
     """Get all pending event suggestions (admin only)"""
 
-    events = db.query(CalendarEvent).filter(
+    # One query with the creator's username joined in
+    events = calendar_event_rows(db).filter(
         CalendarEvent.status == 'pending'
     ).order_by(CalendarEvent.created_at.desc()).all()
 
-    # Add username to each event
     result = []
     for event in events:
-        user = db.query(User).filter(User.id == event.created_by).first()
         event_dict = {
             "id": event.id,
             "title": event.title,
@@ -250,7 +263,7 @@ async def get_pending_events(
             "visibility": event.visibility,
             "status": event.status,
             "created_by": event.created_by,
-            "username": user.username if user else "Unknown",
+            "username": event.username,
             "created_at": event.created_at,
             "reviewed_at": event.reviewed_at,
             "reviewed_by": event.reviewed_by
@@ -674,6 +687,7 @@ async def create_holiday(
     db.add(holiday)
     db.commit()
     db.refresh(holiday)
+    balance_sync.holidays_changed(db, [holiday.date])
     
     return holiday
 
@@ -696,6 +710,7 @@ async def import_dutch_holidays(
 
     created_count = 0
     skipped_count = 0
+    created_dates = []
 
     for date, name in nl_holidays.items():
         # Translate to Dutch
@@ -717,9 +732,11 @@ async def import_dutch_holidays(
             created_by=current_user.id
         )
         db.add(holiday)
+        created_dates.append(date)
         created_count += 1
 
     db.commit()
+    balance_sync.holidays_changed(db, created_dates)
 
     return {
         "message": f"Imported {created_count} Dutch holidays for {year}",
@@ -730,12 +747,26 @@ async def import_dutch_holidays(
 
 @router.get("/holidays", response_model=List[CompanyHolidayResponse])
 async def get_holidays(
+    response: Response,
+    date_from: Optional[date] = Query(default=None, alias="from"),
+    date_to: Optional[date] = Query(default=None, alias="to"),
+    limit: int = Query(default=settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(default=None),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get all company holidays"""
+    """Get all company holidays, by date, optionally only from/to a date (paged with limit/cursor, see X-Next-Cursor)"""
     
-    holidays = db.query(CompanyHoliday).order_by(CompanyHoliday.date).all()
+    holidays = db.query(CompanyHoliday)
+    if date_from:
+        holidays = holidays.filter(CompanyHoliday.date >= date_from)
+    if date_to:
+        holidays = holidays.filter(CompanyHoliday.date <= date_to)
+
+    holidays = paginate(
+        holidays, [CompanyHoliday.date, CompanyHoliday.id],
+        response, limit, cursor, descending=False
+    )
     return holidays
 
 @router.delete("/holidays/{holiday_id}")
@@ -760,7 +791,10 @@ async def delete_holiday(
             detail="Cannot delete past holidays - this would affect balance calculations"
         )
 
+    holiday_date = holiday.date
+
     db.delete(holiday)
     db.commit()
+    balance_sync.holidays_changed(db, [holiday_date])
 
     return {"message": "Holiday deleted successfully"}
\ No newline at end of file
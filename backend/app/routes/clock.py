@@ -1,13 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import or_
+from sqlalchemy import or_, select
 from typing import List, Optional
 from datetime import datetime, date as date_type, time, timedelta
-from app.database import get_db
+from app.config import settings
+from app.database import get_db, get_async_db
 from app.models import User, ClockEvent, Absence, WorkSchedule, PushSubscription
 from app.utils.push import send_push
+from app.utils import balance_sync, presence_board
+from app.utils.listings import clock_event_rows
+from app.utils.pagination import paginate
 from app.schemas import ClockInRequest, ClockEventResponse, ClockEventUpdate, CreateClockEventRequest
-from app.dependencies import get_current_user, get_current_admin
+from app.dependencies import get_current_user, get_current_admin, get_current_user_async
 
 router = APIRouter()
 
@@ -95,6 +100,7 @@ async def create_clock_event(
     db.add(clock_event)
     db.commit()
     db.refresh(clock_event)
+    balance_sync.user_days_changed(db, current_user.id, event_date, event_date)
 
     return {
         "message": "Clock event created" if is_scheduled else "Request submitted for admin approval",
@@ -106,8 +112,8 @@ async def create_clock_event(
 async def clock_in(
     clock_data: ClockInRequest,
     clock_date: date_type = Query(default=None),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
 ):
     """Clock in - auto approve if scheduled day, pending if not"""
 
@@ -122,11 +128,9 @@ async def clock_in(
     clock_date_weekday = clock_date.weekday()  # Python: 0=Monday
 
     # Get JavaScript day numbers (0=Sunday, 1=Monday, etc.)
-    js_scheduled_days = [
-        ws.day_of_week for ws in db.query(WorkSchedule).filter(
-            WorkSchedule.user_id == current_user.id
-        ).all()
-    ]
+    js_scheduled_days = (await db.execute(
+        select(WorkSchedule.day_of_week).where(WorkSchedule.user_id == current_user.id)
+    )).scalars().all()
 
     # Convert to Python day numbers (0=Monday, 1=Tuesday, etc.)
     py_scheduled_days = [(js_day - 1) % 7 for js_day in js_scheduled_days]
@@ -159,21 +163,23 @@ async def clock_in(
             )
 
     # AUTO-CLOSE OPEN ABSENCES (also catches absences with a manually set end_date >= clock_date)
-    open_absence = db.query(Absence).filter(
+    open_absence = (await db.execute(select(Absence).where(
         Absence.user_id == current_user.id,
         or_(Absence.end_date == None, Absence.end_date >= clock_date),
         Absence.status == 'approved'
-    ).first()
+    ))).scalars().first()
 
     if open_absence and open_absence.start_date < clock_date:
+        previous_end_date = open_absence.end_date
         open_absence.end_date = clock_date - timedelta(days=1)
-        db.commit()
+        await db.commit()
+        await db.run_sync(balance_sync.user_days_changed, current_user.id, clock_date, previous_end_date)
 
     # Check if already clocked in for this date
-    existing = db.query(ClockEvent).filter(
+    existing = (await db.execute(select(ClockEvent).where(
         ClockEvent.user_id == current_user.id,
         ClockEvent.date == clock_date
-    ).first()
+    ))).scalars().first()
 
     if existing:
         raise HTTPException(
@@ -196,8 +202,9 @@ async def clock_in(
     )
 
     db.add(clock_event)
-    db.commit()
-    db.refresh(clock_event)
+    await db.commit()
+    await db.refresh(clock_event)
+    await db.run_sync(balance_sync.user_days_changed, current_user.id, clock_date, clock_date)
 
     return {
         "message": "Clocked in successfully" if is_scheduled else "Clock in request submitted for approval",
@@ -254,19 +261,30 @@ async def create_clock_event(
     db.add(clock_event)
     db.commit()
     db.refresh(clock_event)
+    balance_sync.user_days_changed(db, user_id, event_date, event_date)
     
     return clock_event
 
 @router.get("/my-events")
 async def get_my_clock_events(
+    response: Response,
+    date_from: Optional[date_type] = Query(default=None, alias="from"),
+    date_to: Optional[date_type] = Query(default=None, alias="to"),
+    limit: int = Query(default=settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(default=None),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get my clock events history"""
+    """Get my clock events history, newest first, optionally only from/to a date (paged with limit/cursor, see X-Next-Cursor)"""
 
-    events = db.query(ClockEvent).filter(
-        ClockEvent.user_id == current_user.id
-    ).order_by(ClockEvent.date.desc()).all()
+    events = db.query(ClockEvent).filter(ClockEvent.user_id == current_user.id)
+    # Date range, both inclusive (e.g. the week view)
+    if date_from:
+        events = events.filter(ClockEvent.date >= date_from)
+    if date_to:
+        events = events.filter(ClockEvent.date <= date_to)
+
+    events = paginate(events, [ClockEvent.date, ClockEvent.id], response, limit, cursor)
 
     return [clock_event_to_dict(e) for e in events]
 
@@ -291,17 +309,17 @@ async def get_today_event(
 
 @router.post("/out")
 async def clock_out(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
 ):
     """Clock out - updates today's clock event with current time"""
 
     today = datetime.now().date()
 
-    event = db.query(ClockEvent).filter(
+    event = (await db.execute(select(ClockEvent).where(
         ClockEvent.user_id == current_user.id,
         ClockEvent.date == today
-    ).first()
+    ))).scalars().first()
 
     if not event:
         raise HTTPException(status_code=404, detail="No clock in event found for today")
@@ -311,8 +329,9 @@ async def clock_out(
     event.modified_at = datetime.now()
     event.modified_by = current_user.id
 
-    db.commit()
-    db.refresh(event)
+    await db.commit()
+    await db.refresh(event)
+    await db.run_sync(balance_sync.user_days_changed, current_user.id, today, today)
 
     return {
         "message": "Clocked out successfully",
@@ -328,19 +347,18 @@ async def get_all_clock_events(
 ):
     """Get ALL clock events for ALL employees in date range (admin only)"""
 
-    events = db.query(ClockEvent).filter(
+    # One query with the username joined in
+    events = clock_event_rows(db).filter(
         ClockEvent.date >= start_date,
         ClockEvent.date <= end_date
     ).order_by(ClockEvent.date.desc()).all()
 
-    # Add username to each event
     result = []
     for event in events:
-        user = db.query(User).filter(User.id == event.user_id).first()
         event_dict = {
             "id": event.id,
             "user_id": event.user_id,
-            "username": user.username if user else "Unknown",
+            "username": event.username,
             "date": event.date,
             "clock_in": event.clock_in,
             "clock_out": event.clock_out,
@@ -360,18 +378,17 @@ async def get_pending_clock_events(
 ):
     """Get all pending clock events (admin only)"""
 
-    pending_events = db.query(ClockEvent).filter(
+    # One query with the username joined in
+    pending_events = clock_event_rows(db).filter(
         ClockEvent.status == 'pending'
     ).order_by(ClockEvent.created_at.desc()).all()
 
-    # Add username to each
     result = []
     for event in pending_events:
-        user = db.query(User).filter(User.id == event.user_id).first()
         result.append({
             "id": event.id,
             "user_id": event.user_id,
-            "username": user.username if user else "Unknown",
+            "username": event.username,
             "date": str(event.date),
             "clock_in": str(event.clock_in),
             "clock_out": str(event.clock_out),
@@ -389,18 +406,23 @@ async def get_pending_clock_events(
 @router.get("/user/{user_id}/events", response_model=List[ClockEventResponse])
 async def get_user_clock_events(
     user_id: int,
+    response: Response,
+    limit: int = Query(default=settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(default=None),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_admin)
 ):
-    """Get clock events for a specific user (admin only)"""
+    """Get clock events for a specific user, newest first (admin only, paged with limit/cursor)"""
     
     user = db.query(User).filter(User.id == user_id).first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
-    events = db.query(ClockEvent).filter(
-        ClockEvent.user_id == user_id
-    ).order_by(ClockEvent.date.desc()).all()
+    events = paginate(
+        db.query(ClockEvent).filter(ClockEvent.user_id == user_id),
+        [ClockEvent.date, ClockEvent.id],
+        response, limit, cursor
+    )
     
     return events
 
@@ -456,6 +478,7 @@ async def update_clock_event(
 
     db.commit()
     db.refresh(event)
+    balance_sync.user_days_changed(db, event.user_id, event.date, event.date)
 
     return clock_event_to_dict(event)
 
@@ -482,6 +505,7 @@ async def approve_clock_event(
 
     db.commit()
     db.refresh(event)
+    presence_board.user_changed(db, event.user_id, event.date, event.date)
 
     # Send approval email
     admin_notes = request_data.get('admin_notes') if request_data else None
@@ -564,8 +588,12 @@ async def delete_clock_event(
     event_date = event.date.strftime('%d-%m-%Y')
     requested_reason = event.requested_reason
 
+    event_user_id = event.user_id
+    deleted_date = event.date
+
     db.delete(event)
     db.commit()
+    balance_sync.user_days_changed(db, event_user_id, deleted_date, deleted_date)
 
     # Send rejection email if it was pending (admin rejected it)
     if was_pending and current_user.role == 'admin' and user and user.email:
@@ -652,5 +680,6 @@ async def edit_clock_event(
     
     db.commit()
     db.refresh(event)
+    balance_sync.user_days_changed(db, event.user_id, event.date, event.date)
     
     return clock_event_to_dict(event)
@@ -2,7 +2,6 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from sqlalchemy import or_
 from datetime import date
-import asyncio
 from typing import List
 
 from app.database import get_db
@@ -15,7 +14,7 @@ from app.schemas import (
     ScheduledNotificationResponse,
 )
 from app.dependencies import get_current_admin, get_current_user
-from app.utils.push import send_push
+from app.utils.push import push_stats, send_push_batch
 from app.config import settings
 
 router = APIRouter()
@@ -96,11 +95,7 @@ async def send_batch_notification(
                    "Medewerkers moeten eerst notificaties accepteren in de app."
         )
 
-    tasks = [
-        send_push(s.endpoint, s.p256dh, s.auth, data.title, data.message)
-        for s in subscriptions
-    ]
-    results = await asyncio.gather(*tasks)
+    results = await send_push_batch(subscriptions, data.title, data.message)
 
     successful = sum(1 for r in results if r)
     failed = [subscriptions[i].endpoint for i, r in enumerate(results) if not r]
@@ -113,6 +108,12 @@ async def send_batch_notification(
     )
 
 
+@router.get("/push-stats")
+async def get_push_stats(current_user: User = Depends(get_current_admin)):
+    """Push delivery counters, batch timings and connection reuse of the worker handling the request (admin only)."""
+    return push_stats()
+
+
 # ── Scheduled notifications CRUD (admin) ─────────────────────────────────────
 
 @router.get("/scheduled", response_model=List[ScheduledNotificationResponse])
@@ -247,11 +248,7 @@ async def _run_scheduled_notification(db: Session, notif: ScheduledNotification)
             success=True,
         )
 
-    tasks = [
-        send_push(s.endpoint, s.p256dh, s.auth, notif.title, notif.message)
-        for s in subscriptions
-    ]
-    results = await asyncio.gather(*tasks)
+    results = await send_push_batch(subscriptions, notif.title, notif.message)
 
     successful = sum(1 for r in results if r)
     failed = [subscriptions[i].endpoint for i, r in enumerate(results) if not r]
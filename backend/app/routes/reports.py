@@ -1,10 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+import asyncio
+import json
+import weakref
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import date, datetime, timedelta
-from app.database import get_db
+from app.config import settings
+from app.database import get_async_db
 from app.models import User
-from app.dependencies import get_current_user, get_current_admin
-from app.utils.calculations import calculate_user_balance
+from app.dependencies import get_current_user_async, get_current_admin_async
+from app.utils.calculations import DETAIL_LEVELS
+from app.utils.balance_cache import cache_stats, cached_balance
+from app.utils.balance_pool import calculate_balances_parallel
+from app.utils import presence_board
 
 router = APIRouter()
 
@@ -12,8 +21,9 @@ router = APIRouter()
 async def get_my_balance(
     start_date: date = Query(default=None),
     end_date: date = Query(default=None),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    detail: str = Query(default='days'),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
 ):
     """Get my hours balance"""
     
@@ -27,7 +37,10 @@ async def get_my_balance(
         else:
             end_date = today.replace(month=today.month + 1, day=1) - timedelta(days=1)
     
-    balance = calculate_user_balance(db, current_user.id, start_date, end_date)
+    if detail not in DETAIL_LEVELS:
+        raise HTTPException(status_code=400, detail="Invalid detail level")
+    
+    balance = await db.run_sync(cached_balance, current_user.id, start_date, end_date, detail)
     return balance
 
 @router.get("/balance/user/{user_id}")
@@ -35,8 +48,9 @@ async def get_user_balance(
     user_id: int,
     start_date: date = Query(default=None),
     end_date: date = Query(default=None),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin)
+    detail: str = Query(default='days'),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_admin_async)
 ):
     """Get user's hours balance (admin only)"""
     
@@ -49,15 +63,19 @@ async def get_user_balance(
         else:
             end_date = today.replace(month=today.month + 1, day=1) - timedelta(days=1)
     
-    balance = calculate_user_balance(db, user_id, start_date, end_date)
+    if detail not in DETAIL_LEVELS:
+        raise HTTPException(status_code=400, detail="Invalid detail level")
+    
+    balance = await db.run_sync(cached_balance, user_id, start_date, end_date, detail)
     return balance
 
 @router.get("/balance/all")
 async def get_all_balances(
     start_date: date = Query(default=None),
     end_date: date = Query(default=None),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin)
+    detail: str = Query(default='days'),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_admin_async)
 ):
     """Get hours balance for all employees (admin only)"""
     
@@ -70,16 +88,19 @@ async def get_all_balances(
         else:
             end_date = today.replace(month=today.month + 1, day=1) - timedelta(days=1)
     
+    if detail not in DETAIL_LEVELS:
+        raise HTTPException(status_code=400, detail="Invalid detail level")
+    
     # Get all active employees
-    employees = db.query(User).filter(
+    employees = (await db.execute(select(User).where(
         User.role == 'employee',
         User.is_active == True
-    ).all()
+    ))).scalars().all()
     
-    balances = []
-    for employee in employees:
-        balance = calculate_user_balance(db, employee.id, start_date, end_date)
-        balances.append(balance)
+    # One batched pass instead of a full set of queries per employee, with the
+    # vectorized kernel (same results as the per-day loop), calculated in the
+    # process pool so long periods don't block the event loop
+    balances = await calculate_balances_parallel(db, employees, start_date, end_date, detail, kernel='numpy')
     
     return {
         'period_start': str(start_date),
@@ -87,117 +108,186 @@ async def get_all_balances(
         'employees': balances
     }
 
+@router.get("/balance/cache-stats")
+async def get_balance_cache_stats(
+    current_user: User = Depends(get_current_admin_async)
+):
+    """Balance cache statistics of the worker handling the request (admin only)"""
+    
+    return cache_stats()
+
 @router.get("/today-status")
 async def get_today_status(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin)
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_admin_async)
 ):
     """Get today's employee status overview (admin only)"""
     
-    from app.models import ClockEvent, Absence, WorkSchedule
-    
-    today = datetime.now().date()
-    
-    # Get all active employees
-    employees = db.query(User).filter(
-        User.role == 'employee',
-        User.is_active == True
-    ).all()
-    
-    # Get today's clock events
-    clock_events = {
-        ce.user_id: ce
-        for ce in db.query(ClockEvent).filter(
-            ClockEvent.date == today
-        ).all()
+    # Every active employee with today's clock event, absence and schedule
+    board = await presence_board.current_board(db)
+    unchanged = presence_board.not_modified(request, response, board)
+    if unchanged is not None:
+        return unchanged
+
+    return _today_status(board)
+
+
+@router.get("/today-status/stream")
+async def stream_today_status(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_admin_async)
+):
+    """
+    today-status as Server-Sent Events (admin only)
+
+    A `snapshot` event with the today-status body, then a `delta` event per
+    change: the new stats and, per changed employee, the list they are in now
+    (None = in none) with their entry. A new day starts with a new snapshot.
+    Changes made on other workers arrive with their presence board rebuild.
+    """
+
+    await presence_board.current_board(db)
+    # The stream must not hold on to a pooled connection
+    await db.close()
+
+    # The slot is taken here, so a client over the cap gets the 503
+    changed = presence_board.subscribe()
+    if changed is None:
+        raise HTTPException(status_code=503, detail="Too many open status streams, please try again later")
+
+    events = _today_status_events(changed)
+    # The generator's finally releases the slot once it runs; a response
+    # dropped before its body started releases it when the generator goes
+    weakref.finalize(events, presence_board.unsubscribe, changed)
+
+    return StreamingResponse(
+        events,
+        media_type='text/event-stream',
+        # No caching or proxy buffering of the stream
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
+async def _today_status_events(changed: asyncio.Event):
+    # Sending waits for the client to take the data (backpressure); changes
+    # made meanwhile coalesce on the board and go out as one delta
+    try:
+        # The board as of the subscription: later changes all wake the stream
+        board = presence_board.latest()
+        yield _sse_event('snapshot', board.generation, _today_status(board))
+        sent = board
+
+        while True:
+            try:
+                await asyncio.wait_for(changed.wait(), timeout=settings.TODAY_STATUS_STREAM_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                # Keeps proxies from closing an idle stream
+                yield ': heartbeat\n\n'
+                continue
+            changed.clear()
+
+            board = presence_board.latest()
+            if board.generation == sent.generation:
+                continue
+            if board.day != sent.day:
+                yield _sse_event('snapshot', board.generation, _today_status(board))
+            else:
+                yield _sse_event('delta', board.generation, _today_status_delta(sent, board))
+            sent = board
+    finally:
+        presence_board.unsubscribe(changed)
+
+
+def _sse_event(event: str, generation: int, data: dict) -> str:
+    return f"event: {event}\nid: {generation}\ndata: {json.dumps(data)}\n\n"
+
+
+def _today_status_entry(employee):
+    """The today-status list an employee is in, with their entry ((None, None) = none)"""
+
+    # Check if on leave
+    if employee.absence_id is not None:
+        return 'on_leave', {
+            'user_id': employee.id,
+            'username': employee.username,
+            'email': employee.email,
+            'absence_type': employee.absence_type,
+            'start_date': str(employee.absence_start),
+            'end_date': str(employee.absence_end) if employee.absence_end else None,
+            'reason': employee.absence_reason
+        }
+
+    # Check if clocked in (any status)
+    if employee.clock_event_id is not None:
+        return 'clocked_in', {
+            'user_id': employee.id,
+            'username': employee.username,
+            'email': employee.email,
+            'clock_in': str(employee.clock_in),
+            'clock_out': str(employee.clock_out),
+            'came_by_car': employee.came_by_car,
+            'work_from_home': employee.work_from_home or False
+        }
+
+    # Check if expected today (on the work schedule for today's weekday)
+    if employee.scheduled:
+        return 'expected_missing', {
+            'user_id': employee.id,
+            'username': employee.username,
+            'email': employee.email
+        }
+
+    return None, None
+
+
+def _today_status(board) -> dict:
+    """The today-status body of a presence board"""
+
+    lists = {'clocked_in': [], 'on_leave': [], 'expected_missing': []}
+    for employee in board.rows:
+        category, entry = _today_status_entry(employee)
+        if category:
+            lists[category].append(entry)
+
+    return {
+        'date': str(board.day),
+        'generation': board.generation,
+        'stats': _today_status_stats(board, {category: len(entries) for category, entries in lists.items()}),
+        **lists
     }
-    
-    # Get active absences covering today
-    active_absences = db.query(Absence).filter(
-        Absence.status == 'approved',
-        Absence.start_date <= today
-    ).all()
-    
-    absence_map = {}
-    for absence in active_absences:
-        # Check if absence covers today
-        if absence.end_date is None or absence.end_date >= today:
-            absence_map[absence.user_id] = {
-                'type': absence.type,
-                'start_date': str(absence.start_date),
-                'end_date': str(absence.end_date) if absence.end_date else None,
-                'reason': absence.reason
-            }
-    
-    # Get work schedules
-    work_schedules = {}
-    for ws in db.query(WorkSchedule).all():
-        if ws.user_id not in work_schedules:
-            work_schedules[ws.user_id] = []
-        work_schedules[ws.user_id].append(ws.day_of_week)
-    
-    # Categorize employees
-    clocked_in = []
-    on_leave = []
-    expected_missing = []
-
-    today_weekday = today.weekday()  # Python: 0=Monday
-
-    for employee in employees:
-        user_id = employee.id
-
-        # Check if on leave
-        if user_id in absence_map:
-            on_leave.append({
-                'user_id': user_id,
-                'username': employee.username,
-                'email': employee.email,
-                'absence_type': absence_map[user_id]['type'],
-                'start_date': absence_map[user_id]['start_date'],
-                'end_date': absence_map[user_id]['end_date'],
-                'reason': absence_map[user_id]['reason']
-            })
-            continue
-
-        # Check if clocked in
-        if user_id in clock_events:
-            ce = clock_events[user_id]
-            clocked_in.append({
-                'user_id': user_id,
-                'username': employee.username,
-                'email': employee.email,
-                'clock_in': str(ce.clock_in),
-                'clock_out': str(ce.clock_out),
-                'came_by_car': ce.came_by_car,
-                'work_from_home': ce.work_from_home or False
-            })
-            continue
-
-        # Check if expected today
-        # Get JavaScript day numbers (0=Sunday, 1=Monday, etc.)
-        js_scheduled_days = work_schedules.get(user_id, [])
-
-        # Convert to Python day numbers (0=Monday, 1=Tuesday, etc.)
-        py_scheduled_days = [(js_day - 1) % 7 for js_day in js_scheduled_days]
-
-        print(f"[CONVERSION] User {employee.username}: JS days: {js_scheduled_days} → Python days: {py_scheduled_days}, Today Python weekday: {today_weekday}")
-
-        if today_weekday in py_scheduled_days:
-            expected_missing.append({
-                'user_id': user_id,
-                'username': employee.username,
-                'email': employee.email
-            })
-    
+
+
+def _today_status_delta(old, new) -> dict:
+    """The employees whose today-status entry differs between two boards of the same day"""
+
+    old_rows = {row.id: row for row in old.rows}
+    new_rows = {row.id: row for row in new.rows}
+    counts = {'clocked_in': 0, 'on_leave': 0, 'expected_missing': 0}
+    changes = []
+
+    for user_id, row in new_rows.items():
+        category, entry = _today_status_entry(row)
+        if category:
+            counts[category] += 1
+        if old_rows.get(user_id) != row:
+            changes.append({'user_id': user_id, 'category': category, 'entry': entry})
+    for user_id in old_rows.keys() - new_rows.keys():
+        changes.append({'user_id': user_id, 'category': None, 'entry': None})
+
+    return {
+        'date': str(new.day),
+        'generation': new.generation,
+        'stats': _today_status_stats(new, counts),
+        'changes': changes
+    }
+
+
+def _today_status_stats(board, counts: dict) -> dict:
     return {
-        'date': str(today),
-        'stats': {
-            'total_employees': len(employees),
-            'clocked_in': len(clocked_in),
-            'on_leave': len(on_leave),
-            'expected_missing': len(expected_missing)
-        },
-        'clocked_in': clocked_in,
-        'on_leave': on_leave,
-        'expected_missing': expected_missing
+        'total_employees': len(board.rows),
+        'clocked_in': counts['clocked_in'],
+        'on_leave': counts['on_leave'],
+        'expected_missing': counts['expected_missing']
     }
\ No newline at end of file
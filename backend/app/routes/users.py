@@ -1,3 +1,4 @@
+from collections import defaultdict
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from typing import List
@@ -5,7 +6,8 @@ from app.database import get_db
 from app.models import User, WorkSchedule
 from app.schemas import UserResponse, UserCreate, UserUpdate, UserDetail, WorkScheduleCreate
 from app.dependencies import get_current_user, get_current_admin
-from app.security import get_password_hash
+from app.utils.password_pool import hash_password
+from app.utils import balance_sync, presence_board, principal_cache, token_versions
 
 router = APIRouter()
 
@@ -16,14 +18,17 @@ async def get_users(
 ):
     """Get all users (admin only)"""
     users = db.query(User).all()
-    
+
+    # Work schedules of all users in one query
+    work_days_by_user = defaultdict(list)
+    for ws in db.query(WorkSchedule).order_by(WorkSchedule.id).all():
+        work_days_by_user[ws.user_id].append(ws.day_of_week)
+
     # Add work_days to each user
     result = []
     for user in users:
-        # Get work schedule (same pattern as get_user_detail)
-        work_schedules = db.query(WorkSchedule).filter(WorkSchedule.user_id == user.id).all()
-        work_days = [ws.day_of_week for ws in work_schedules]
-        
+        work_days = work_days_by_user[user.id]
+
         user_dict = {
             "id": user.id,
             "username": user.username,
@@ -85,7 +90,7 @@ async def create_user(
     new_user = User(
         username=user_data.username,
         email=user_data.email,
-        password_hash=get_password_hash(user_data.password),
+        password_hash=await hash_password(user_data.password),
         role=user_data.role,
         is_active=True,
         expected_weekly_hours=user_data.expected_weekly_hours,
@@ -96,6 +101,7 @@ async def create_user(
     db.add(new_user)
     db.commit()
     db.refresh(new_user)
+    presence_board.user_changed(db, new_user.id)
     
     return new_user
 
@@ -153,8 +159,11 @@ async def set_work_schedule(
         work_day = WorkSchedule(user_id=user_id, day_of_week=day)
         db.add(work_day)
 
-    user.force_logout = True
+    token_versions.revoke(user)
     db.commit()
+    token_versions.revoked(user)
+    principal_cache.invalidate(user_id)
+    balance_sync.user_schedule_changed(db, user_id)
 
     return {"message": "Work schedule updated", "days": schedule.days}
 
@@ -183,14 +192,22 @@ async def update_user(
     if update_data.is_active is not None:
         user.is_active = update_data.is_active
     
+    hours_changed = False
     if update_data.expected_weekly_hours is not None:
+        hours_changed = user.expected_weekly_hours is None or float(user.expected_weekly_hours) != update_data.expected_weekly_hours
         user.expected_weekly_hours = update_data.expected_weekly_hours
     
     if update_data.has_km_compensation is not None:
         user.has_km_compensation = update_data.has_km_compensation
 
-    user.force_logout = True
+    token_versions.revoke(user)
     db.commit()
     db.refresh(user)
+    token_versions.revoked(user)
+    principal_cache.invalidate(user_id)
+    presence_board.user_changed(db, user_id)
+
+    if hours_changed:
+        balance_sync.user_schedule_changed(db, user_id)
 
     return user
\ No newline at end of file
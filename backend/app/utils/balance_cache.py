@@ -0,0 +1,94 @@
+"""
+In-memory LRU cache for balance results.
+
+Results are cached per worker process, keyed by (user_id, start_date,
+end_date, detail) together with the user's balance version and the
+company-wide version. Every write that changes a balance bumps a version
+(see app.utils.balance_sync), so older entries are simply never looked up
+again and drop out of the LRU. The versions live in the database, so a write
+handled by one worker invalidates the caches of all workers.
+"""
+import threading
+from collections import OrderedDict
+from datetime import date
+from typing import Dict
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.models import BalanceVersion
+from app.utils.ledger import ledger_balance
+
+# Version row for changes that affect everyone (company holidays)
+GLOBAL_VERSION_ID = 0
+
+_lock = threading.Lock()
+_entries = OrderedDict()
+_stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+
+def cached_balance(db: Session, user_id: int, start_date: date, end_date: date, detail: str = 'days') -> Dict:
+    """ledger_balance() through the cache. The returned dict is shared, don't modify it."""
+
+    versions = dict(
+        db.query(BalanceVersion.user_id, BalanceVersion.version).filter(
+            BalanceVersion.user_id.in_([user_id, GLOBAL_VERSION_ID])
+        ).all()
+    )
+    key = (
+        user_id, start_date, end_date, detail,
+        versions.get(user_id, 0), versions.get(GLOBAL_VERSION_ID, 0)
+    )
+
+    with _lock:
+        result = _entries.get(key)
+        if result is not None:
+            _entries.move_to_end(key)
+            _stats['hits'] += 1
+            return result
+        _stats['misses'] += 1
+
+    # Computed outside the lock; a write meanwhile bumps the version, so a
+    # stale result ends up under a key that is no longer used
+    result = ledger_balance(db, user_id, start_date, end_date, detail)
+
+    with _lock:
+        _entries[key] = result
+        _entries.move_to_end(key)
+        while len(_entries) > settings.BALANCE_CACHE_SIZE:
+            _entries.popitem(last=False)
+            _stats['evictions'] += 1
+
+    return result
+
+
+def bump_user_version(db: Session, user_id: int):
+    """Invalidate cached balances of one user (not committed)."""
+    _bump(db, user_id)
+
+
+def bump_global_version(db: Session):
+    """Invalidate all cached balances (not committed)."""
+    _bump(db, GLOBAL_VERSION_ID)
+
+
+def cache_stats() -> Dict:
+    """Hit/miss/eviction counters of this worker's cache."""
+
+    with _lock:
+        lookups = _stats['hits'] + _stats['misses']
+        return {
+            'size': len(_entries),
+            'max_size': settings.BALANCE_CACHE_SIZE,
+            'hits': _stats['hits'],
+            'misses': _stats['misses'],
+            'evictions': _stats['evictions'],
+            'hit_rate': round(_stats['hits'] / lookups, 3) if lookups else 0.0
+        }
+
+
+def _bump(db: Session, version_id: int):
+    updated = db.query(BalanceVersion).filter(
+        BalanceVersion.user_id == version_id
+    ).update({BalanceVersion.version: BalanceVersion.version + 1}, synchronize_session=False)
+    if not updated:
+        db.add(BalanceVersion(user_id=version_id, version=1))
+        db.flush()
@@ -0,0 +1,220 @@
+"""
+NumPy version of the per-day balance calculation.
+
+Gives exactly the same day entries and totals as iter_day_entries, but works
+on arrays covering the whole period instead of looping over days in Python:
+one slot per calendar day for the weekday/holiday masks, the absence type and
+the clocked time. Selected with kernel='numpy' in app.utils.calculations.
+"""
+from datetime import date, time, timedelta
+from typing import Dict, List, Optional, Set
+import numpy as np
+from app.models import ClockEvent, Absence
+from app.utils.calculations import EXTRA_DAY_TYPES, MISSING_DAY_TYPES, sick_carry_in_date
+
+# Day type codes, index into DAY_TYPES
+DAY_TYPES = [
+    'off_day',
+    'extra_day',
+    'company_holiday',
+    'company_holiday_worked',
+    'vacation',
+    'on_schedule',
+    'scheduled_deficit',
+    'overtime',
+    'sick_first',
+    'sick_continuation',
+    'personal_first',
+    'personal_continuation',
+]
+DAY_TYPE_CODES = {day_type: code for code, day_type in enumerate(DAY_TYPES)}
+
+EXTRA_CODES = [DAY_TYPE_CODES[day_type] for day_type in EXTRA_DAY_TYPES]
+MISSING_CODES = [DAY_TYPE_CODES[day_type] for day_type in MISSING_DAY_TYPES]
+
+# Types of scheduled working days, which expect hours_per_day
+SCHEDULED_CODES = [
+    DAY_TYPE_CODES[day_type] for day_type in (
+        'on_schedule', 'scheduled_deficit', 'overtime',
+        'sick_first', 'sick_continuation', 'personal_first', 'personal_continuation'
+    )
+]
+
+# Absence type codes per day (0 = no absence)
+ABSENCE_CODES = {'vacation': 1, 'sick': 2, 'personal': 3}
+
+
+class DayArrays:
+    """Per-day results of a period as parallel arrays (unrounded, like the day entries)."""
+
+    def __init__(self, start_date: date, type_codes, hours_worked, hours_expected, balance_change, parking, km):
+        self.start_date = start_date
+        self.type_codes = type_codes
+        self.hours_worked = hours_worked
+        self.hours_expected = hours_expected
+        self.balance_change = balance_change
+        self.parking = parking
+        self.km = km
+
+    def entries(self) -> List[tuple]:
+        """The same (date, type, hours_worked, hours_expected, balance_change, parking, km) tuples as iter_day_entries."""
+
+        days = [self.start_date + timedelta(days=offset) for offset in range(len(self.type_codes))]
+        return list(zip(
+            days,
+            [DAY_TYPES[code] for code in self.type_codes.tolist()],
+            self.hours_worked.tolist(),
+            self.hours_expected.tolist(),
+            self.balance_change.tolist(),
+            self.parking.tolist(),
+            self.km.tolist(),
+        ))
+
+    def total_values(self) -> Dict[str, List[float]]:
+        """Same as day_total_values(entries()), without building the entries."""
+
+        extra = np.isin(self.type_codes, EXTRA_CODES)
+        missing = np.isin(self.type_codes, MISSING_CODES)
+        return {
+            'hours_worked': self.hours_worked.tolist(),
+            'extra_hours': self.balance_change[extra].tolist(),
+            'missing_hours': (-self.balance_change[missing]).tolist(),
+            'parking_cost': self.parking.tolist(),
+            'km_driven': self.km.tolist(),
+        }
+
+
+def day_arrays(
+    scheduled_days: Set[int],
+    hours_per_day: float,
+    clock_events: Dict[date, ClockEvent],
+    absence_records: List[Absence],
+    holidays: Set[date],
+    start_date: date,
+    end_date: date,
+    sick_carry_in: Optional[bool] = None
+) -> DayArrays:
+    """Vectorized iter_day_entries; same arguments, results as a DayArrays."""
+
+    # A reversed range has no days (like iter_day_entries), not a negative count
+    day_count = max((end_date - start_date).days + 1, 0)
+    first_ordinal = start_date.toordinal()
+
+    # date.toordinal() is 1 for 0001-01-01, a Monday
+    weekdays = (np.arange(first_ordinal, first_ordinal + day_count) - 1) % 7
+    is_scheduled = np.isin(weekdays, list(scheduled_days))
+
+    is_holiday = np.zeros(day_count, dtype=bool)
+    holiday_offsets = [(h - start_date).days for h in holidays if start_date <= h <= end_date]
+    is_holiday[holiday_offsets] = True
+
+    # Later-starting absences overwrite earlier ones where they overlap
+    absence_codes = np.zeros(day_count, dtype=np.int8)
+    for absence in sorted(absence_records, key=lambda absence: absence.start_date):
+        actual_end = absence.end_date if absence.end_date else end_date
+        if absence.start_date > end_date or actual_end < start_date:
+            continue
+        first = max((absence.start_date - start_date).days, 0)
+        last = min((actual_end - start_date).days, day_count - 1)
+        absence_codes[first:last + 1] = ABSENCE_CODES.get(absence.type, 0)
+
+    # Clocked time in microseconds, as timedelta.total_seconds() works it out
+    clocked = [
+        (
+            (day - start_date).days,
+            _microseconds(ce.clock_out) - _microseconds(ce.clock_in),
+            float(ce.parking_cost) if ce.parking_cost else 0.0,
+            float(ce.km_driven) if ce.km_driven else 0.0
+        )
+        for day, ce in clock_events.items()
+        if start_date <= day <= end_date
+    ]
+    has_clock = np.zeros(day_count, dtype=bool)
+    clocked_microseconds = np.zeros(day_count, dtype=np.int64)
+    clock_parking = np.zeros(day_count)
+    clock_km = np.zeros(day_count)
+    if clocked:
+        offsets, microseconds, parking_costs, km_driven = zip(*clocked)
+        offsets = list(offsets)
+        has_clock[offsets] = True
+        clocked_microseconds[offsets] = microseconds
+        clock_parking[offsets] = parking_costs
+        clock_km[offsets] = km_driven
+
+    is_vacation = absence_codes == ABSENCE_CODES['vacation']
+    is_sick = (absence_codes == ABSENCE_CODES['sick']) | (absence_codes == ABSENCE_CODES['personal'])
+
+    # Clocked hours count on every day except vacation days (holidays take precedence)
+    counts_clock = has_clock & (is_holiday | ~is_vacation)
+    hours = clocked_microseconds / 10**6 / 3600
+    hours_worked = np.where(counts_clock, hours, 0.0)
+    parking = np.where(counts_clock, clock_parking, 0.0)
+    km = np.where(counts_clock, clock_km, 0.0)
+
+    # Sick continuation: a sick working day continues the streak when the
+    # previous scheduled working day (vacation included) was a sick day too
+    working = np.flatnonzero(is_scheduled & ~is_holiday)
+    sick_on_working = is_sick[working]
+    if sick_carry_in is None:
+        sick_carry_in = sick_carry_in_date(
+            absence_records, scheduled_days, holidays, start_date, end_date
+        ) is not None
+    previous_sick = np.concatenate(([bool(sick_carry_in)], sick_on_working[:-1]))
+    is_continuation = np.zeros(day_count, dtype=bool)
+    is_continuation[working] = sick_on_working & previous_sick
+
+    is_personal = absence_codes == ABSENCE_CODES['personal']
+    regular = is_scheduled & ~is_holiday & ~is_vacation & ~is_sick
+
+    type_codes = np.select(
+        [
+            is_holiday & has_clock,
+            is_holiday,
+            is_vacation,
+            is_scheduled & is_sick & is_continuation & is_personal,
+            is_scheduled & is_sick & is_continuation,
+            is_scheduled & is_sick & is_personal,
+            is_scheduled & is_sick,
+            regular & (hours_worked < hours_per_day),
+            regular & (hours_worked > hours_per_day),
+            regular,
+            hours_worked > 0,
+        ],
+        [
+            DAY_TYPE_CODES['company_holiday_worked'],
+            DAY_TYPE_CODES['company_holiday'],
+            DAY_TYPE_CODES['vacation'],
+            DAY_TYPE_CODES['personal_continuation'],
+            DAY_TYPE_CODES['sick_continuation'],
+            DAY_TYPE_CODES['personal_first'],
+            DAY_TYPE_CODES['sick_first'],
+            DAY_TYPE_CODES['scheduled_deficit'],
+            DAY_TYPE_CODES['overtime'],
+            DAY_TYPE_CODES['on_schedule'],
+            DAY_TYPE_CODES['extra_day'],
+        ],
+        default=DAY_TYPE_CODES['off_day']
+    )
+
+    hours_expected = np.where(
+        np.isin(type_codes, SCHEDULED_CODES) | ((type_codes == DAY_TYPE_CODES['vacation']) & is_scheduled),
+        hours_per_day,
+        0.0
+    )
+
+    balance_change = np.zeros(day_count)
+    gains = np.isin(type_codes, [DAY_TYPE_CODES['company_holiday_worked'], DAY_TYPE_CODES['extra_day']])
+    balance_change[gains] = hours_worked[gains]
+    first_sick = np.isin(type_codes, [DAY_TYPE_CODES['sick_first'], DAY_TYPE_CODES['personal_first']])
+    balance_change[first_sick] = -hours_per_day
+    deficit = type_codes == DAY_TYPE_CODES['scheduled_deficit']
+    balance_change[deficit] = -(hours_per_day - hours_worked[deficit])
+    overtime = type_codes == DAY_TYPE_CODES['overtime']
+    balance_change[overtime] = hours_worked[overtime] - hours_per_day
+
+    return DayArrays(start_date, type_codes, hours_worked, hours_expected, balance_change, parking, km)
+
+
+def _microseconds(moment: time) -> int:
+    return ((moment.hour * 60 + moment.minute) * 60 + moment.second) * 10**6 + moment.microsecond
+
@@ -0,0 +1,131 @@
+"""
+Process pool for workforce-wide balance reports.
+
+The balance calculation is CPU-bound Python, so a report over all employees
+keeps a worker busy (and its event loop blocked) for as long as it runs.
+calculate_balances_parallel() loads the inputs in the request process with
+the batched queries of calculate_balances, splits the employees into shards
+and computes them in a ProcessPoolExecutor. Workers only receive plain,
+picklable data (column rows, dates, a small user tuple), never ORM objects or
+a session. The pool is created on first use and reused across requests;
+BALANCE_POOL_WORKERS sets its size, 0 computes in the request process.
+"""
+import asyncio
+import multiprocessing
+import threading
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date
+from typing import Dict, Iterable, List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
+from app.models import User
+from app.utils.calculations import _balance_from_records, calculate_balances, load_balance_records
+
+# The User fields the calculation reads
+BalanceUser = namedtuple('BalanceUser', ['id', 'username', 'expected_weekly_hours'])
+
+_pool_lock = threading.Lock()
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_pool() -> ProcessPoolExecutor:
+    """The shared pool, started on first use."""
+
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn instead of fork: the API process runs threads (scheduler, thread pool)
+            _pool = ProcessPoolExecutor(
+                max_workers=settings.BALANCE_POOL_WORKERS,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+            print(f"[BALANCE POOL] Started {settings.BALANCE_POOL_WORKERS} worker processes")
+        return _pool
+
+
+def shutdown_pool():
+    """Stop the pool's worker processes (app shutdown)."""
+
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(cancel_futures=True)
+            _pool = None
+
+
+async def calculate_balances_parallel(
+    db: AsyncSession,
+    users: Iterable[User],
+    start_date: date,
+    end_date: date,
+    detail: str = 'days',
+    kernel: str = 'python'
+) -> List[Dict]:
+    """calculate_balances() with the per-user calculations spread over the process pool."""
+
+    users = list(users)
+    if settings.BALANCE_POOL_WORKERS < 1 or len(users) < 2:
+        return await db.run_sync(calculate_balances, users, start_date, end_date, detail, kernel)
+
+    js_scheduled_days, clock_events, absence_records, holidays = await db.run_sync(
+        load_balance_records, [user.id for user in users], start_date, end_date
+    )
+
+    balances = [None] * len(users)
+    jobs = []
+    for position, user in enumerate(users):
+        if user.role != 'employee':
+            balances[position] = {
+                'error': 'User not found or not an employee',
+                'extra_hours': 0,
+                'missing_hours': 0,
+                'balance': 0
+            }
+            continue
+        jobs.append((
+            position,
+            BalanceUser(user.id, user.username, user.expected_weekly_hours),
+            js_scheduled_days.get(user.id, set()),
+            clock_events.get(user.id, {}),
+            absence_records.get(user.id, [])
+        ))
+
+    # One contiguous shard per worker process
+    shard_count = min(settings.BALANCE_POOL_WORKERS, len(jobs)) or 1
+    shard_size = -(-len(jobs) // shard_count)
+    shards = [jobs[i:i + shard_size] for i in range(0, len(jobs), shard_size)]
+
+    try:
+        pool = get_pool()
+        results = await asyncio.gather(*(
+            asyncio.wrap_future(pool.submit(_calculate_shard, shard, holidays, start_date, end_date, detail, kernel))
+            for shard in shards
+        ))
+    except BrokenProcessPool:
+        # A worker died (e.g. killed for memory); start a fresh pool next time
+        print("[BALANCE POOL] Pool broken, computing in the request process")
+        shutdown_pool()
+        results = [_calculate_shard(shard, holidays, start_date, end_date, detail, kernel) for shard in shards]
+
+    for shard_results in results:
+        for position, balance in shard_results:
+            balances[position] = balance
+
+    return balances
+
+
+def _calculate_shard(jobs: List[tuple], holidays, start_date: date, end_date: date, detail: str, kernel: str) -> List[tuple]:
+    """Worker side: (position, balance) for each job of the shard."""
+
+    return [
+        (
+            position,
+            _balance_from_records(
+                user, js_days, user_clock_events, user_absences, holidays, start_date, end_date,
+                detail=detail, kernel=kernel
+            )
+        )
+        for position, user, js_days, user_clock_events, user_absences in jobs
+    ]
@@ -0,0 +1,46 @@
+"""
+Keeps derived balance data in step with the records it is built from.
+
+Route handlers call these after committing a change to clock events,
+absences, work schedules or company holidays. They refresh the daily ledger
+and its checkpoints and bump the balance cache versions in one transaction,
+and update the user's row on this worker's presence board when the change
+covers today. Balance reads never write; this is where the ledger is kept
+up to date (plus ledger.materialize_ledgers, run by the scheduler).
+"""
+from datetime import date
+from typing import Iterable, Optional, Tuple
+from sqlalchemy.orm import Session
+from app.utils import balance_cache, ledger, presence_board
+
+
+def user_days_changed(db: Session, user_id: int, start_date: date, end_date: Optional[date] = None):
+    """A user's days from start_date to end_date changed (end_date=None: open-ended)."""
+    ledger.refresh_ledger(db, user_id, start_date, end_date)
+    balance_cache.bump_user_version(db, user_id)
+    db.commit()
+    presence_board.user_changed(db, user_id, start_date, end_date)
+
+
+def absence_changed(db: Session, user_id: int, *spans: Tuple[date, Optional[date]]):
+    """An absence was added, edited or removed; spans are the (start, end) it covered before and after."""
+    start_date = min(start for start, _ in spans)
+    ends = [end for _, end in spans]
+    end_date = None if None in ends else max(ends)
+    user_days_changed(db, user_id, start_date, end_date)
+
+
+def user_schedule_changed(db: Session, user_id: int):
+    """Work schedule or expected weekly hours changed, which affects every day of the user."""
+    ledger.rebuild_user_ledger(db, user_id)
+    balance_cache.bump_user_version(db, user_id)
+    db.commit()
+    presence_board.user_changed(db, user_id)
+
+
+def holidays_changed(db: Session, holiday_dates: Iterable[date]):
+    """Company holidays were added or removed on the given dates."""
+    for holiday_date in holiday_dates:
+        ledger.refresh_holiday(db, holiday_date)
+    balance_cache.bump_global_version(db)
+    db.commit()
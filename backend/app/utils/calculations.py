@@ -1,13 +1,18 @@
+from collections import defaultdict
 from datetime import date, datetime, timedelta
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, List, Optional, Set
+from sqlalchemy import or_
 from sqlalchemy.orm import Session
 from app.models import User, WorkSchedule, ClockEvent, Absence, CompanyHoliday
+from app.utils.workdays import WorkdayIndex
 
 def calculate_user_balance(
     db: Session,
     user_id: int,
     start_date: date,
-    end_date: date
+    end_date: date,
+    detail: str = 'days',
+    kernel: str = 'python'
 ) -> Dict:
     """
     Calculate hours balance for a user in given period.
@@ -31,21 +36,8 @@ def calculate_user_balance(
     # These are JavaScript day numbers (0=Sunday, 1=Monday, etc.)
     js_scheduled_days = {ws.day_of_week for ws in scheduled_days_records}
 
-    # Convert to Python day numbers (0=Monday, 1=Tuesday, etc.)
-    # Formula: (js_day - 1) % 7
-    scheduled_days = {(js_day - 1) % 7 for js_day in js_scheduled_days}
-
-    print(f"[CONVERSION] calculate_user_balance user_id={user_id}: JS days: {js_scheduled_days} → Python days: {scheduled_days}")
-
-    if not scheduled_days or not user.expected_weekly_hours:
-        return {
-            'error': 'No work schedule or expected hours set',
-            'extra_hours': 0,
-            'missing_hours': 0,
-            'balance': 0
-        }
-
-    hours_per_day = float(user.expected_weekly_hours) / len(scheduled_days)
+    if not js_scheduled_days or not user.expected_weekly_hours:
+        return _balance_from_records(user, js_scheduled_days, {}, [], set(), start_date, end_date, detail=detail, kernel=kernel)
 
     clock_events = {
         ce.date: ce
@@ -56,26 +48,123 @@ def calculate_user_balance(
         ).all()
     }
 
+    # Later-starting absences take precedence where absences overlap
     absence_records = db.query(Absence).filter(
         Absence.user_id == user_id,
-        Absence.status == 'approved'
-    ).all()
-    
-    absence_dates = {}
-    for absence in absence_records:
+        Absence.status == 'approved',
+        *absence_overlap(start_date, end_date)
+    ).order_by(Absence.start_date).all()
 
-        actual_end = absence.end_date if absence.end_date else end_date
+    holidays = {
+        h.date
+        for h in db.query(CompanyHoliday).filter(
+            CompanyHoliday.date >= start_date,
+            CompanyHoliday.date <= end_date
+        ).all()
+    }
 
-        if absence.start_date > end_date or actual_end < start_date:
+    return _balance_from_records(
+        user, js_scheduled_days, clock_events, absence_records, holidays, start_date, end_date,
+        detail=detail, kernel=kernel
+    )
+
+
+def calculate_balances(
+    db: Session,
+    users: Iterable[User],
+    start_date: date,
+    end_date: date,
+    detail: str = 'days',
+    kernel: str = 'python'
+) -> List[Dict]:
+    """
+    Calculate hours balances for many users in one pass.
+
+    Loads work schedules, clock events, absences and company holidays once for
+    the whole user set and period, groups them per user in memory and runs the
+    same per-user calculation as calculate_user_balance. Results are returned
+    in the order of `users`.
+    """
+
+    users = list(users)
+    user_ids = [user.id for user in users]
+    if not user_ids:
+        return []
+
+    js_scheduled_days, clock_events, absence_records, holidays = load_balance_records(
+        db, user_ids, start_date, end_date
+    )
+
+    balances = []
+    for user in users:
+        if user.role != 'employee':
+            balances.append({
+                'error': 'User not found or not an employee',
+                'extra_hours': 0,
+                'missing_hours': 0,
+                'balance': 0
+            })
             continue
 
-        current = max(absence.start_date, start_date)
-        final = min(actual_end, end_date)
-        
-        while current <= final:
-            absence_dates[current] = absence.type
-            current += timedelta(days=1)
-    
+        balances.append(_balance_from_records(
+            user,
+            js_scheduled_days.get(user.id, set()),
+            clock_events.get(user.id, {}),
+            absence_records.get(user.id, []),
+            holidays,
+            start_date,
+            end_date,
+            detail=detail,
+            kernel=kernel
+        ))
+
+    return balances
+
+
+def load_balance_records(db: Session, user_ids: List[int], start_date: date, end_date: date) -> tuple:
+    """
+    Load the balance inputs of many users for a period, grouped per user.
+
+    Returns (js_scheduled_days, clock_events, absence_records, holidays):
+    sets of JS day numbers and lists of absences keyed by user id, clock events
+    keyed by user id and date, and the holiday dates. Clock events and
+    absences are plain column rows rather than ORM objects, so they are cheap
+    to load and can be pickled (see app.utils.balance_pool).
+    """
+
+    js_scheduled_days = defaultdict(set)
+    for ws in db.query(WorkSchedule).filter(WorkSchedule.user_id.in_(user_ids)).all():
+        js_scheduled_days[ws.user_id].add(ws.day_of_week)
+
+    # Only these fields are used by the day loop
+    clock_events = defaultdict(dict)
+    for ce in db.query(
+        ClockEvent.user_id,
+        ClockEvent.date,
+        ClockEvent.clock_in,
+        ClockEvent.clock_out,
+        ClockEvent.parking_cost,
+        ClockEvent.km_driven
+    ).filter(
+        ClockEvent.user_id.in_(user_ids),
+        ClockEvent.date >= start_date,
+        ClockEvent.date <= end_date
+    ).all():
+        clock_events[ce.user_id][ce.date] = ce
+
+    absence_records = defaultdict(list)
+    for absence in db.query(
+        Absence.user_id,
+        Absence.start_date,
+        Absence.end_date,
+        Absence.type
+    ).filter(
+        Absence.user_id.in_(user_ids),
+        Absence.status == 'approved',
+        *absence_overlap(start_date, end_date)
+    ).order_by(Absence.start_date).all():
+        absence_records[absence.user_id].append(absence)
+
     holidays = {
         h.date
         for h in db.query(CompanyHoliday).filter(
@@ -84,15 +173,299 @@ def calculate_user_balance(
         ).all()
     }
 
-    extra_hours = 0.0
-    missing_hours = 0.0
-    total_parking = 0.0
-    total_km = 0.0
-    total_hours_worked = 0.0  # Track actual hours worked
-    details = []
+    return dict(js_scheduled_days), dict(clock_events), dict(absence_records), holidays
 
-    # Check if there's an ongoing sick absence from before the period
-    last_sick_date = None
+
+def absence_overlap(start_date: date, end_date: date) -> tuple:
+    """
+    Filter for absences overlapping the period (open-ended ones run on).
+
+    This also covers the sick-streak carry-in, which only looks at absences
+    that started before the period and still run into it.
+    """
+    return (
+        Absence.start_date <= end_date,
+        or_(Absence.end_date == None, Absence.end_date >= start_date)
+    )
+
+
+# Day types that add to extra hours / missing hours
+EXTRA_DAY_TYPES = {'company_holiday_worked', 'overtime', 'extra_day'}
+MISSING_DAY_TYPES = {'scheduled_deficit', 'sick_first', 'personal_first'}
+
+# Implementations of the per-day calculation (see _balance_from_records)
+KERNELS = ('python', 'numpy')
+
+# Levels of the per-day details list: every day, only the days that changed
+# the balance, or no details at all
+DETAIL_LEVELS = ('days', 'anomalies', 'none')
+
+# Period totals, named like the daily_ledger / balance_checkpoints columns
+TOTAL_FIELDS = ('hours_worked', 'extra_hours', 'missing_hours', 'parking_cost', 'km_driven')
+
+
+def _balance_from_records(
+    user: User,
+    js_scheduled_days: Set[int],
+    clock_events: Dict[date, ClockEvent],
+    absence_records: List[Absence],
+    holidays: Set[date],
+    start_date: date,
+    end_date: date,
+    sick_carry_in: Optional[bool] = None,
+    detail: str = 'days',
+    kernel: str = 'python'
+) -> Dict:
+    """
+    Run the balance calculation on records that were already loaded for this user.
+
+    kernel picks the day loop: 'python' (iter_day_entries) or 'numpy'
+    (app.utils.balance_kernel), which gives identical results.
+    """
+
+    user_id = user.id
+
+    # Convert to Python day numbers (0=Monday, 1=Tuesday, etc.)
+    # Formula: (js_day - 1) % 7
+    scheduled_days = {(js_day - 1) % 7 for js_day in js_scheduled_days}
+
+    print(f"[CONVERSION] calculate_user_balance user_id={user_id}: JS days: {js_scheduled_days} → Python days: {scheduled_days}")
+
+    if not scheduled_days or not user.expected_weekly_hours:
+        return {
+            'error': 'No work schedule or expected hours set',
+            'extra_hours': 0,
+            'missing_hours': 0,
+            'balance': 0
+        }
+
+    hours_per_day = float(user.expected_weekly_hours) / len(scheduled_days)
+
+    if kernel == 'numpy':
+        from app.utils.balance_kernel import day_arrays
+
+        arrays = day_arrays(
+            scheduled_days, hours_per_day, clock_events, absence_records, holidays,
+            start_date, end_date, sick_carry_in
+        )
+        if detail == 'none':
+            return balance_summary(
+                user, scheduled_days, hours_per_day, arrays.total_values(), [], start_date, end_date
+            )
+        entries = arrays.entries()
+    else:
+        entries = iter_day_entries(
+            scheduled_days, hours_per_day, clock_events, absence_records, holidays,
+            start_date, end_date, sick_carry_in
+        )
+    return summarize_day_entries(user, scheduled_days, hours_per_day, entries, start_date, end_date, detail)
+
+
+def summarize_day_entries(
+    user: User,
+    scheduled_days: Set[int],
+    hours_per_day: float,
+    entries: Iterable[tuple],
+    start_date: date,
+    end_date: date,
+    detail: str = 'days'
+) -> Dict:
+    """
+    Add up day entries (in date order) into the balance response.
+
+    detail picks which days get a details entry (see DETAIL_LEVELS); with
+    'none' no day dicts are built at all.
+    """
+
+    entries = list(entries)
+    if detail == 'none':
+        details = []
+    else:
+        details = [
+            day_detail(day, day_type, hours_worked, hours_expected, balance_change)
+            for day, day_type, hours_worked, hours_expected, balance_change, _, _ in entries
+            if detail == 'days' or balance_change
+        ]
+
+    return balance_summary(
+        user, scheduled_days, hours_per_day, day_total_values(entries), details, start_date, end_date
+    )
+
+
+def balance_summary(
+    user: User,
+    scheduled_days: Set[int],
+    hours_per_day: float,
+    values: Dict[str, List[float]],
+    details: List[Dict],
+    start_date: date,
+    end_date: date
+) -> Dict:
+    """Build the balance response from the per-day amounts of each total (see day_total_values)."""
+
+    totals = {field: running_total(values[field]) for field in TOTAL_FIELDS}
+    return balance_response(user, scheduled_days, hours_per_day, totals, details, start_date, end_date)
+
+
+def running_total(amounts: Iterable[float]) -> float:
+    """
+    Add up amounts one by one, in order, the way the day loop always has.
+
+    Float addition is not associative, so the order matters for the last
+    digit; any other summation can move a rounded total by a cent.
+    """
+
+    total = 0.0
+    for amount in amounts:
+        total += amount
+    return total
+
+
+def balance_response(
+    user: User,
+    scheduled_days: Set[int],
+    hours_per_day: float,
+    totals: Dict[str, float],
+    details: List[Dict],
+    start_date: date,
+    end_date: date
+) -> Dict:
+    """Build the balance response from the period totals, keyed by TOTAL_FIELDS."""
+
+    total_hours_worked = totals['hours_worked']  # Track actual hours worked
+    extra_hours = totals['extra_hours']
+    missing_hours = totals['missing_hours']
+
+    return {
+        'user_id': user.id,
+        'username': user.username,
+        'period_start': str(start_date),
+        'period_end': str(end_date),
+        'expected_weekly_hours': float(user.expected_weekly_hours),
+        'hours_per_scheduled_day': round(hours_per_day, 2),
+        'scheduled_days': sorted(list(scheduled_days)),
+        'total_hours_worked': round(total_hours_worked, 2),  # Actual hours from clock events
+        'extra_hours': round(extra_hours, 2),
+        'missing_hours': round(missing_hours, 2),
+        'balance': round(extra_hours - missing_hours, 2),
+        'total_parking': round(totals['parking_cost'], 2),
+        'total_km': round(totals['km_driven'], 2),
+        'details': details
+    }
+
+
+def day_total_values(entries: Iterable[tuple]) -> Dict[str, List[float]]:
+    """The per-day amounts that add up to each period total, keyed by TOTAL_FIELDS."""
+
+    values = {field: [] for field in TOTAL_FIELDS}
+    for day, day_type, hours_worked, hours_expected, balance_change, parking, km in entries:
+        values['hours_worked'].append(hours_worked)
+        values['parking_cost'].append(parking)
+        values['km_driven'].append(km)
+
+        if day_type in EXTRA_DAY_TYPES:
+            values['extra_hours'].append(balance_change)
+        elif day_type in MISSING_DAY_TYPES:
+            values['missing_hours'].append(-balance_change)
+    return values
+
+
+def day_detail(
+    day: date,
+    day_type: str,
+    hours_worked: float,
+    hours_expected: float,
+    balance_change: float
+) -> Dict:
+    """Format one day entry the way it is shown in the balance details."""
+
+    if day_type == 'company_holiday_worked':
+        return {
+            'date': str(day),
+            'type': day_type,
+            'hours_worked': round(hours_worked, 2),
+            'hours_expected': 0,
+            'balance_change': round(balance_change, 2),
+            'note': 'Worked on company holiday'
+        }
+    if day_type == 'company_holiday':
+        return {
+            'date': str(day),
+            'type': day_type,
+            'hours_worked': 0,
+            'hours_expected': 0,
+            'balance_change': 0,
+            'note': 'Company holiday'
+        }
+    if day_type == 'vacation':
+        return {
+            'date': str(day),
+            'type': day_type,
+            'hours_worked': 0,
+            'hours_expected': hours_expected or 0,
+            'balance_change': 0
+        }
+    if day_type.endswith('_continuation'):
+        return {
+            'date': str(day),
+            'type': day_type,
+            'hours_worked': 0,
+            'hours_expected': hours_expected,
+            'balance_change': 0,
+            'note': 'Paid sick day (continuation)'
+        }
+    if day_type.endswith('_first'):
+        return {
+            'date': str(day),
+            'type': day_type,
+            'hours_worked': 0,
+            'hours_expected': hours_expected,
+            'balance_change': balance_change,
+            'note': 'Unpaid sick day (first)'
+        }
+    if day_type in ('scheduled_deficit', 'overtime'):
+        return {
+            'date': str(day),
+            'type': day_type,
+            'hours_worked': round(hours_worked, 2),
+            'hours_expected': round(hours_expected, 2),
+            'balance_change': round(balance_change, 2)
+        }
+    if day_type == 'on_schedule':
+        return {
+            'date': str(day),
+            'type': day_type,
+            'hours_worked': round(hours_worked, 2),
+            'hours_expected': round(hours_expected, 2),
+            'balance_change': 0
+        }
+    if day_type == 'extra_day':
+        return {
+            'date': str(day),
+            'type': day_type,
+            'hours_worked': round(hours_worked, 2),
+            'hours_expected': 0,
+            'balance_change': round(balance_change, 2)
+        }
+    return {
+        'date': str(day),
+        'type': day_type,
+        'hours_worked': 0,
+        'hours_expected': 0,
+        'balance_change': 0
+    }
+
+
+def sick_carry_in_date(
+    absence_records: List[Absence],
+    scheduled_days: Set[int],
+    holidays: Set[date],
+    start_date: date,
+    end_date: date
+) -> Optional[date]:
+    """Last scheduled sick day before the period of a sick absence that runs into it."""
+
+    workdays = WorkdayIndex(scheduled_days, holidays)
     for absence in absence_records:
         if absence.type in ['sick', 'personal']:
             # If absence started before period and extends into it
@@ -100,15 +473,51 @@ def calculate_user_balance(
                 actual_end = absence.end_date if absence.end_date else end_date
                 if actual_end >= start_date:
                     # Find the last scheduled sick day before period starts
-                    check_date = absence.start_date
-                    temp_last = None
-                    while check_date < start_date:
-                        if check_date.weekday() in scheduled_days and check_date not in holidays:
-                            temp_last = check_date
-                        check_date += timedelta(days=1)
+                    temp_last = workdays.previous_workday(start_date, not_before=absence.start_date)
                     if temp_last:
-                        last_sick_date = temp_last
-                        break
+                        return temp_last
+    return None
+
+
+def iter_day_entries(
+    scheduled_days: Set[int],
+    hours_per_day: float,
+    clock_events: Dict[date, ClockEvent],
+    absence_records: List[Absence],
+    holidays: Set[date],
+    start_date: date,
+    end_date: date,
+    sick_carry_in: Optional[bool] = None
+):
+    """
+    Yield one raw entry per calendar day of the period:
+    (date, type, hours_worked, hours_expected, balance_change, parking, km).
+
+    hours_worked, parking and km are the amounts that count towards the period
+    totals; values are unrounded. sick_carry_in overrides the sick streak
+    carried into the period: None derives it from absences that started before
+    the period, True/False forces an open/closed streak.
+    """
+
+    # Absences in start order; on each day the latest-starting one that
+    # covers it applies. Started absences are kept on a stack, so each one is
+    # pushed and popped once instead of being expanded day by day.
+    pending_absences = sorted(absence_records, key=lambda absence: absence.start_date)
+    next_absence = 0
+    active_absences = []
+
+    workdays = WorkdayIndex(scheduled_days, holidays)
+
+    # Check if there's an ongoing sick absence from before the period
+    if sick_carry_in is None:
+        last_sick_date = sick_carry_in_date(
+            absence_records, scheduled_days, holidays, start_date, end_date
+        )
+    elif sick_carry_in:
+        # No scheduled days between the day before the period and its first day
+        last_sick_date = start_date - timedelta(days=1)
+    else:
+        last_sick_date = None
     
     current_date = start_date
     while current_date <= end_date:
@@ -116,176 +525,79 @@ def calculate_user_balance(
         is_holiday = current_date in holidays
         is_scheduled = day_of_week in scheduled_days
         clock_event = clock_events.get(current_date)
-        absence_type = absence_dates.get(current_date)
 
-        if is_holiday:
-            if clock_event:
-                clock_in_dt = datetime.combine(current_date, clock_event.clock_in)
-                clock_out_dt = datetime.combine(current_date, clock_event.clock_out)
-                hours_worked = (clock_out_dt - clock_in_dt).total_seconds() / 3600
+        while next_absence < len(pending_absences) and pending_absences[next_absence].start_date <= current_date:
+            active_absences.append(pending_absences[next_absence])
+            next_absence += 1
+        while active_absences and (active_absences[-1].end_date or end_date) < current_date:
+            active_absences.pop()
+        absence_type = active_absences[-1].type if active_absences else None
+
+        hours_worked = 0.0
+        parking = 0.0
+        km = 0.0
+        # Clocked hours count on every day except vacation days (holidays take precedence)
+        if clock_event and (is_holiday or absence_type != 'vacation'):
+            clock_in_dt = datetime.combine(current_date, clock_event.clock_in)
+            clock_out_dt = datetime.combine(current_date, clock_event.clock_out)
+            hours_worked = (clock_out_dt - clock_in_dt).total_seconds() / 3600
 
-                total_hours_worked += hours_worked  # Track actual work
-                extra_hours += hours_worked
+            if clock_event.parking_cost:
+                parking = float(clock_event.parking_cost)
+            if clock_event.km_driven:
+                km = float(clock_event.km_driven)
 
-                if clock_event.parking_cost:
-                    total_parking += float(clock_event.parking_cost)
-                if clock_event.km_driven:
-                    total_km += float(clock_event.km_driven)
-                
-                details.append({
-                    'date': str(current_date),
-                    'type': 'company_holiday_worked',
-                    'hours_worked': round(hours_worked, 2),
-                    'hours_expected': 0,
-                    'balance_change': round(hours_worked, 2),
-                    'note': 'Worked on company holiday'
-                })
+        if is_holiday:
+            if clock_event:
+                yield current_date, 'company_holiday_worked', hours_worked, 0, hours_worked, parking, km
             else:
-                details.append({
-                    'date': str(current_date),
-                    'type': 'company_holiday',
-                    'hours_worked': 0,
-                    'hours_expected': 0,
-                    'balance_change': 0,
-                    'note': 'Company holiday'
-                })
+                yield current_date, 'company_holiday', 0.0, 0, 0, 0.0, 0.0
             
             current_date += timedelta(days=1)
             continue
 
         if absence_type == 'vacation':
-            details.append({
-                'date': str(current_date),
-                'type': 'vacation',
-                'hours_worked': 0,
-                'hours_expected': hours_per_day if is_scheduled else 0,
-                'balance_change': 0
-            })
+            yield current_date, 'vacation', 0.0, hours_per_day if is_scheduled else 0, 0, 0.0, 0.0
             current_date += timedelta(days=1)
             continue
-
-        hours_worked = 0.0
-        if clock_event:
-            clock_in_dt = datetime.combine(current_date, clock_event.clock_in)
-            clock_out_dt = datetime.combine(current_date, clock_event.clock_out)
-            hours_worked = (clock_out_dt - clock_in_dt).total_seconds() / 3600
-
-            total_hours_worked += hours_worked  # Track actual work
-
-            if clock_event.parking_cost:
-                total_parking += float(clock_event.parking_cost)
-            if clock_event.km_driven:
-                total_km += float(clock_event.km_driven)
         
         if is_scheduled:
             if absence_type in ['sick', 'personal']:
-                is_continuation = False
-                
-                if last_sick_date:
-                    check_date = last_sick_date + timedelta(days=1)
-                    while check_date < current_date:
-                        if check_date.weekday() not in scheduled_days or check_date in holidays:
-                            check_date += timedelta(days=1)
-                            continue
-                        break
-                    else:
-                        is_continuation = True
+                # Continuation when no working day lies between the last sick day and today
+                is_continuation = bool(last_sick_date) and workdays.workdays_between(
+                    last_sick_date + timedelta(days=1), current_date - timedelta(days=1)
+                ) == 0
                 
                 if is_continuation:
                     # Continuation of sick period - no penalty
-                    details.append({
-                        'date': str(current_date),
-                        'type': f'{absence_type}_continuation',
-                        'hours_worked': 0,
-                        'hours_expected': hours_per_day,
-                        'balance_change': 0,
-                        'note': 'Paid sick day (continuation)'
-                    })
+                    yield current_date, f'{absence_type}_continuation', hours_worked, hours_per_day, 0, parking, km
                 else:
                     # First sick day - counts as missing
-                    missing_hours += hours_per_day
-                    details.append({
-                        'date': str(current_date),
-                        'type': f'{absence_type}_first',
-                        'hours_worked': 0,
-                        'hours_expected': hours_per_day,
-                        'balance_change': -hours_per_day,
-                        'note': 'Unpaid sick day (first)'
-                    })
+                    yield current_date, f'{absence_type}_first', hours_worked, hours_per_day, -hours_per_day, parking, km
                 
                 last_sick_date = current_date
             
             elif hours_worked < hours_per_day:
                 # Worked less than expected (including not working at all)
                 deficit = hours_per_day - hours_worked
-                missing_hours += deficit
-                details.append({
-                    'date': str(current_date),
-                    'type': 'scheduled_deficit',
-                    'hours_worked': round(hours_worked, 2),
-                    'hours_expected': round(hours_per_day, 2),
-                    'balance_change': round(-deficit, 2)
-                })
+                yield current_date, 'scheduled_deficit', hours_worked, hours_per_day, -deficit, parking, km
                 last_sick_date = None  # Reset sick streak
             
             elif hours_worked > hours_per_day:
                 surplus = hours_worked - hours_per_day
-                extra_hours += surplus
-                details.append({
-                    'date': str(current_date),
-                    'type': 'overtime',
-                    'hours_worked': round(hours_worked, 2),
-                    'hours_expected': round(hours_per_day, 2),
-                    'balance_change': round(surplus, 2)
-                })
+                yield current_date, 'overtime', hours_worked, hours_per_day, surplus, parking, km
                 last_sick_date = None  # Reset sick streak
             
             else:
-                details.append({
-                    'date': str(current_date),
-                    'type': 'on_schedule',
-                    'hours_worked': round(hours_worked, 2),
-                    'hours_expected': round(hours_per_day, 2),
-                    'balance_change': 0
-                })
+                yield current_date, 'on_schedule', hours_worked, hours_per_day, 0, parking, km
                 last_sick_date = None  # Reset sick streak
         
         else:
             if hours_worked > 0:
-                extra_hours += hours_worked
-                details.append({
-                    'date': str(current_date),
-                    'type': 'extra_day',
-                    'hours_worked': round(hours_worked, 2),
-                    'hours_expected': 0,
-                    'balance_change': round(hours_worked, 2)
-                })
+                yield current_date, 'extra_day', hours_worked, 0, hours_worked, parking, km
             else:
-                details.append({
-                    'date': str(current_date),
-                    'type': 'off_day',
-                    'hours_worked': 0,
-                    'hours_expected': 0,
-                    'balance_change': 0
-                })
+                yield current_date, 'off_day', hours_worked, 0, 0, parking, km
             
             # Don't reset sick streak on non-scheduled days
         
         current_date += timedelta(days=1)
-    
-    return {
-        'user_id': user_id,
-        'username': user.username,
-        'period_start': str(start_date),
-        'period_end': str(end_date),
-        'expected_weekly_hours': float(user.expected_weekly_hours),
-        'hours_per_scheduled_day': round(hours_per_day, 2),
-        'scheduled_days': sorted(list(scheduled_days)),
-        'total_hours_worked': round(total_hours_worked, 2),  # Actual hours from clock events
-        'extra_hours': round(extra_hours, 2),
-        'missing_hours': round(missing_hours, 2),
-        'balance': round(extra_hours - missing_hours, 2),
-        'total_parking': round(total_parking, 2),
-        'total_km': round(total_km, 2),
-        'details': details
-    }
\ No newline at end of file
@@ -4,7 +4,7 @@ from datetime import date
 from typing import List, Dict
 from sqlalchemy.orm import Session
 from app.models import User
-from app.utils.calculations import calculate_user_balance
+from app.utils.calculations import calculate_balances
 
 def generate_monthly_report_csv(db: Session, year: int, month: int) -> str:
     """
@@ -50,10 +50,11 @@ def generate_monthly_report_csv(db: Session, year: int, month: int) -> str:
         'KM Compensation (€0.23/km)'
     ])
     
+    # Calculate all balances in one batched pass
+    balances = calculate_balances(db, employees, start_date, end_date, kernel='numpy')
+    
     # Write employee data
-    for employee in employees:
-        balance = calculate_user_balance(db, employee.id, start_date, end_date)
-        
+    for employee, balance in zip(employees, balances):
         # Skip employees with errors
         if 'error' in balance:
             continue
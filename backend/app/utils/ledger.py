@@ -0,0 +1,656 @@
+"""
+Materialized per-day balance ledger (daily_ledger table).
+
+Every (user_id, date) row holds the outcome of the balance calculation for
+that day. Writes to clock events, absences, work schedules and company
+holidays refresh only the rows they affect (see app.utils.balance_sync), and
+ledger_balance() reads a period back from the table instead of recomputing
+every day from raw records.
+
+Closed months are additionally summed into balance_checkpoints, so long
+periods (year-to-date, since hire) add up one row per month. Checkpoints are
+rebuilt whenever ledger rows in their month are rewritten. They hold exact
+sums, while calculate_user_balance keeps a running sum of the days; where the
+two could round to different cents, the period is added up day by day
+instead (see _summary_totals).
+
+Only writes store rows: the write hooks and materialize_ledgers(), which the
+scheduler runs on a worker thread at startup and every night to cover each
+employee from their first record to the end of the current month.
+ledger_balance() never writes; days or checkpoints that are not stored (yet)
+are calculated in memory.
+
+Rows resolve sick continuation per day: a scheduled sick day continues a sick
+period when the previous scheduled working day (skipping company holidays)
+was a sick day as well. A change therefore only affects its own days plus the
+next scheduled working day after them.
+"""
+import math
+import sys
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Set
+from sqlalchemy import func, insert, or_
+from sqlalchemy.orm import Session
+from app.database import SessionLocal
+from app.models import User, WorkSchedule, ClockEvent, Absence, CompanyHoliday, DailyLedger, BalanceCheckpoint
+from app.utils.workdays import WorkdayIndex
+from app.utils.calculations import (
+    TOTAL_FIELDS,
+    absence_overlap,
+    balance_response,
+    day_total_values,
+    iter_day_entries,
+    sick_carry_in_date,
+    summarize_day_entries,
+)
+
+# How far to look for the previous/next scheduled working day
+LOOKAROUND_DAYS = 45
+
+# Day types that are not a scheduled working day
+NON_WORKING_DAY_TYPES = {'company_holiday', 'company_holiday_worked', 'extra_day', 'off_day'}
+
+
+def ledger_balance(
+    db: Session,
+    user_id: int,
+    start_date: date,
+    end_date: date,
+    detail: str = 'days'
+) -> Dict:
+    """
+    Same result as calculate_user_balance, read from the daily ledger.
+
+    With detail='none' only the totals are needed: closed months come from
+    balance_checkpoints and only the remaining days are read from the ledger.
+    Read-only: a period the ledger doesn't cover is calculated without
+    storing it.
+    """
+
+    user = db.query(User).filter(User.id == user_id).first()
+    if not user or user.role != 'employee':
+        return {
+            'error': 'User not found or not an employee',
+            'extra_hours': 0,
+            'missing_hours': 0,
+            'balance': 0
+        }
+
+    scheduled_days = _scheduled_days(db, user_id)
+    if not scheduled_days or not user.expected_weekly_hours:
+        return {
+            'error': 'No work schedule or expected hours set',
+            'extra_hours': 0,
+            'missing_hours': 0,
+            'balance': 0
+        }
+
+    hours_per_day = float(user.expected_weekly_hours) / len(scheduled_days)
+    period = DailyLedger.user_id == user_id, DailyLedger.date >= start_date, DailyLedger.date <= end_date
+
+    if detail == 'none':
+        totals = _summary_totals(db, user_id, scheduled_days, hours_per_day, start_date, end_date)
+        if totals is not None:
+            return balance_response(user, scheduled_days, hours_per_day, totals, [], start_date, end_date)
+        # A total is within rounding distance of a cent: add up every day instead
+
+    rows = db.query(DailyLedger).filter(*period).order_by(DailyLedger.date).all()
+    entries = [_ledger_entry(row) for row in rows]
+
+    if len(entries) != (end_date - start_date).days + 1:
+        # Not materialized (yet)
+        entries = _compute_entries(db, user_id, scheduled_days, hours_per_day, start_date, end_date)
+
+    for index, entry in enumerate(entries):
+        if entry[1] in NON_WORKING_DAY_TYPES or (entry[1] == 'vacation' and not entry[3]):
+            continue
+        entries[index] = _align_sick_carry_in(
+            db, user_id, scheduled_days, hours_per_day, entry, start_date, end_date
+        )
+        break
+
+    return summarize_day_entries(user, scheduled_days, hours_per_day, entries, start_date, end_date, detail)
+
+
+def refresh_ledger(
+    db: Session,
+    user_id: int,
+    start_date: date,
+    end_date: Optional[date] = None
+):
+    """
+    Recompute stored rows and checkpoints after a change to a user's days (not committed).
+
+    end_date=None means the change is open-ended (e.g. an absence without an
+    end date). The user's stored days stay one contiguous range: a change
+    before or after it extends the range. A user without stored days gets
+    their whole ledger (materialize_user).
+    """
+
+    first, last = db.query(
+        func.min(DailyLedger.date),
+        func.max(DailyLedger.date)
+    ).filter(DailyLedger.user_id == user_id).one()
+    if first is None:
+        materialize_user(db, user_id)
+        return
+
+    user = db.query(User).filter(User.id == user_id).first()
+    scheduled_days = _scheduled_days(db, user_id)
+    if not user or user.role != 'employee' or not scheduled_days or not user.expected_weekly_hours:
+        clear_user_ledger(db, user_id)
+        return
+
+    hours_per_day = float(user.expected_weekly_hours) / len(scheduled_days)
+
+    start = min(start_date, last + timedelta(days=1))
+    if end_date is None:
+        end = last
+    else:
+        # The next working day's sick continuation depends on the changed days
+        lookahead = end_date + timedelta(days=LOOKAROUND_DAYS)
+        workdays = WorkdayIndex(scheduled_days, _holidays_between(db, end_date, lookahead))
+        end = workdays.next_workday(end_date, not_after=lookahead) or end_date
+        if end_date <= last:
+            end = min(end, last)
+        end = max(end, first - timedelta(days=1))
+
+    if start > end:
+        return
+
+    _materialize(db, user_id, scheduled_days, hours_per_day, start, end, min(first, start), max(last, end))
+
+
+def materialize_user(db: Session, user_id: int) -> bool:
+    """
+    Store the user's missing rows and checkpoints (not committed); True if anything was written.
+
+    The ledger covers the user from their first record (or account, or this
+    month) to the end of the current month.
+    """
+
+    user = db.query(User).filter(User.id == user_id).first()
+    scheduled_days = _scheduled_days(db, user_id)
+    if not user or user.role != 'employee' or not scheduled_days or not user.expected_weekly_hours:
+        clear_user_ledger(db, user_id)
+        return False
+
+    hours_per_day = float(user.expected_weekly_hours) / len(scheduled_days)
+
+    first, last, stored = db.query(
+        func.min(DailyLedger.date),
+        func.max(DailyLedger.date),
+        func.count(DailyLedger.date)
+    ).filter(DailyLedger.user_id == user_id).one()
+
+    start = _ledger_start(db, user)
+    end = _month_end(date.today().replace(day=1))
+    if first is not None:
+        start, end = min(start, first), max(end, last)
+
+    if stored != (end - start).days + 1:
+        _materialize(db, user_id, scheduled_days, hours_per_day, start, end, start, end)
+        return True
+
+    months = _closed_months(start, end)
+    checkpointed = {
+        row.month_start
+        for row in db.query(BalanceCheckpoint.month_start).filter(BalanceCheckpoint.user_id == user_id).all()
+    }
+    missing = [month_start for month_start in months if month_start not in checkpointed]
+    if missing:
+        _store_checkpoints(db, user_id, missing)
+    return bool(missing)
+
+
+def rebuild_user_ledger(db: Session, user_id: int):
+    """Recompute all rows of a user, e.g. after a schedule or hours change (not committed)."""
+
+    clear_user_ledger(db, user_id)
+    materialize_user(db, user_id)
+
+
+def materialize_ledgers():
+    """materialize_user() for every employee, on a session of its own (startup and nightly job)."""
+
+    db = SessionLocal()
+    try:
+        user_ids = [row.id for row in db.query(User.id).filter(User.role == 'employee').all()]
+        built = 0
+        for user_id in user_ids:
+            try:
+                if materialize_user(db, user_id):
+                    built += 1
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                print(f"[LEDGER] Failed to materialize user {user_id}: {e}")
+        print(f"[LEDGER] Materialized {built} of {len(user_ids)} employees")
+    finally:
+        db.close()
+
+
+def refresh_holiday(db: Session, holiday_date: date):
+    """Recompute the rows of every user with materialized days on or just after the date."""
+
+    user_ids = [
+        row.user_id for row in db.query(DailyLedger.user_id).filter(
+            DailyLedger.date >= holiday_date,
+            DailyLedger.date <= holiday_date + timedelta(days=LOOKAROUND_DAYS)
+        ).distinct().all()
+    ]
+    for user_id in user_ids:
+        refresh_ledger(db, user_id, holiday_date, holiday_date)
+
+
+def clear_user_ledger(db: Session, user_id: int):
+    """Drop all rows and checkpoints of a user (not committed)."""
+
+    db.query(DailyLedger).filter(DailyLedger.user_id == user_id).delete(synchronize_session=False)
+    db.query(BalanceCheckpoint).filter(BalanceCheckpoint.user_id == user_id).delete(synchronize_session=False)
+
+
+def _scheduled_days(db: Session, user_id: int) -> Set[int]:
+    """Python weekday numbers (0=Monday) the user is scheduled on."""
+
+    # WorkSchedule stores JS day numbers (0=Sunday), convert with (js_day - 1) % 7
+    return {
+        (ws.day_of_week - 1) % 7
+        for ws in db.query(WorkSchedule).filter(WorkSchedule.user_id == user_id).all()
+    }
+
+
+def _ledger_start(db: Session, user: User) -> date:
+    """First day the ledger covers: the user's first clock event, absence or account day, at the latest this month."""
+
+    starts = [
+        date.today().replace(day=1),
+        db.query(func.min(ClockEvent.date)).filter(ClockEvent.user_id == user.id).scalar(),
+        db.query(func.min(Absence.start_date)).filter(Absence.user_id == user.id).scalar(),
+        user.created_at.date() if user.created_at else None,
+    ]
+    return min(start for start in starts if start is not None)
+
+
+def _holidays_between(db: Session, start_date: date, end_date: date) -> Set[date]:
+    return {
+        h.date
+        for h in db.query(CompanyHoliday).filter(
+            CompanyHoliday.date >= start_date,
+            CompanyHoliday.date <= end_date
+        ).all()
+    }
+
+
+def _is_sick_day(db: Session, user_id: int, day: date) -> bool:
+    """Whether the approved absence covering the day (latest start wins) is sick/personal leave."""
+
+    absence = db.query(Absence).filter(
+        Absence.user_id == user_id,
+        Absence.status == 'approved',
+        *absence_overlap(day, day)
+    ).order_by(Absence.start_date.desc()).first()
+    return absence is not None and absence.type in ['sick', 'personal']
+
+
+def _compute_entries(
+    db: Session,
+    user_id: int,
+    scheduled_days: Set[int],
+    hours_per_day: float,
+    start_date: date,
+    end_date: date
+) -> List[tuple]:
+    """Run the day calculation for a span with the sick streak carried in from before it."""
+
+    holidays = _holidays_between(db, start_date - timedelta(days=LOOKAROUND_DAYS), end_date)
+
+    previous_day = WorkdayIndex(scheduled_days, holidays).previous_workday(
+        start_date, not_before=start_date - timedelta(days=LOOKAROUND_DAYS)
+    )
+    sick_carry_in = previous_day is not None and _is_sick_day(db, user_id, previous_day)
+
+    clock_events = {
+        ce.date: ce
+        for ce in db.query(ClockEvent).filter(
+            ClockEvent.user_id == user_id,
+            ClockEvent.date >= start_date,
+            ClockEvent.date <= end_date
+        ).all()
+    }
+
+    absence_records = db.query(Absence).filter(
+        Absence.user_id == user_id,
+        Absence.status == 'approved',
+        *absence_overlap(start_date, end_date)
+    ).order_by(Absence.start_date).all()
+
+    return list(iter_day_entries(
+        scheduled_days, hours_per_day, clock_events, absence_records, holidays,
+        start_date, end_date, sick_carry_in
+    ))
+
+
+def _store_entries(db: Session, user_id: int, start_date: date, end_date: date, entries: List[tuple]):
+    db.query(DailyLedger).filter(
+        DailyLedger.user_id == user_id,
+        DailyLedger.date >= start_date,
+        DailyLedger.date <= end_date
+    ).delete(synchronize_session=False)
+    db.query(BalanceCheckpoint).filter(
+        BalanceCheckpoint.user_id == user_id,
+        BalanceCheckpoint.month_start >= start_date.replace(day=1),
+        BalanceCheckpoint.month_start <= end_date
+    ).delete(synchronize_session=False)
+
+    if not entries:
+        return
+
+    db.execute(insert(DailyLedger), [
+        {
+            'user_id': user_id,
+            'date': day,
+            'type': day_type,
+            'hours_worked': hours_worked,
+            'hours_expected': hours_expected,
+            'balance_change': balance_change,
+            'parking_cost': parking,
+            'km_driven': km
+        }
+        for day, day_type, hours_worked, hours_expected, balance_change, parking, km in entries
+    ])
+
+
+def _materialize(
+    db: Session,
+    user_id: int,
+    scheduled_days: Set[int],
+    hours_per_day: float,
+    start_date: date,
+    end_date: date,
+    first: date,
+    last: date
+):
+    """Store the rows of a span and rebuild the checkpoints of its closed months; first/last bound the stored days."""
+
+    entries = _compute_entries(db, user_id, scheduled_days, hours_per_day, start_date, end_date)
+    _store_entries(db, user_id, start_date, end_date, entries)
+
+    # Only months whose days are all stored
+    months = [
+        month_start
+        for month_start in _closed_months(first, last)
+        if month_start <= end_date and _month_end(month_start) >= start_date
+    ]
+    if months:
+        _store_checkpoints(db, user_id, months)
+
+
+def _store_checkpoints(db: Session, user_id: int, months: List[date]):
+    """Sum the stored rows of the given months into their checkpoints."""
+
+    db.query(BalanceCheckpoint).filter(
+        BalanceCheckpoint.user_id == user_id,
+        BalanceCheckpoint.month_start.in_(months)
+    ).delete(synchronize_session=False)
+
+    month_entries = {month_start: [] for month_start in months}
+    for entry in db.query(
+        DailyLedger.date, DailyLedger.type, DailyLedger.hours_worked, DailyLedger.hours_expected,
+        DailyLedger.balance_change, DailyLedger.parking_cost, DailyLedger.km_driven
+    ).filter(
+        DailyLedger.user_id == user_id,
+        DailyLedger.date >= months[0],
+        DailyLedger.date <= _month_end(months[-1])
+    ).all():
+        entries = month_entries.get(entry.date.replace(day=1))
+        if entries is not None:
+            entries.append(entry)
+
+    checkpoints = []
+    for month_start, entries in month_entries.items():
+        month_values = day_total_values(entries)
+        checkpoint = {'user_id': user_id, 'month_start': month_start}
+        for field in TOTAL_FIELDS:
+            total = math.fsum(month_values[field])
+            checkpoint[field] = total
+            # Rounding remainder of the total, exact for day-sized amounts
+            checkpoint[f'{field}_low'] = math.fsum(month_values[field] + [-total])
+            checkpoint[f'{field}_abs'] = math.fsum(abs(value) for value in month_values[field])
+        checkpoints.append(checkpoint)
+    db.execute(insert(BalanceCheckpoint), checkpoints)
+
+
+def _span_values(
+    db: Session,
+    user_id: int,
+    scheduled_days: Set[int],
+    hours_per_day: float,
+    start_date: date,
+    end_date: date
+) -> Dict[str, List[float]]:
+    """Per-day amounts of a span (see day_total_values), calculated if its rows are not all stored."""
+
+    entries = db.query(
+        DailyLedger.date, DailyLedger.type, DailyLedger.hours_worked, DailyLedger.hours_expected,
+        DailyLedger.balance_change, DailyLedger.parking_cost, DailyLedger.km_driven
+    ).filter(
+        DailyLedger.user_id == user_id,
+        DailyLedger.date >= start_date,
+        DailyLedger.date <= end_date
+    ).all()
+
+    if len(entries) != (end_date - start_date).days + 1:
+        entries = _compute_entries(db, user_id, scheduled_days, hours_per_day, start_date, end_date)
+
+    return day_total_values(entries)
+
+
+def _summary_totals(
+    db: Session,
+    user_id: int,
+    scheduled_days: Set[int],
+    hours_per_day: float,
+    start_date: date,
+    end_date: date
+) -> Optional[Dict[str, float]]:
+    """
+    Period totals from the checkpoints of closed months plus the remaining ledger days.
+
+    calculate_user_balance adds the days up one by one, so its totals carry
+    the rounding of that running sum; checkpoints give the exact sums
+    instead. The two agree after rounding to cents unless a total lies within
+    the running sum's error bound of a rounding boundary. Returns None then,
+    or when the ledger doesn't cover the period, and the caller adds up the
+    days.
+    """
+
+    day_count = (end_date - start_date).days + 1
+    period = DailyLedger.user_id == user_id, DailyLedger.date >= start_date, DailyLedger.date <= end_date
+    if db.query(func.count(DailyLedger.date)).filter(*period).scalar() != day_count:
+        return None
+
+    months = _closed_months(start_date, end_date)
+    if months:
+        spans = [
+            (start_date, months[0] - timedelta(days=1)),
+            (_month_end(months[-1]) + timedelta(days=1), end_date)
+        ]
+    else:
+        spans = [(start_date, end_date)]
+
+    values, magnitudes = _checkpoint_values(db, user_id, scheduled_days, hours_per_day, months)
+    for span_start, span_end in spans:
+        if span_start <= span_end:
+            span_values = _span_values(db, user_id, scheduled_days, hours_per_day, span_start, span_end)
+            for field in TOTAL_FIELDS:
+                values[field] += span_values[field]
+                magnitudes[field] += [abs(value) for value in span_values[field]]
+
+    first_working = db.query(DailyLedger).filter(
+        *period,
+        DailyLedger.type.notin_(NON_WORKING_DAY_TYPES),
+        or_(DailyLedger.type != 'vacation', DailyLedger.hours_expected > 0)
+    ).order_by(DailyLedger.date).first()
+    if first_working is not None:
+        entry = _ledger_entry(first_working)
+        aligned = _align_sick_carry_in(db, user_id, scheduled_days, hours_per_day, entry, start_date, end_date)
+        for sign, day_entry in ((-1, entry), (1, aligned)):
+            for field, field_values in day_total_values([day_entry]).items():
+                values[field] += [sign * value for value in field_values]
+                magnitudes[field] += [abs(value) for value in field_values]
+
+    totals = {}
+    errors = {}
+    for field in TOTAL_FIELDS:
+        totals[field] = math.fsum(values[field])
+        errors[field] = _running_sum_error(day_count, math.fsum(magnitudes[field]), totals[field])
+        if not _rounds_alike(totals[field], errors[field]):
+            return None
+
+    balance = totals['extra_hours'] - totals['missing_hours']
+    balance_error = errors['extra_hours'] + errors['missing_hours'] + _running_sum_error(
+        1, abs(totals['extra_hours']) + abs(totals['missing_hours']), balance
+    )
+    if not _rounds_alike(balance, balance_error):
+        return None
+    return totals
+
+
+def _running_sum_error(count: int, magnitude: float, total: float) -> float:
+    """
+    Bound on how far a running float sum of `count` amounts can be from total.
+
+    magnitude is the sum of the amounts' absolute values. The classic bound
+    is (count - 1) * unit roundoff * magnitude; this doubles it and adds the
+    rounding of total itself, so it also covers the float arithmetic here.
+    """
+
+    return 2 * sys.float_info.epsilon * (count * magnitude + abs(total))
+
+
+def _rounds_alike(value: float, error: float) -> bool:
+    """Whether everything within error of value rounds to the same cents."""
+
+    return round(value - error, 2) == round(value + error, 2)
+
+
+def _checkpoint_values(
+    db: Session,
+    user_id: int,
+    scheduled_days: Set[int],
+    hours_per_day: float,
+    months: List[date]
+) -> tuple:
+    """
+    Checkpointed totals of closed months; months without a checkpoint (yet) are read day by day.
+
+    Returns (values, magnitudes): each total as a list of floats that fsum to
+    the exact sum of its days, and the sums of the days' absolute values.
+    """
+
+    values = {field: [] for field in TOTAL_FIELDS}
+    magnitudes = {field: [] for field in TOTAL_FIELDS}
+    if not months:
+        return values, magnitudes
+
+    checkpoints = {
+        cp.month_start: cp
+        for cp in db.query(BalanceCheckpoint).filter(
+            BalanceCheckpoint.user_id == user_id,
+            BalanceCheckpoint.month_start >= months[0],
+            BalanceCheckpoint.month_start <= months[-1]
+        ).all()
+    }
+
+    # Consecutive months without a checkpoint are read as one span
+    missing = []
+    for month_start in months + [None]:
+        checkpoint = checkpoints.get(month_start)
+        if checkpoint is None and month_start is not None:
+            missing.append(month_start)
+            continue
+
+        if missing:
+            span_values = _span_values(
+                db, user_id, scheduled_days, hours_per_day, missing[0], _month_end(missing[-1])
+            )
+            for field in TOTAL_FIELDS:
+                values[field] += span_values[field]
+                magnitudes[field] += [abs(value) for value in span_values[field]]
+            missing = []
+
+        if checkpoint is not None:
+            for field in TOTAL_FIELDS:
+                values[field] += [getattr(checkpoint, field), getattr(checkpoint, f'{field}_low')]
+                magnitudes[field].append(getattr(checkpoint, f'{field}_abs'))
+
+    return values, magnitudes
+
+
+def _closed_months(start_date: date, end_date: date) -> List[date]:
+    """First days of the months that lie entirely within the period and before today."""
+
+    today = date.today()
+    months = []
+    month_start = start_date.replace(day=1)
+    if month_start < start_date:
+        month_start = _month_end(month_start) + timedelta(days=1)
+    while _month_end(month_start) <= end_date and _month_end(month_start) < today:
+        months.append(month_start)
+        month_start = _month_end(month_start) + timedelta(days=1)
+    return months
+
+
+def _month_end(month_start: date) -> date:
+    if month_start.month == 12:
+        return date(month_start.year, 12, 31)
+    return date(month_start.year, month_start.month + 1, 1) - timedelta(days=1)
+
+
+def _ledger_entry(row: DailyLedger) -> tuple:
+    return (
+        row.date, row.type, row.hours_worked, row.hours_expected,
+        row.balance_change, row.parking_cost, row.km_driven
+    )
+
+
+def _align_sick_carry_in(
+    db: Session,
+    user_id: int,
+    scheduled_days: Set[int],
+    hours_per_day: float,
+    entry: tuple,
+    start_date: date,
+    end_date: date
+) -> tuple:
+    """
+    Re-label the first working day of a period to match calculate_user_balance.
+
+    The ledger continues sick periods across any date, while the live
+    calculation only carries a sick streak into a period from an absence that
+    started before it. Only the first scheduled working day can differ.
+    """
+
+    day, day_type, hours_worked, hours_expected, balance_change, parking, km = entry
+    if not day_type.startswith(('sick_', 'personal_')):
+        return entry
+
+    earlier_sick_absences = db.query(Absence).filter(
+        Absence.user_id == user_id,
+        Absence.status == 'approved',
+        Absence.type.in_(['sick', 'personal']),
+        Absence.start_date < start_date,
+        *absence_overlap(start_date, start_date)
+    ).order_by(Absence.start_date).all()
+    carried_in = sick_carry_in_date(
+        earlier_sick_absences, scheduled_days, set(), start_date, end_date
+    ) is not None
+
+    if carried_in == day_type.endswith('_continuation'):
+        return entry
+
+    absence_type = day_type.split('_', 1)[0]
+    if carried_in:
+        return day, f'{absence_type}_continuation', hours_worked, hours_expected, 0, parking, km
+    return day, f'{absence_type}_first', hours_worked, hours_expected, -hours_per_day, parking, km
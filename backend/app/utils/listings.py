@@ -0,0 +1,87 @@
+"""
+Listing queries for the admin overviews.
+
+Each listing is a single SELECT that joins the user once and loads only the
+columns the endpoint returns, as lightweight rows (attribute access like the
+models) instead of ORM entities plus a User lookup per row. The functions
+return the query, so routes add their own filters and ordering.
+"""
+from sqlalchemy import func
+from sqlalchemy.orm import Query, Session
+from app.models import User, ClockEvent, Absence, CalendarEvent, EventCategory
+
+CLOCK_EVENT_COLUMNS = (
+    ClockEvent.id,
+    ClockEvent.user_id,
+    ClockEvent.date,
+    ClockEvent.clock_in,
+    ClockEvent.clock_out,
+    ClockEvent.came_by_car,
+    ClockEvent.parking_cost,
+    ClockEvent.km_driven,
+    ClockEvent.work_from_home,
+    ClockEvent.requested_reason,
+    ClockEvent.created_at,
+    ClockEvent.status,
+)
+
+ABSENCE_COLUMNS = (
+    Absence.id,
+    Absence.user_id,
+    Absence.start_date,
+    Absence.end_date,
+    Absence.type,
+    Absence.reason,
+    Absence.status,
+    Absence.created_at,
+    Absence.reviewed_at,
+    Absence.reviewed_by,
+)
+
+CALENDAR_EVENT_COLUMNS = (
+    CalendarEvent.id,
+    CalendarEvent.title,
+    CalendarEvent.description,
+    CalendarEvent.category_id,
+    CalendarEvent.date,
+    CalendarEvent.time_start,
+    CalendarEvent.time_end,
+    CalendarEvent.visibility,
+    CalendarEvent.status,
+    CalendarEvent.created_by,
+    CalendarEvent.created_at,
+    CalendarEvent.reviewed_at,
+    CalendarEvent.reviewed_by,
+)
+
+
+def clock_event_rows(db: Session) -> Query:
+    """Clock events with the employee's username."""
+    return _with_username(db, CLOCK_EVENT_COLUMNS, ClockEvent.user_id)
+
+
+def absence_rows(db: Session) -> Query:
+    """Absences with the employee's username."""
+    return _with_username(db, ABSENCE_COLUMNS, Absence.user_id)
+
+
+def calendar_event_rows(db: Session) -> Query:
+    """Calendar events with the username of whoever created them."""
+    return _with_username(db, CALENDAR_EVENT_COLUMNS, CalendarEvent.created_by)
+
+
+def calendar_feed_rows(db: Session) -> Query:
+    """Calendar events with their category's name and color (None without a category)."""
+    return db.query(
+        *CALENDAR_EVENT_COLUMNS,
+        EventCategory.name.label('category_name'),
+        EventCategory.color.label('category_color')
+    ).outerjoin(EventCategory, EventCategory.id == CalendarEvent.category_id)
+
+
+def _with_username(db: Session, columns: tuple, user_id_column) -> Query:
+    # Outer join: rows of deleted users still show up, as "Unknown"
+    return db.query(
+        *columns,
+        func.coalesce(User.username, 'Unknown').label('username')
+    ).outerjoin(User, User.id == user_id_column)
@@ -0,0 +1,83 @@
+"""
+Keyset (cursor) pagination for list endpoints.
+
+A page is ordered by a few columns ending in the primary key, e.g.
+(date, id) descending. The cursor encodes the sort values of the last row of
+the page; the next page continues with rows that sort after it, through the
+matching index, so a page costs the same however much history there is. The
+cursor is opaque to clients: URL-safe base64 of the JSON sort values.
+
+Endpoints keep returning a plain JSON array; the cursor of the next page is
+sent in the X-Next-Cursor header (absent on the last page). Without a limit
+a page has DEFAULT_PAGE_SIZE rows, so no request returns the whole history.
+"""
+import base64
+import json
+from datetime import date, datetime
+from typing import List, Optional, Sequence
+from fastapi import HTTPException, Response
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Query
+from app.config import settings
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def paginate(
+    query: Query,
+    keys: Sequence,
+    response: Response,
+    limit: int = settings.DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    descending: bool = True
+) -> List:
+    """
+    Order `query` by `keys` (columns, the last one unique) and return one page.
+
+    Sets the X-Next-Cursor header on `response` when there are more rows.
+    `limit` is capped at MAX_PAGE_SIZE.
+    """
+
+    limit = min(limit, settings.MAX_PAGE_SIZE)
+
+    query = query.order_by(*[key.desc() if descending else key.asc() for key in keys])
+
+    if cursor is not None:
+        values = decode_cursor(cursor, keys)
+        position = tuple_(*keys)
+        query = query.filter(position < tuple_(*values) if descending else position > tuple_(*values))
+
+    rows = query.limit(limit + 1).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor([getattr(last, key.key) for key in keys])
+    return rows
+
+
+def encode_cursor(values: Sequence) -> str:
+    plain = [value.isoformat() if isinstance(value, (date, datetime)) else value for value in values]
+    return base64.urlsafe_b64encode(json.dumps(plain).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, keys: Sequence) -> list:
+    """Sort values of a cursor, converted to the column types (400 if it doesn't fit `keys`)."""
+
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        plain = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(plain, list) or len(plain) != len(keys):
+            raise ValueError("wrong number of values")
+
+        values = []
+        for key, value in zip(keys, plain):
+            python_type = key.type.python_type
+            if python_type is datetime:
+                values.append(datetime.fromisoformat(value))
+            elif python_type is date:
+                values.append(date.fromisoformat(value))
+            else:
+                values.append(python_type(value))
+        return values
+    except (ValueError, TypeError, json.JSONDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
@@ -0,0 +1,109 @@
+"""
+Thread pool for password hashing and verification.
+
+An Argon2 hash or verify costs tens to hundreds of milliseconds of CPU. Done
+inside an async route it blocks the event loop, and with it every other
+request of the worker (clock-ins included). The routes await hash_password()
+and verify_password() instead, which run the work on a small thread pool
+(argon2 releases the GIL, so the threads hash in parallel).
+PASSWORD_POOL_WORKERS sets how many run at once. Up to PASSWORD_QUEUE_LIMIT
+more wait for a thread; beyond that the request fails with 503 instead of
+piling up. pool_stats() reports the queue depth and counters.
+"""
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
+from fastapi import HTTPException
+from app.config import settings
+from app.security import get_password_hash, pwd_context
+
+_pool_lock = threading.Lock()
+_pool: Optional[ThreadPoolExecutor] = None
+
+_stats_lock = threading.Lock()
+_stats = {'waiting': 0, 'running': 0, 'peak_waiting': 0, 'completed': 0, 'rejected': 0, 'rehashed': 0}
+
+
+def get_pool() -> ThreadPoolExecutor:
+    """The shared pool, started on first use."""
+
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=settings.PASSWORD_POOL_WORKERS, thread_name_prefix='password')
+        return _pool
+
+
+def shutdown_pool():
+    """Stop the pool's threads (app shutdown)."""
+
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(cancel_futures=True)
+            _pool = None
+
+
+async def hash_password(password: str) -> str:
+    """get_password_hash() on the pool."""
+    return await _run(get_password_hash, password)
+
+
+async def verify_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Check a password on the pool.
+
+    Returns (matches, new_hash); new_hash is set when the password matches but
+    its hash was made with other Argon2 parameters than the configured ones,
+    so the caller can store it (rehash on login).
+    """
+
+    matches, new_hash = await _run(pwd_context.verify_and_update, plain_password, hashed_password)
+    if new_hash:
+        with _stats_lock:
+            _stats['rehashed'] += 1
+    return matches, new_hash
+
+
+def pool_stats() -> Dict:
+    """Queue depth and counters of this worker's password pool."""
+
+    with _stats_lock:
+        return {
+            'workers': settings.PASSWORD_POOL_WORKERS,
+            'queue_limit': settings.PASSWORD_QUEUE_LIMIT,
+            **_stats
+        }
+
+
+async def _run(function, *args):
+    with _stats_lock:
+        if _stats['waiting'] >= settings.PASSWORD_QUEUE_LIMIT:
+            _stats['rejected'] += 1
+            raise HTTPException(status_code=503, detail="Server busy, please try again")
+        _stats['waiting'] += 1
+        _stats['peak_waiting'] = max(_stats['peak_waiting'], _stats['waiting'])
+
+    future = get_pool().submit(_job, function, args)
+    future.add_done_callback(_not_started)
+    return await asyncio.wrap_future(future)
+
+
+def _job(function, args):
+    with _stats_lock:
+        _stats['waiting'] -= 1
+        _stats['running'] += 1
+    try:
+        return function(*args)
+    finally:
+        with _stats_lock:
+            _stats['running'] -= 1
+            _stats['completed'] += 1
+
+
+def _not_started(future):
+    # Cancelled while waiting (client went away): _job never ran
+    if future.cancelled():
+        with _stats_lock:
+            _stats['waiting'] -= 1
@@ -0,0 +1,60 @@
+"""
+Presence of the active employees on one day.
+
+presence_query() resolves, in a single SELECT, for every active employee:
+the clock event of the day, the approved absence covering the day and whether
+the day is on their work schedule. Each comes from a LEFT JOIN bounded to the
+day, so the statement reads a handful of index entries per employee however
+much history there is. The team-today and today-status endpoints both build
+their overview from these rows, each with its own rules.
+"""
+from datetime import date
+from sqlalchemy import and_, or_, select
+from sqlalchemy.orm import aliased
+from sqlalchemy.sql import Select
+from app.models import User, ClockEvent, Absence, WorkSchedule
+
+
+def presence_query(day: date) -> Select:
+    """One row per active employee (by id) with their clock event, absence and schedule of `day`."""
+
+    # At most one absence per employee: the most recent one covering the day
+    covering = aliased(Absence)
+    absence_id = select(covering.id).where(
+        covering.user_id == User.id,
+        covering.status == 'approved',
+        covering.start_date <= day,
+        or_(covering.end_date >= day, covering.end_date == None)
+    ).order_by(covering.start_date.desc(), covering.id.desc()).limit(1).correlate(User).scalar_subquery()
+
+    # WorkSchedule stores JS weekdays (0=Sun, 1=Mon, ..., 6=Sat)
+    day_js = (day.weekday() + 1) % 7
+
+    return select(
+        User.id,
+        User.username,
+        User.email,
+        ClockEvent.id.label('clock_event_id'),
+        ClockEvent.status.label('clock_status'),
+        ClockEvent.clock_in,
+        ClockEvent.clock_out,
+        ClockEvent.came_by_car,
+        ClockEvent.work_from_home,
+        Absence.id.label('absence_id'),
+        Absence.type.label('absence_type'),
+        Absence.start_date.label('absence_start'),
+        Absence.end_date.label('absence_end'),
+        Absence.reason.label('absence_reason'),
+        (WorkSchedule.id != None).label('scheduled'),
+    ).outerjoin(
+        # unique per (user_id, date)
+        ClockEvent, and_(ClockEvent.user_id == User.id, ClockEvent.date == day)
+    ).outerjoin(
+        Absence, Absence.id == absence_id
+    ).outerjoin(
+        # unique per (user_id, day_of_week)
+        WorkSchedule, and_(WorkSchedule.user_id == User.id, WorkSchedule.day_of_week == day_js)
+    ).where(
+        User.is_active == True,
+        User.role == 'employee'
+    ).order_by(User.id)
@@ -0,0 +1,179 @@
+"""
+In-memory board of today's presence.
+
+The team-today and today-status overviews are polled by every open
+dashboard. Each worker keeps today's presence rows (presence_query(), one per
+active employee) in memory and serves both endpoints from them without a
+query:
+
+- built on startup, rebuilt at midnight, and on the first request of a day
+  the board is not built for yet;
+- updated in place after writes: balance_sync reloads a user's row when a
+  committed change covers today (clock events, absences, schedules), user
+  create/update and clock event approval do it directly (one small query);
+- rebuilt every PRESENCE_REFRESH_SECONDS, which picks up writes handled by
+  other workers.
+
+Every change bumps the board's generation. The endpoints return it, with an
+ETag, so a poll that finds nothing new can be answered with 304. Streams
+(today-status/stream) subscribe() to be woken on every change instead.
+"""
+import asyncio
+import secrets
+import threading
+from collections import namedtuple
+from datetime import date, datetime
+from typing import Dict, Optional
+from fastapi import Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.database import SessionLocal
+from app.models import User
+from app.utils.presence import presence_query
+
+# rows: presence rows of `day`, ordered by user id
+Board = namedtuple('Board', ['day', 'generation', 'rows'])
+
+# Tells this worker's generations apart from other workers' (and restarts')
+_EPOCH = secrets.token_hex(4)
+
+_lock = threading.Lock()
+_board: Optional[Board] = None
+_rows: Dict[int, tuple] = {}
+# user_id -> generation of the last in-place update
+_updated: Dict[int, int] = {}
+# subscribe()d streams: wake-up event -> its event loop
+_subscribers: Dict[asyncio.Event, asyncio.AbstractEventLoop] = {}
+
+
+async def current_board(db: AsyncSession) -> Board:
+    """Today's board, built first if it is for another day (or not built yet)."""
+
+    today = datetime.now().date()
+    board = _board
+    if board is None or board.day != today:
+        await db.run_sync(rebuild, today)
+        board = _board
+    return board
+
+
+def latest() -> Optional[Board]:
+    """The board as it is now, without building it."""
+    return _board
+
+
+def rebuild(db: Session, day: Optional[date] = None):
+    """Load the board of `day` (default today) from the database."""
+
+    day = day or datetime.now().date()
+    with _lock:
+        started = _board.generation if _board else 0
+
+    rows = {row.id: row for row in db.execute(presence_query(day)).all()}
+
+    global _rows, _updated
+    with _lock:
+        if _board is not None and _board.day == day:
+            # Rows updated in place while the query ran are newer than it
+            for user_id, generation in _updated.items():
+                if generation > started:
+                    if user_id in _rows:
+                        rows[user_id] = _rows[user_id]
+                    else:
+                        rows.pop(user_id, None)
+        _updated = {}
+        if _board is None or _board.day != day or rows != _rows:
+            _rows = rows
+            _publish(day)
+
+
+def user_changed(db: Session, user_id: int, start_date: Optional[date] = None, end_date: Optional[date] = None):
+    """
+    Reload one user's row after a committed change.
+
+    With start_date (and end_date, None = open-ended) only when the changed
+    days include the board's day.
+    """
+
+    board = _board
+    if board is None:
+        return  # Built from the database on first use
+    if start_date is not None and (start_date > board.day or (end_date is not None and end_date < board.day)):
+        return
+
+    row = db.execute(presence_query(board.day).where(User.id == user_id)).first()
+
+    with _lock:
+        if _board is None or _board.day != board.day:
+            return
+        if row is None:
+            if _rows.pop(user_id, None) is None:
+                return
+        elif _rows.get(user_id) == row:
+            return
+        else:
+            _rows[user_id] = row
+        _publish(board.day)
+        _updated[user_id] = _board.generation
+
+
+def refresh():
+    """rebuild() on a session of its own (startup and scheduler jobs)."""
+    db = SessionLocal()
+    try:
+        rebuild(db)
+    except Exception as e:
+        print(f"[PRESENCE] Failed to rebuild the presence board: {e}")
+    finally:
+        db.close()
+
+
+def not_modified(request: Request, response: Response, board: Board) -> Optional[Response]:
+    """A 304 response if the client already has this board (If-None-Match), else None; sets the ETag."""
+
+    etag = f'"{_EPOCH}-{board.generation}"'
+    if request.headers.get('if-none-match') == etag:
+        return Response(status_code=304, headers={'ETag': etag})
+    response.headers['ETag'] = etag
+    return None
+
+
+def subscribe() -> Optional[asyncio.Event]:
+    """
+    An event that is set whenever the board changes (the subscriber clears
+    it), or None when TODAY_STATUS_STREAM_MAX_SUBSCRIBERS are subscribed.
+
+    Changes coalesce: a subscriber that is busy sending misses no change, it
+    just finds several at once on the board.
+    """
+
+    with _lock:
+        if len(_subscribers) >= settings.TODAY_STATUS_STREAM_MAX_SUBSCRIBERS:
+            return None
+        changed = asyncio.Event()
+        _subscribers[changed] = asyncio.get_running_loop()
+        return changed
+
+
+def unsubscribe(changed: asyncio.Event):
+    with _lock:
+        _subscribers.pop(changed, None)
+
+
+def subscriber_count() -> int:
+    return len(_subscribers)
+
+
+def _publish(day: date):
+    # Called with _lock held; readers only ever see a complete board
+    global _board
+    generation = (_board.generation if _board else 0) + 1
+    _board = Board(day, generation, tuple(_rows[user_id] for user_id in sorted(_rows)))
+
+    # Writes run on threadpool threads and the scheduler, not only on the loop
+    for changed, loop in _subscribers.items():
+        try:
+            loop.call_soon_threadsafe(changed.set)
+        except RuntimeError:
+            pass  # Loop closed (shutdown)
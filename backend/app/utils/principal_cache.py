@@ -0,0 +1,61 @@
+"""
+Short-lived in-memory cache of authenticated users.
+
+get_current_user runs on every API call. With this cache it decodes the JWT
+and finds the user in a dict, instead of querying the users table each time.
+Only active users are cached,
+as a Principal with the columns the routes read. Entries expire after
+PRINCIPAL_CACHE_TTL seconds.
+
+The routes that change a user's active flag, role or session call
+invalidate(), so this worker sees the change on the next request. The cache
+is per worker process: other workers see it once their entry expires.
+"""
+import time
+from collections import namedtuple
+from typing import Optional
+from app.config import settings
+from app.models import User
+
+# The user columns routes read from current_user
+Principal = namedtuple('Principal', [
+    'id', 'username', 'email', 'role', 'is_active',
+    'expected_weekly_hours', 'has_km_compensation', 'token_version'
+])
+
+# user_id -> (expires at, Principal)
+_entries = {}
+
+
+def get(user_id: int) -> Optional[Principal]:
+    """Cached principal of a user, None if unknown or expired."""
+
+    entry = _entries.get(user_id)
+    if entry is None or entry[0] < time.monotonic():
+        return None
+    return entry[1]
+
+
+def put(user: User) -> Principal:
+    """Principal of a user loaded from the database, cached if the user may use the API."""
+
+    principal = Principal(
+        id=user.id,
+        username=user.username,
+        email=user.email,
+        role=user.role,
+        is_active=user.is_active,
+        expected_weekly_hours=user.expected_weekly_hours,
+        has_km_compensation=user.has_km_compensation,
+        token_version=user.token_version
+    )
+    # Inactive users are looked up again next time, so a re-activation
+    # counts immediately
+    if settings.PRINCIPAL_CACHE_TTL > 0 and principal.is_active:
+        _entries[user.id] = (time.monotonic() + settings.PRINCIPAL_CACHE_TTL, principal)
+    return principal
+
+
+def invalidate(user_id: int):
+    """Forget a user after a change to their role, active flag or session."""
+    _entries.pop(user_id, None)
@@ -1,12 +1,141 @@
-"""Web Push delivery utility using pywebpush + VAPID."""
+"""
+Web Push delivery utility using pywebpush + VAPID.
+
+webpush() is a blocking HTTPS request to the subscription's push service.
+Deliveries run on a pool of PUSH_CONCURRENCY threads instead of the event
+loop, so a batch goes out in parallel: broadcasting to every device takes
+about one push service round-trip, not one per device. A request that gets
+no answer within PUSH_TIMEOUT_SECONDS counts as failed.
+
+Subscriptions are grouped by push service origin (FCM, Mozilla autopush,
+...), each with a session of its own that keeps its connections open, so
+the TLS handshake is paid once per connection rather than once per push.
+With httpx and h2 installed (pip install "httpx[http2]") and PUSH_HTTP2 on,
+the session speaks HTTP/2 and multiplexes the pushes over one connection;
+otherwise it keeps a pool of HTTP/1.1 keep-alive connections.
+
+push_stats() reports the timings of the recent batches and, per origin,
+how many requests went over a reused connection.
+"""
+import asyncio
 import json
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
 from pywebpush import webpush, WebPushException
 from app.config import settings
 
+try:
+    import h2  # noqa: F401 (httpx's HTTP/2 support)
+    import httpx
+except ImportError:
+    httpx = None
+
+_pool_lock = threading.Lock()
+_pool: Optional[ThreadPoolExecutor] = None
+
+_stats_lock = threading.Lock()
+_stats = {'sent': 0, 'failed': 0, 'batches': 0}
+_recent_batches = deque(maxlen=20)
+
+# push service origin -> its session
+_sessions_lock = threading.Lock()
+_sessions: Dict[str, object] = {}
+
+
+def get_pool() -> ThreadPoolExecutor:
+    """The shared delivery pool, started on first use."""
+
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=settings.PUSH_CONCURRENCY, thread_name_prefix='push')
+        return _pool
+
+
+def shutdown_pool():
+    """Stop the pool's threads and close the push service connections (app shutdown)."""
+
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(cancel_futures=True)
+            _pool = None
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
+
 
 async def send_push(endpoint: str, p256dh: str, auth: str, title: str, body: str) -> bool:
     """Send a single Web Push notification. Returns True on success."""
+    ok, _ = await _submit(endpoint, p256dh, auth, title, body)
+    return ok
+
+
+async def send_push_batch(subscriptions, title: str, body: str) -> List[bool]:
+    """
+    Send one notification to PushSubscription rows, all at once.
+
+    Returns whether each delivery succeeded, in the order of subscriptions,
+    and records the batch's timings for push_stats().
+    """
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(
+        _submit(s.endpoint, s.p256dh, s.auth, title, body) for s in subscriptions
+    ))
+    duration = time.perf_counter() - started
+
+    successful = sum(1 for ok, _ in results if ok)
+    durations = [seconds for _, seconds in results]
+    batch = {
+        'at': datetime.now().isoformat(timespec='seconds'),
+        'recipients': len(results),
+        'successful': successful,
+        'failed': len(results) - successful,
+        'duration_ms': round(duration * 1000, 1),
+        'slowest_ms': round(max(durations, default=0) * 1000, 1),
+        'average_ms': round(sum(durations) / len(durations) * 1000, 1) if durations else 0,
+    }
+    with _stats_lock:
+        _stats['batches'] += 1
+        _recent_batches.append(batch)
+
+    print(f"[push] batch: {batch['successful']}/{batch['recipients']} delivered in {batch['duration_ms']} ms "
+          f"(slowest {batch['slowest_ms']} ms)")
+    return [ok for ok, _ in results]
+
+
+def push_stats() -> Dict:
+    """Delivery counters, recent batch timings and connection reuse per push service of this worker."""
+
+    with _sessions_lock:
+        connections = {origin: session.counters() for origin, session in _sessions.items()}
+    with _stats_lock:
+        return {
+            'concurrency': settings.PUSH_CONCURRENCY,
+            'timeout_seconds': settings.PUSH_TIMEOUT_SECONDS,
+            **_stats,
+            'recent_batches': list(_recent_batches),
+            'connections': connections,
+        }
+
+
+async def _submit(endpoint: str, p256dh: str, auth: str, title: str, body: str) -> Tuple[bool, float]:
     payload = json.dumps({"title": title, "body": body})
+    return await asyncio.wrap_future(get_pool().submit(_deliver, endpoint, p256dh, auth, payload))
+
+
+def _deliver(endpoint: str, p256dh: str, auth: str, payload: str) -> Tuple[bool, float]:
+    # Runs on a pool thread; returns (delivered, seconds taken)
+    started = time.perf_counter()
     try:
         webpush(
             subscription_info={
@@ -16,11 +145,110 @@ async def send_push(endpoint: str, p256dh: str, auth: str, title: str, body: str
             data=payload,
             vapid_private_key=settings.VAPID_PRIVATE_KEY,
             vapid_claims={"sub": settings.VAPID_SUBJECT},
+            timeout=settings.PUSH_TIMEOUT_SECONDS,
+            requests_session=_session(endpoint),
         )
-        return True
+        ok = True
     except WebPushException as exc:
         print(f"Push failed [{endpoint[:50]}...]: {exc}")
-        return False
+        ok = False
     except Exception as exc:
         print(f"Push error: {exc}")
-        return False
+        ok = False
+
+    with _stats_lock:
+        _stats['sent' if ok else 'failed'] += 1
+    return ok, time.perf_counter() - started
+
+
+def _session(endpoint: str):
+    """The session of the endpoint's push service, opened on first use."""
+
+    parts = urlsplit(endpoint)
+    origin = f"{parts.scheme}://{parts.netloc}"
+    with _sessions_lock:
+        session = _sessions.get(origin)
+        if session is None:
+            session = _Http2Session() if httpx is not None and settings.PUSH_HTTP2 else _KeepAliveSession()
+            _sessions[origin] = session
+        return session
+
+
+class _KeepAliveSession:
+    """HTTP/1.1 keep-alive connections to one push service (requests)."""
+
+    protocol = 'HTTP/1.1'
+
+    def __init__(self):
+        self.session = requests.Session()
+        # One connection per delivery thread at most, kept open between pushes
+        self.adapter = HTTPAdapter(pool_connections=1, pool_maxsize=settings.PUSH_CONCURRENCY)
+        self.session.mount('https://', self.adapter)
+        self.session.mount('http://', self.adapter)
+
+    def post(self, *args, **kwargs):
+        return self.session.post(*args, **kwargs)
+
+    def counters(self) -> Dict:
+        # urllib3 counts the connections each pool opened and the requests it made
+        pools = self.adapter.poolmanager.pools
+        opened = made = 0
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is not None:
+                opened += pool.num_connections
+                made += pool.num_requests
+        return _counters(self.protocol, made, opened)
+
+    def close(self):
+        self.session.close()
+
+
+class _Http2Session:
+    """HTTP/2 connection to one push service (httpx), with the requests-style post() webpush() uses."""
+
+    # As negotiated with the push service (HTTP/1.1 if it does not offer HTTP/2)
+    protocol = 'HTTP/2'
+
+    def __init__(self):
+        self.client = httpx.Client(http2=True, limits=httpx.Limits(
+            max_connections=settings.PUSH_CONCURRENCY,
+            max_keepalive_connections=settings.PUSH_CONCURRENCY
+        ))
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.connections = 0
+
+    def post(self, url, data=None, headers=None, timeout=None):
+        opened = []
+
+        def trace(event, info):
+            if event == 'connection.connect_tcp.complete':
+                opened.append(event)
+
+        try:
+            response = self.client.post(url, content=data, headers=headers, timeout=timeout, extensions={'trace': trace})
+        finally:
+            with self._lock:
+                self.requests += 1
+                self.connections += len(opened)
+        self.protocol = response.http_version
+        # webpush() reports failures with requests' attribute name
+        response.reason = response.reason_phrase
+        return response
+
+    def counters(self) -> Dict:
+        with self._lock:
+            return _counters(self.protocol, self.requests, self.connections)
+
+    def close(self):
+        self.client.close()
+
+
+def _counters(protocol: str, made: int, opened: int) -> Dict:
+    return {
+        'protocol': protocol,
+        'requests': made,
+        'connections_opened': opened,
+        'reused': max(made - opened, 0),
+    }
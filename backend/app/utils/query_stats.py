@@ -0,0 +1,133 @@
+"""
+Per-request SQL statistics.
+
+Engine hooks (installed by the engine factory in app.database) count every
+statement and its time while a QueryStats is active for the current context.
+QueryStatsMiddleware starts one per HTTP request and reports it in a
+Server-Timing header, e.g.
+
+    Server-Timing: db;dur=12.4;desc="7 queries"
+
+Statements that run several times in one request with the same SQL (only the
+parameters differ) are the typical sign of a query per row (N+1); from
+QUERY_REPEAT_WARN repeats on the request is logged with the statement.
+assert_query_budget() checks the header of a response against a budget, so
+scripts and tests can fail when an endpoint starts issuing more queries.
+"""
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import List, Optional, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.config import settings
+
+_current: ContextVar[Optional['QueryStats']] = ContextVar('query_stats', default=None)
+
+SERVER_TIMING_PATTERN = re.compile(r'db;dur=([\d.]+);desc="(\d+) queries"')
+
+
+class QueryStats:
+    """Statements and database time of one request (or tracked block)."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0  # seconds
+        self.shapes = Counter()
+
+    def record(self, statement: str, duration: float):
+        self.count += 1
+        self.duration += duration
+        self.shapes[' '.join(statement.split())] += 1
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """Statements that ran at least `threshold` times, most frequent first."""
+        return [(shape, times) for shape, times in self.shapes.most_common() if times >= threshold]
+
+    def server_timing(self) -> str:
+        return f'db;dur={self.duration * 1000:.1f};desc="{self.count} queries"'
+
+
+@contextmanager
+def track_queries():
+    """Collect the statements run in this context (and tasks started from it) into a QueryStats."""
+
+    stats = QueryStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+def install_query_hooks(db_engine: Engine):
+    """Count statements of this engine (for an async engine pass its sync_engine)."""
+
+    event.listen(db_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(db_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    if stats is not None and conn.info.get('query_start'):
+        stats.record(statement, time.perf_counter() - conn.info['query_start'].pop())
+
+
+class QueryStatsMiddleware:
+    """Track the queries of each HTTP request and add a Server-Timing header."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries() as stats:
+            async def send_with_timing(message):
+                # Headers go out with the start of the response; queries run
+                # while the body streams are not included
+                if message['type'] == 'http.response.start':
+                    headers = list(message.get('headers', []))
+                    headers.append((b'server-timing', stats.server_timing().encode()))
+                    message = {**message, 'headers': headers}
+                    _log_repeats(scope, stats)
+                await send(message)
+
+            await self.app(scope, receive, send_with_timing)
+
+
+def _log_repeats(scope, stats: QueryStats):
+    repeated = stats.repeated(settings.QUERY_REPEAT_WARN)
+    if not repeated:
+        return
+
+    print(f"[QUERIES] {scope['method']} {scope['path']}: {stats.count} queries, "
+          f"{stats.duration * 1000:.1f} ms, repeated statements (N+1?):")
+    for shape, times in repeated:
+        print(f"[QUERIES]   {times}x {shape[:200]}")
+
+
+def response_query_count(response) -> Optional[int]:
+    """Query count from a response's Server-Timing header (None if missing)."""
+
+    match = SERVER_TIMING_PATTERN.search(response.headers.get('server-timing', ''))
+    return int(match.group(2)) if match else None
+
+
+def assert_query_budget(response, budget: int):
+    """Fail when the request behind a response ran more than `budget` queries."""
+
+    count = response_query_count(response)
+    assert count is not None, "Response has no Server-Timing query count"
+    assert count <= budget, (
+        f"{response.request.method} {response.request.url.path} ran {count} queries, budget is {budget}"
+    )
@@ -0,0 +1,54 @@
+"""
+Minimum valid access token version per user.
+
+Access tokens carry the user's token_version from login (the "ver" claim).
+Logging a user out everywhere bumps users.token_version: tokens issued before
+that are rejected, tokens from a later login are valid. Requests compare the
+claim with this map (user_id -> current version, only users that were ever
+logged out), so checking a session is an integer compare and no query.
+
+The worker that logs a user out updates its map right away. All workers
+reload the map from the database every TOKEN_VERSION_REFRESH_SECONDS (a
+scheduler job), so a logout reaches every worker within that interval.
+"""
+from typing import Dict
+from sqlalchemy.orm import Session
+from app.database import SessionLocal
+from app.models import User
+
+_versions: Dict[int, int] = {}
+
+
+def minimum(user_id: int) -> int:
+    """Lowest token version still valid for a user."""
+    return _versions.get(user_id, 0)
+
+
+def revoke(user: User):
+    """Invalidate all tokens of a user issued until now (on commit)."""
+    user.token_version = User.token_version + 1
+
+
+def revoked(user: User):
+    """Apply a committed revoke() in this worker, without waiting for the reload."""
+    if user.token_version > _versions.get(user.id, 0):
+        _versions[user.id] = user.token_version
+
+
+def load(db: Session):
+    """Replace the map with the versions in the database."""
+    global _versions
+    _versions = dict(
+        db.query(User.id, User.token_version).filter(User.token_version > 0).all()
+    )
+
+
+def refresh():
+    """load() on a session of its own (startup and the scheduler job)."""
+    db = SessionLocal()
+    try:
+        load(db)
+    except Exception as e:
+        print(f"[TOKENS] Failed to reload token versions: {e}")
+    finally:
+        db.close()
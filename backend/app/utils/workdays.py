@@ -0,0 +1,71 @@
+"""
+Scheduled working day arithmetic.
+
+A user's working days are their scheduled weekdays minus company holidays.
+WorkdayIndex numbers them with an ordinal so that counting the working days
+between two dates, or finding the previous/next one, takes constant time
+(plus a binary search over the holidays) however far apart the dates are.
+"""
+from bisect import bisect_left
+from datetime import date, timedelta
+from typing import Iterable, Optional, Set
+
+
+class WorkdayIndex:
+    """Ordinal index over the working days of one weekly schedule."""
+
+    def __init__(self, scheduled_days: Set[int], holidays: Iterable[date]):
+        # scheduled_days are Python weekday numbers (0=Monday)
+        self.scheduled_days = set(scheduled_days)
+        self.holidays = set(holidays)
+
+        # Only holidays on a scheduled weekday remove a working day
+        self._holidays_on_workdays = sorted(h for h in self.holidays if h.weekday() in self.scheduled_days)
+
+        # Scheduled weekdays before each weekday position within a week
+        self._week_prefix = [0]
+        for weekday in range(7):
+            self._week_prefix.append(self._week_prefix[-1] + (weekday in self.scheduled_days))
+
+    def is_workday(self, day: date) -> bool:
+        return day.weekday() in self.scheduled_days and day not in self.holidays
+
+    def ordinal(self, day: date) -> int:
+        """Number of working days before the given day (counted from 0001-01-01, a Monday)."""
+
+        weeks, weekday = divmod(day.toordinal() - 1, 7)
+        count = weeks * self._week_prefix[7] + self._week_prefix[weekday]
+        return count - bisect_left(self._holidays_on_workdays, day)
+
+    def workdays_between(self, first: date, last: date) -> int:
+        """Number of working days from first to last, both inclusive."""
+
+        if last < first:
+            return 0
+        return self.ordinal(last + timedelta(days=1)) - self.ordinal(first)
+
+    def previous_workday(self, day: date, not_before: Optional[date] = None) -> Optional[date]:
+        """Last working day before the given day, or None if there is none on/after not_before."""
+
+        if not_before is not None and self.workdays_between(not_before, day - timedelta(days=1)) == 0:
+            return None
+        if not self.scheduled_days:
+            return None
+
+        check_date = day - timedelta(days=1)
+        while not self.is_workday(check_date):
+            check_date -= timedelta(days=1)
+        return check_date
+
+    def next_workday(self, day: date, not_after: Optional[date] = None) -> Optional[date]:
+        """First working day after the given day, or None if there is none on/before not_after."""
+
+        if not_after is not None and self.workdays_between(day + timedelta(days=1), not_after) == 0:
+            return None
+        if not self.scheduled_days:
+            return None
+
+        check_date = day + timedelta(days=1)
+        while not self.is_workday(check_date):
+            check_date += timedelta(days=1)
+        return check_date
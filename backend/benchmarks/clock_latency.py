@@ -0,0 +1,205 @@
+"""
+Clock-in latency while an all-employee balance report is running.
+
+Seeds a temporary SQLite database like run_benchmarks.py, then sends
+concurrent clock-in requests through the ASGI app in one event loop, first
+on an idle server and then while 12-month /balance/all reports run in a loop.
+Prints p50/p95/p99/max latency for both phases, so a route that blocks the
+event loop shows up as a p99 close to the report's duration.
+
+Usage (from the backend directory):
+    python benchmarks/clock_latency.py
+    python benchmarks/clock_latency.py --employees 300 --concurrency 20 --pool-workers 0
+"""
+import argparse
+import asyncio
+import contextlib
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+os.environ.setdefault("JWT_SECRET", "benchmark")
+
+import httpx
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+from app.config import settings
+from app.database import Base, create_db_engine, create_async_db_engine, get_db, get_async_db
+from app.main import app
+from app.models import ClockEvent
+from app.security import create_access_token
+from app.utils.balance_pool import shutdown_pool
+from run_benchmarks import seed_database
+
+
+@contextlib.contextmanager
+def quiet_stdout():
+    """Silence the routes' print logging, including pool worker processes."""
+
+    sys.stdout.flush()
+    saved = os.dup(1)
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(devnull, 1)
+    try:
+        with contextlib.redirect_stdout(open(os.devnull, "w")):
+            yield
+    finally:
+        sys.stdout.flush()
+        os.dup2(saved, 1)
+        os.close(saved)
+        os.close(devnull)
+
+
+def percentiles(latencies: list) -> dict:
+    ordered = sorted(latencies)
+
+    def pick(fraction):
+        return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+    return {
+        'count': len(ordered),
+        'p50': pick(0.50),
+        'p95': pick(0.95),
+        'p99': pick(0.99),
+        'max': ordered[-1],
+        'mean': statistics.fmean(ordered)
+    }
+
+
+async def clock_in_all(client, tokens: list, concurrency: int) -> tuple:
+    """Clock in every token's employee, at most `concurrency` at a time; (latencies in ms, failures)."""
+
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    failures = []
+
+    async def clock_in(token):
+        async with semaphore:
+            started = time.perf_counter()
+            response = await client.post(
+                "/api/clock/in",
+                json={"reason": "Benchmark"},
+                headers={"Authorization": f"Bearer {token}"}
+            )
+            latencies.append((time.perf_counter() - started) * 1000)
+            if response.status_code != 200:
+                failures.append(response.status_code)
+
+    await asyncio.gather(*(clock_in(token) for token in tokens))
+    return latencies, failures
+
+
+async def run(tokens: list, admin_token: str, concurrency: int, report_months: int) -> dict:
+    # Unhandled errors (e.g. "database is locked") come back as 500s instead of raising
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        half = len(tokens) // 2
+        idle = await clock_in_all(client, tokens[:half], concurrency)
+
+        today = date.today()
+        report_params = {
+            'start_date': str(today - timedelta(days=30 * report_months)),
+            'end_date': str(today),
+            'detail': 'days'
+        }
+        report_times = []
+        done = asyncio.Event()
+
+        async def reports():
+            while not done.is_set():
+                started = time.perf_counter()
+                response = await client.get(
+                    "/api/reports/balance/all",
+                    params=report_params,
+                    headers={"Authorization": f"Bearer {admin_token}"}
+                )
+                report_times.append((time.perf_counter() - started) * 1000)
+                if response.status_code != 200:
+                    raise RuntimeError(f"Report failed: {response.status_code} {response.text}")
+
+        report_task = asyncio.create_task(reports())
+        # Let the first report get going before the clock-ins start
+        await asyncio.sleep(0.05)
+        busy = await clock_in_all(client, tokens[half:], concurrency)
+        done.set()
+        await report_task
+
+    return {'idle': idle, 'busy': busy, 'reports': report_times}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Clock-in latency during balance reports")
+    parser.add_argument("--employees", type=int, default=200)
+    parser.add_argument("--years", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--report-months", type=int, default=12)
+    parser.add_argument("--pool-workers", type=int, default=settings.BALANCE_POOL_WORKERS)
+    args = parser.parse_args()
+
+    settings.BALANCE_POOL_WORKERS = args.pool_workers
+
+    temp_dir = tempfile.mkdtemp(prefix="clock-bench-")
+    engine = create_db_engine(f"sqlite:///{temp_dir}/bench.db")
+    async_engine = create_async_db_engine(f"sqlite:///{temp_dir}/bench.db")
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+    def bench_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    async def bench_async_db():
+        async with AsyncSessionLocal() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = bench_db
+    app.dependency_overrides[get_async_db] = bench_async_db
+
+    try:
+        Base.metadata.create_all(bind=engine)
+        db = SessionLocal()
+        print(f"Seeding {args.employees} employees, {args.years} years...")
+        admin, user_ids, _, _ = seed_database(db, args.employees, args.years, args.seed)
+        # Clock-ins are for today
+        db.query(ClockEvent).filter(ClockEvent.date == date.today()).delete()
+        db.commit()
+        admin_token = create_access_token(data={"sub": str(admin.id)})
+        db.close()
+
+        tokens = [create_access_token(data={"sub": str(user_id)}) for user_id in user_ids]
+
+        with quiet_stdout():
+            results = asyncio.run(run(tokens, admin_token, args.concurrency, args.report_months))
+    finally:
+        app.dependency_overrides.clear()
+        shutdown_pool()
+        engine.dispose()
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+    print(f"\nConcurrency {args.concurrency}, {args.report_months}-month reports, "
+          f"{args.pool_workers} pool workers")
+    print(f"{'Clock-in (ms)':<16}{'count':>7}{'failed':>8}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}")
+    for phase in ('idle', 'busy'):
+        latencies, failures = results[phase]
+        stats = percentiles(latencies)
+        print(f"{phase:<16}{stats['count']:>7}{len(failures):>8}{stats['p50']:>9.1f}{stats['p95']:>9.1f}"
+              f"{stats['p99']:>9.1f}{stats['max']:>9.1f}")
+    report_stats = percentiles(results['reports'])
+    print(f"\n{len(results['reports'])} reports ran, median {statistics.median(results['reports']):.0f} ms, "
+          f"max {report_stats['max']:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""
+Query budgets for list endpoints.
+
+Seeds a temporary SQLite database like run_benchmarks.py (plus pending clock
+events and absences, and calendar events), calls each endpoint in BUDGETS
+through the app and fails when it runs more SQL statements than its budget.
+The count comes from the Server-Timing header of QueryStatsMiddleware, so
+this catches endpoints that start running a query per row (N+1).
+tests/test_query_budgets.py runs the same checks under pytest.
+
+Usage (from the backend directory):
+    python benchmarks/query_budgets.py
+"""
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+from datetime import date, time, timedelta
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+os.environ.setdefault("JWT_SECRET", "benchmark")
+
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+from app.database import Base, create_db_engine, create_async_db_engine, get_db, get_async_db
+from app.main import app
+from app.models import ClockEvent, Absence, EventCategory, CalendarEvent, EventAssignment
+from app.security import create_access_token
+from app.utils.query_stats import assert_query_budget, response_query_count
+from run_benchmarks import seed_database
+
+EMPLOYEES = 20
+
+# Maximum number of queries per endpoint with EMPLOYEES employees. Lower a
+# budget when an endpoint gets cheaper, so it can't silently regress again.
+BUDGETS = {
+    "/api/clock/all-events": 2,
+    "/api/clock/pending": 2,
+    "/api/absences/all": 2,
+    "/api/absences/pending": 2,
+    "/api/calendar/events": 2,
+    "/api/calendar/events/pending": 2,
+    "/api/users/": 3,
+    "/api/employees/team-today": 2,
+}
+
+
+def budget_params():
+    """Query parameters of the endpoints that need a date range."""
+
+    today = date.today()
+    return {
+        "/api/clock/all-events": {'start_date': str(today - timedelta(days=31)), 'end_date': str(today)},
+        "/api/calendar/events": {'from': str(today), 'to': str(today + timedelta(days=30))},
+    }
+
+
+def seed_requests(db, admin, user_ids):
+    """Pending clock events and absences and some calendar events, next to seed_database()."""
+
+    today = date.today()
+    for number, user_id in enumerate(user_ids[:10]):
+        day = today + timedelta(days=30 + number)
+        db.add(ClockEvent(
+            user_id=user_id, date=day, clock_in=time(9), clock_out=time(17),
+            status='pending', requested_reason='Benchmark'
+        ))
+        db.add(Absence(
+            user_id=user_id, start_date=day + timedelta(days=30), end_date=day + timedelta(days=31),
+            type='vacation', reason='Benchmark', status='pending'
+        ))
+
+    category = EventCategory(name="Meeting")
+    db.add(category)
+    db.flush()
+    for number in range(20):
+        event = CalendarEvent(
+            title=f"Event {number}", category_id=category.id, date=today + timedelta(days=number),
+            visibility='all' if number % 2 else 'specific',
+            status='pending' if number % 5 == 0 else 'approved',
+            created_by=user_ids[number % len(user_ids)]
+        )
+        db.add(event)
+        db.flush()
+        if event.visibility == 'specific':
+            db.add_all([EventAssignment(event_id=event.id, user_id=user_id) for user_id in user_ids[:3]])
+    db.commit()
+
+
+def main():
+    temp_dir = tempfile.mkdtemp(prefix="query-budgets-")
+    engine = create_db_engine(f"sqlite:///{temp_dir}/bench.db")
+    async_engine = create_async_db_engine(f"sqlite:///{temp_dir}/bench.db")
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+    def budget_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    async def budget_async_db():
+        async with AsyncSessionLocal() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = budget_db
+    app.dependency_overrides[get_async_db] = budget_async_db
+
+    failures = []
+    try:
+        Base.metadata.create_all(bind=engine)
+        db = SessionLocal()
+        admin, user_ids, _, _ = seed_database(db, EMPLOYEES, 1, 1)
+        seed_requests(db, admin, user_ids)
+        headers = {"Authorization": f"Bearer {create_access_token(data={'sub': str(admin.id)})}"}
+        db.close()
+
+        params = budget_params()
+
+        # Not as a context manager: that would start the scheduler (lifespan)
+        client = TestClient(app)
+        print(f"{'Endpoint':<34}{'Queries':>9}{'Budget':>8}")
+        for path, budget in BUDGETS.items():
+            log = io.StringIO()
+            with contextlib.redirect_stdout(log):
+                response = client.get(path, params=params.get(path), headers=headers)
+            if response.status_code != 200:
+                failures.append(f"{path}: HTTP {response.status_code}")
+                continue
+            print(f"{path:<34}{response_query_count(response):>9}{budget:>8}")
+            try:
+                assert_query_budget(response, budget)
+            except AssertionError as error:
+                failures.append(str(error))
+                # The middleware's log of repeated statements
+                failures += [line for line in log.getvalue().splitlines() if line.startswith("[QUERIES]")]
+    finally:
+        app.dependency_overrides.clear()
+        engine.dispose()
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+    if failures:
+        print("\n❌ Over budget:")
+        for failure in failures:
+            print(f"   {failure}")
+        sys.exit(1)
+
+    print("\n✅ All endpoints within their query budget")
+
+
+if __name__ == "__main__":
+    main()
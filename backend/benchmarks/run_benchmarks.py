@@ -0,0 +1,297 @@
+"""
+Benchmarks for the balance calculation and report paths.
+
+Seeds a temporary SQLite database with employees, years of clock events,
+sick/vacation absences and company holidays, then times each scenario and
+counts its SQL queries. Results are compared against benchmarks/baseline.json:
+a scenario fails when it gets slower than the baseline by more than the
+tolerance, or runs more queries than the baseline.
+
+The ledger_* scenarios read a multi-year balance through ledger_balance(),
+cold (ledger not materialized, days computed in memory) and warm (stored
+days and month checkpoints); cached_* go through the balance cache, cold
+(just invalidated by a write) and warm (a hit).
+
+Usage (from the backend directory):
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --employees 200 --years 5
+    python benchmarks/run_benchmarks.py --update-baseline
+
+Timings depend on the machine; update the baseline on the machine that runs
+the comparison.
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, time as time_of_day, timedelta
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+os.environ.setdefault("JWT_SECRET", "benchmark")
+
+from fastapi import Request, Response
+from sqlalchemy import event, insert
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+from app.database import Base, create_db_engine, create_async_db_engine
+from app.models import User, WorkSchedule, ClockEvent, Absence, CompanyHoliday
+from app.utils.calculations import calculate_user_balance, calculate_balances
+from app.utils.csv_export import generate_monthly_report_csv
+from app.routes.reports import get_today_status
+from app.utils import balance_cache, ledger, presence_board
+from app.utils.balance_cache import cached_balance
+from app.utils.ledger import ledger_balance
+
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baseline.json"
+
+
+def seed_database(db, employees: int, years: int, seed: int):
+    """Fill an empty database with deterministic test data ending today."""
+
+    rnd = random.Random(seed)
+    today = date.today()
+    first_day = today.replace(year=today.year - years)
+
+    admin = User(username="admin", email="admin@example.com", password_hash="-", role="admin", is_active=True)
+    db.add(admin)
+    db.flush()
+
+    holidays = []
+    for year in range(first_day.year, today.year + 1):
+        for month, day in [(1, 1), (4, 27), (5, 5), (12, 25), (12, 26)]:
+            holidays.append({'name': 'Holiday', 'date': date(year, month, day), 'created_by': admin.id})
+    db.execute(insert(CompanyHoliday), holidays)
+
+    users = [
+        {
+            'username': f"employee{number}",
+            'email': f"employee{number}@example.com",
+            'password_hash': "-",
+            'role': "employee",
+            'is_active': True,
+            'expected_weekly_hours': rnd.choice([24, 32, 36, 40])
+        }
+        for number in range(employees)
+    ]
+    db.execute(insert(User), users)
+    user_ids = [user.id for user in db.query(User).filter(User.role == 'employee').all()]
+
+    schedules = []
+    clock_events = []
+    absences = []
+    for user_id in user_ids:
+        # JS day numbers, 1-5 = Monday-Friday
+        js_days = sorted(rnd.sample([1, 2, 3, 4, 5], rnd.choice([3, 4, 5])))
+        schedules += [{'user_id': user_id, 'day_of_week': js_day} for js_day in js_days]
+        scheduled = {(js_day - 1) % 7 for js_day in js_days}
+
+        day = first_day
+        while day <= today:
+            if rnd.random() < 0.02:
+                length = rnd.randint(1, 15)
+                absences.append({
+                    'user_id': user_id,
+                    'start_date': day,
+                    'end_date': day + timedelta(days=length - 1),
+                    'type': rnd.choice(['sick', 'sick', 'vacation', 'personal']),
+                    'reason': 'Benchmark',
+                    'status': 'approved'
+                })
+                day += timedelta(days=length)
+                continue
+
+            if day.weekday() in scheduled and rnd.random() < 0.95:
+                clock_in = time_of_day(rnd.randint(7, 9), rnd.choice([0, 15, 30, 45]))
+                clock_out = time_of_day(rnd.randint(15, 18), rnd.choice([0, 15, 30, 45]))
+                by_car = rnd.random() < 0.3
+                clock_events.append({
+                    'user_id': user_id,
+                    'date': day,
+                    'clock_in': clock_in,
+                    'clock_out': clock_out,
+                    'came_by_car': by_car,
+                    'parking_cost': 5.0 if by_car else None,
+                    'km_driven': 24.5 if by_car else None,
+                    'status': 'approved'
+                })
+            day += timedelta(days=1)
+
+    db.execute(insert(WorkSchedule), schedules)
+    db.execute(insert(ClockEvent), clock_events)
+    db.execute(insert(Absence), absences)
+    db.commit()
+
+    return admin, user_ids, len(clock_events), len(absences)
+
+
+def run_scenarios(db, async_session, admin, user_ids, years: int, repeat: int, query_counter: dict) -> dict:
+    today = date.today()
+    month_end = today.replace(day=1) - timedelta(days=1)
+    month_start = month_end.replace(day=1)
+    years_start = today.replace(year=today.year - years)
+    user_id = user_ids[0]
+    loop = asyncio.new_event_loop()
+
+    # The ledger of user_id is materialized (as by the scheduler job), the
+    # ledger of cold_user_id is not, so reading it computes the days in memory
+    cold_user_id = user_ids[1]
+    ledger.materialize_user(db, user_id)
+    db.commit()
+
+    def employees():
+        # Loaded inside the scenario: expire_all() would otherwise turn every
+        # employee into a lazy reload, counted as queries of the calculation
+        return db.query(User).filter(User.role == 'employee', User.is_active == True).all()
+
+    def invalidate_cache():
+        # As after a write of the user: the cached result is no longer used
+        balance_cache.bump_user_version(db, user_id)
+        db.commit()
+
+    async def today_status():
+        # Build the presence board each time (as at midnight and on the periodic
+        # rebuild); otherwise only the first run would touch the database
+        async with async_session() as async_db:
+            await async_db.run_sync(presence_board.rebuild)
+            request = Request({'type': 'http', 'method': 'GET', 'path': '/api/reports/today-status', 'headers': []})
+            return await get_today_status(request=request, response=Response(), db=async_db, current_user=admin)
+
+    scenarios = {
+        'single_user_month': lambda: calculate_user_balance(db, user_id, month_start, month_end),
+        'single_user_multi_year': lambda: calculate_user_balance(db, user_id, years_start, today),
+        'all_employees_month': lambda: calculate_balances(db, employees(), month_start, month_end, kernel='numpy'),
+        'csv_export': lambda: generate_monthly_report_csv(db, month_start.year, month_start.month),
+        'today_status': lambda: loop.run_until_complete(today_status()),
+        'ledger_multi_year_cold': lambda: ledger_balance(db, cold_user_id, years_start, today, 'none'),
+        'ledger_multi_year_warm': lambda: ledger_balance(db, user_id, years_start, today, 'none'),
+        'cached_multi_year_cold': lambda: cached_balance(db, user_id, years_start, today, 'none'),
+        'cached_multi_year_warm': lambda: cached_balance(db, user_id, years_start, today, 'none'),
+    }
+    # Run before each timed run, not timed or counted
+    setups = {
+        'cached_multi_year_cold': invalidate_cache,
+        'cached_multi_year_warm': lambda: cached_balance(db, user_id, years_start, today, 'none'),
+    }
+
+    results = {}
+    for name, scenario in scenarios.items():
+        timings = []
+        queries = 0
+        for _ in range(repeat):
+            if name in setups:
+                setups[name]()
+            db.expire_all()
+            query_counter['count'] = 0
+            started = time.perf_counter()
+            # The calculation prints conversion lines per user
+            with contextlib.redirect_stdout(io.StringIO()):
+                scenario()
+            timings.append((time.perf_counter() - started) * 1000)
+            queries = query_counter['count']
+        results[name] = {
+            'median_ms': round(statistics.median(timings), 2),
+            'queries': queries
+        }
+    loop.close()
+    return results
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """Scenarios that regressed past the baseline, as readable messages."""
+
+    failures = []
+    for name, result in results.items():
+        expected = baseline.get('scenarios', {}).get(name)
+        if expected is None:
+            continue
+        allowed_ms = expected['median_ms'] * (1 + tolerance)
+        if result['median_ms'] > allowed_ms:
+            failures.append(
+                f"{name}: {result['median_ms']} ms > {allowed_ms:.2f} ms "
+                f"(baseline {expected['median_ms']} ms + {tolerance:.0%})"
+            )
+        if result['queries'] > expected['queries']:
+            failures.append(f"{name}: {result['queries']} queries > baseline {expected['queries']}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark balance calculations and reports")
+    parser.add_argument("--employees", type=int, default=50)
+    parser.add_argument("--years", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--tolerance", type=float, default=0.5, help="Allowed slowdown, 0.5 = 50%%")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args()
+
+    temp_dir = tempfile.mkdtemp(prefix="balance-bench-")
+    engine = create_db_engine(f"sqlite:///{temp_dir}/bench.db")
+    async_engine = create_async_db_engine(f"sqlite:///{temp_dir}/bench.db")
+    query_counter = {'count': 0}
+
+    def count_query(conn, cursor, statement, parameters, context, executemany):
+        query_counter['count'] += 1
+
+    event.listen(engine, "before_cursor_execute", count_query)
+    event.listen(async_engine.sync_engine, "before_cursor_execute", count_query)
+
+    try:
+        Base.metadata.create_all(bind=engine)
+        db = sessionmaker(bind=engine)()
+
+        print(f"Seeding {args.employees} employees, {args.years} years...")
+        admin, user_ids, clock_count, absence_count = seed_database(db, args.employees, args.years, args.seed)
+        print(f"  {clock_count} clock events, {absence_count} absences")
+
+        async_session = async_sessionmaker(async_engine, expire_on_commit=False)
+        results = run_scenarios(db, async_session, admin, user_ids, args.years, args.repeat, query_counter)
+        db.close()
+    finally:
+        engine.dispose()
+        asyncio.run(async_engine.dispose())
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+    print(f"\n{'Scenario':<26}{'Median (ms)':>12}{'Queries':>10}")
+    for name, result in results.items():
+        print(f"{name:<26}{result['median_ms']:>12}{result['queries']:>10}")
+
+    params = {'employees': args.employees, 'years': args.years, 'seed': args.seed}
+
+    if args.update_baseline:
+        args.baseline.write_text(json.dumps({'params': params, 'scenarios': results}, indent=2) + "\n")
+        print(f"\n✅ Baseline written to {args.baseline}")
+        return
+
+    if not args.baseline.exists():
+        print("\nℹ️  No baseline yet, run with --update-baseline to store one")
+        return
+
+    baseline = json.loads(args.baseline.read_text())
+    if baseline.get('params') != params:
+        print(f"\n❌ Baseline was recorded with {baseline.get('params')}, not {params}")
+        sys.exit(1)
+
+    failures = compare(results, baseline, args.tolerance)
+    if failures:
+        print("\n❌ Regressions against baseline:")
+        for failure in failures:
+            print(f"   {failure}")
+        sys.exit(1)
+
+    print("\n✅ No regressions against baseline")
+
+
+if __name__ == "__main__":
+    main()
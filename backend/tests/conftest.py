@@ -0,0 +1,84 @@
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+os.environ.setdefault("JWT_SECRET", "test")
+
+
+@pytest.fixture
+def engine(tmp_path):
+    """Engine on an empty SQLite database with the full schema."""
+
+    from app.database import Base, create_db_engine
+
+    engine = create_db_engine(f"sqlite:///{tmp_path}/test.db")
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def db(engine):
+    from sqlalchemy.orm import sessionmaker
+
+    session = sessionmaker(bind=engine)()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def client(engine, monkeypatch):
+    """TestClient of the app with both sessions on the test database."""
+
+    from fastapi.testclient import TestClient
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+    from sqlalchemy.orm import sessionmaker
+    from app.config import settings
+    from app.database import create_async_db_engine, get_db, get_async_db
+    from app.main import app
+
+    # Users are looked up on every request: ids repeat across test databases
+    monkeypatch.setattr(settings, "PRINCIPAL_CACHE_TTL", 0)
+
+    async_engine = create_async_db_engine(str(engine.url))
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+    def test_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    async def test_async_db():
+        async with AsyncSessionLocal() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = test_db
+    app.dependency_overrides[get_async_db] = test_async_db
+    try:
+        # Not as a context manager: that would start the scheduler (lifespan)
+        yield TestClient(app)
+    finally:
+        app.dependency_overrides.clear()
+        asyncio.run(async_engine.dispose())
+
+
+@pytest.fixture
+def auth_headers():
+    """Bearer token headers of a user."""
+
+    from app.security import create_access_token
+
+    def headers(user) -> dict:
+        return {"Authorization": f"Bearer {create_access_token(data={'sub': str(user.id)})}"}
+
+    return headers
@@ -0,0 +1,27 @@
+"""The NumPy kernel against iter_day_entries."""
+from datetime import date
+from app.utils.balance_kernel import day_arrays
+from app.utils.calculations import iter_day_entries
+
+# Mon-Fri (Python weekdays), 8 hours a day
+SCHEDULED_DAYS = {0, 1, 2, 3, 4}
+HOURS_PER_DAY = 8.0
+
+
+def test_reversed_range_has_no_days():
+    start_date, end_date = date(2026, 10, 17), date(2026, 10, 7)
+
+    arrays = day_arrays(SCHEDULED_DAYS, HOURS_PER_DAY, {}, [], set(), start_date, end_date)
+
+    assert arrays.entries() == []
+    assert arrays.entries() == list(iter_day_entries(SCHEDULED_DAYS, HOURS_PER_DAY, {}, [], set(), start_date, end_date))
+    assert all(values == [] for values in arrays.total_values().values())
+
+
+def test_same_entries_as_day_loop():
+    start_date, end_date = date(2026, 10, 1), date(2026, 10, 31)
+    holidays = {date(2026, 10, 12)}
+
+    arrays = day_arrays(SCHEDULED_DAYS, HOURS_PER_DAY, {}, [], holidays, start_date, end_date)
+
+    assert arrays.entries() == list(iter_day_entries(SCHEDULED_DAYS, HOURS_PER_DAY, {}, [], holidays, start_date, end_date))
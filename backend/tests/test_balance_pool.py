@@ -0,0 +1,82 @@
+"""calculate_balances_parallel() against calculate_balances(), with and without a working pool."""
+import asyncio
+import sys
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date
+from pathlib import Path
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from app.config import settings
+from app.database import create_async_db_engine
+from app.models import User
+from app.utils import balance_pool
+from app.utils.calculations import calculate_balances
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "benchmarks"))
+from run_benchmarks import seed_database  # noqa: E402
+
+TODAY = date.today()
+RANGES = [
+    (TODAY.replace(day=1), TODAY),
+    (TODAY.replace(year=TODAY.year - 1), TODAY),
+]
+
+
+@pytest.fixture
+def users(db):
+    # Employees and the admin, which gets the not-an-employee entry
+    seed_database(db, 7, 1, 3)
+    return db.query(User).order_by(User.id).all()
+
+
+@pytest.fixture
+def parallel(engine, monkeypatch):
+    """calculate_balances_parallel on the test database, with a pool of 3 workers."""
+
+    monkeypatch.setattr(settings, "BALANCE_POOL_WORKERS", 3)
+    async_engine = create_async_db_engine(str(engine.url))
+    AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False)
+
+    def calculate(users, start_date, end_date, detail, kernel):
+        async def run():
+            async with AsyncSessionLocal() as db:
+                return await balance_pool.calculate_balances_parallel(db, users, start_date, end_date, detail, kernel)
+        return asyncio.run(run())
+
+    yield calculate
+    balance_pool.shutdown_pool()
+    asyncio.run(async_engine.dispose())
+
+
+@pytest.mark.parametrize("kernel", ['python', 'numpy'])
+@pytest.mark.parametrize("detail", ['none', 'days'])
+def test_parallel_matches_calculate_balances(db, users, parallel, kernel, detail):
+    for start, end in RANGES:
+        expected = calculate_balances(db, users, start, end, detail, kernel)
+
+        assert parallel(users, start, end, detail, kernel) == expected
+    # Computed by the worker processes, not the in-process fallback
+    assert isinstance(balance_pool._pool, ProcessPoolExecutor)
+
+
+class BrokenPool:
+    """A pool whose worker died: every submitted job fails."""
+
+    def submit(self, *args, **kwargs):
+        future = Future()
+        future.set_exception(BrokenProcessPool("A worker process died"))
+        return future
+
+    def shutdown(self, cancel_futures=False):
+        pass
+
+
+def test_broken_pool_computes_in_process(db, users, parallel, monkeypatch):
+    monkeypatch.setattr(balance_pool, "_pool", BrokenPool())
+    start, end = RANGES[1]
+    expected = calculate_balances(db, users, start, end, 'days', 'numpy')
+
+    assert parallel(users, start, end, 'days', 'numpy') == expected
+    # The broken pool is dropped, the next report starts a fresh one
+    assert balance_pool._pool is None
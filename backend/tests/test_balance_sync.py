@@ -0,0 +1,121 @@
+"""Balance reads stay read-only and match the day loop after every kind of write."""
+from collections import OrderedDict
+from datetime import date, time, timedelta
+import pytest
+from fastapi.encoders import jsonable_encoder
+from app.models import User, WorkSchedule, ClockEvent, Absence, DailyLedger, BalanceCheckpoint
+from app.utils import balance_cache, ledger
+from app.utils.calculations import calculate_user_balance
+
+TODAY = date.today()
+MONTH_START = TODAY.replace(day=1)
+HISTORY_START = (MONTH_START - timedelta(days=80)).replace(day=1)
+
+# Ranges within, across and beyond the materialized months
+RANGES = [
+    (HISTORY_START, TODAY),
+    (HISTORY_START + timedelta(days=17), MONTH_START - timedelta(days=9)),
+    (HISTORY_START, MONTH_START - timedelta(days=1)),
+    (MONTH_START, MONTH_START + timedelta(days=90)),
+    (HISTORY_START - timedelta(days=40), HISTORY_START + timedelta(days=40)),
+]
+
+
+@pytest.fixture(autouse=True)
+def empty_cache(monkeypatch):
+    # Cache keys repeat across test databases
+    monkeypatch.setattr(balance_cache, "_entries", OrderedDict())
+
+
+@pytest.fixture
+def admin(db):
+    user = User(username="admin", email="admin@example.com", password_hash="-", role="admin", is_active=True)
+    db.add(user)
+    db.commit()
+    return user
+
+
+@pytest.fixture
+def employee(db):
+    user = User(
+        username="employee", email="employee@example.com", password_hash="-",
+        role="employee", is_active=True, expected_weekly_hours=32
+    )
+    db.add(user)
+    db.flush()
+    db.add_all([WorkSchedule(user_id=user.id, day_of_week=js_day) for js_day in (1, 2, 3, 4)])
+
+    day = HISTORY_START
+    while day < TODAY:
+        if day.weekday() < 4 and day.day % 7:
+            db.add(ClockEvent(
+                user_id=user.id, date=day, clock_in=time(8, day.day % 30, 15), clock_out=time(16, 45),
+                came_by_car=day.day % 3 == 0, parking_cost=2.345 if day.day % 3 == 0 else None
+            ))
+        day += timedelta(days=1)
+    db.add(Absence(
+        user_id=user.id, start_date=HISTORY_START + timedelta(days=20), end_date=HISTORY_START + timedelta(days=24),
+        type='sick', reason="Test", status='approved'
+    ))
+    db.commit()
+    return user
+
+
+def assert_matches_day_loop(client, db, user, headers):
+    for start, end in RANGES:
+        for detail in ('none', 'days'):
+            response = client.get(
+                f"/api/reports/balance/user/{user.id}",
+                params={'start_date': str(start), 'end_date': str(end), 'detail': detail},
+                headers=headers
+            )
+            assert response.status_code == 200
+            db.expire_all()
+            expected = calculate_user_balance(db, user.id, start, end, detail=detail)
+            assert response.json() == jsonable_encoder(expected), (start, end, detail)
+
+
+def ledger_rows(db):
+    return db.query(DailyLedger).count(), db.query(BalanceCheckpoint).count()
+
+
+def test_balance_reads_do_not_write(client, db, admin, employee, auth_headers):
+    assert_matches_day_loop(client, db, employee, auth_headers(admin))
+
+    assert ledger_rows(db) == (0, 0)
+
+
+def test_balance_matches_day_loop_after_writes(client, db, admin, employee, auth_headers):
+    headers = auth_headers(admin)
+    assert ledger.materialize_user(db, employee.id)
+    db.commit()
+    assert all(ledger_rows(db))
+    assert_matches_day_loop(client, db, employee, headers)
+
+    # Clock event on a day off in a closed month
+    day_off = HISTORY_START + timedelta(days=(4 - HISTORY_START.weekday()) % 7 + 7)
+    response = client.post("/api/clock/create", params={
+        'user_id': employee.id, 'event_date': str(day_off),
+        'clock_in_time': '09:00:00', 'clock_out_time': '13:30:00'
+    }, headers=headers)
+    assert response.status_code == 200
+    assert_matches_day_loop(client, db, employee, headers)
+
+    # Open-ended sick leave from a past month
+    response = client.post("/api/absences/admin", json={
+        'user_id': employee.id, 'start_date': str(MONTH_START - timedelta(days=12)),
+        'type': 'sick', 'reason': "Test", 'auto_approve': True
+    }, headers=headers)
+    assert response.status_code == 200
+    assert_matches_day_loop(client, db, employee, headers)
+
+    # Schedule change: every day of the user
+    response = client.put(f"/api/users/{employee.id}/schedule", json={'days': [1, 3, 5]}, headers=headers)
+    assert response.status_code == 200
+    assert_matches_day_loop(client, db, employee, headers)
+
+    # Company holiday on a scheduled day of a closed month
+    holiday = HISTORY_START + timedelta(days=(2 - HISTORY_START.weekday()) % 7 + 14)
+    response = client.post("/api/calendar/holidays", json={'name': "Holiday", 'date': str(holiday)}, headers=headers)
+    assert response.status_code == 200
+    assert_matches_day_loop(client, db, employee, headers)
@@ -0,0 +1,130 @@
+"""Balance totals (day loop, ledger, checkpoints) against running sums over the days."""
+import random
+from datetime import date, time, timedelta
+from app.models import User, WorkSchedule, ClockEvent, Absence, CompanyHoliday
+from app.utils.calculations import (
+    EXTRA_DAY_TYPES,
+    MISSING_DAY_TYPES,
+    absence_overlap,
+    calculate_user_balance,
+    iter_day_entries,
+    running_total,
+)
+from app.utils.ledger import ledger_balance
+
+FIRST_DAY, LAST_DAY = date(2022, 1, 1), date(2024, 12, 31)
+
+
+def seed_employees(db, rnd, count):
+    """Employees with clock times to the second and parking/km to a tenth of a cent.
+
+    Such amounts often add up to exactly half a cent, where the rounding of a
+    running sum decides the last digit.
+    """
+
+    admin = User(username="admin", email="admin@example.com", password_hash="-", role="admin", is_active=True)
+    db.add(admin)
+    db.flush()
+    for year in range(FIRST_DAY.year, LAST_DAY.year + 1):
+        db.add(CompanyHoliday(name="Holiday", date=date(year, 4, 27), created_by=admin.id))
+
+    user_ids = []
+    for number in range(count):
+        user = User(
+            username=f"employee{number}", email=f"employee{number}@example.com", password_hash="-",
+            role="employee", is_active=True, expected_weekly_hours=rnd.choice([24, 32, 36, 38, 40])
+        )
+        db.add(user)
+        db.flush()
+        user_ids.append(user.id)
+        for js_day in sorted(rnd.sample([1, 2, 3, 4, 5], rnd.choice([3, 4, 5]))):
+            db.add(WorkSchedule(user_id=user.id, day_of_week=js_day))
+
+        day = FIRST_DAY
+        while day <= LAST_DAY:
+            if rnd.random() < 0.02:
+                length = rnd.randint(1, 12)
+                db.add(Absence(
+                    user_id=user.id, start_date=day, end_date=day + timedelta(days=length - 1),
+                    type=rnd.choice(['sick', 'vacation', 'personal']), reason="Test", status='approved'
+                ))
+                day += timedelta(days=length)
+                continue
+            if day.weekday() < 5 and rnd.random() < 0.9:
+                by_car = rnd.random() < 0.3
+                db.add(ClockEvent(
+                    user_id=user.id, date=day,
+                    clock_in=time(rnd.randint(7, 9), rnd.randint(0, 59), rnd.randint(0, 59)),
+                    clock_out=time(rnd.randint(14, 18), rnd.randint(0, 59), rnd.randint(0, 59)),
+                    came_by_car=by_car,
+                    parking_cost=rnd.randint(0, 9999) / 1000 if by_car else None,
+                    km_driven=rnd.randint(0, 99999) / 1000 if by_car else None,
+                    status='approved'
+                ))
+            day += timedelta(days=1)
+    db.commit()
+    return user_ids
+
+
+def day_loop_totals(db, user_id, start_date, end_date):
+    """The rounded totals as the original day loop added them up: one running float sum per total."""
+
+    user = db.get(User, user_id)
+    scheduled_days = {(ws.day_of_week - 1) % 7 for ws in db.query(WorkSchedule).filter_by(user_id=user_id)}
+    hours_per_day = float(user.expected_weekly_hours) / len(scheduled_days)
+    clock_events = {
+        ce.date: ce
+        for ce in db.query(ClockEvent).filter(
+            ClockEvent.user_id == user_id, ClockEvent.date >= start_date, ClockEvent.date <= end_date
+        )
+    }
+    absences = db.query(Absence).filter(
+        Absence.user_id == user_id, Absence.status == 'approved', *absence_overlap(start_date, end_date)
+    ).order_by(Absence.start_date).all()
+    holidays = {
+        h.date
+        for h in db.query(CompanyHoliday).filter(CompanyHoliday.date >= start_date, CompanyHoliday.date <= end_date)
+    }
+
+    hours_worked = extra_hours = missing_hours = parking = km = 0.0
+    for entry in iter_day_entries(scheduled_days, hours_per_day, clock_events, absences, holidays, start_date, end_date):
+        _, day_type, day_hours, _, balance_change, day_parking, day_km = entry
+        hours_worked += day_hours
+        parking += day_parking
+        km += day_km
+        if day_type in EXTRA_DAY_TYPES:
+            extra_hours += balance_change
+        elif day_type in MISSING_DAY_TYPES:
+            missing_hours += -balance_change
+
+    return {
+        'total_hours_worked': round(hours_worked, 2),
+        'extra_hours': round(extra_hours, 2),
+        'missing_hours': round(missing_hours, 2),
+        'balance': round(extra_hours - missing_hours, 2),
+        'total_parking': round(parking, 2),
+        'total_km': round(km, 2),
+    }
+
+
+def test_running_total_adds_in_order():
+    # 1.0 + 1e16 rounds back to 1e16; an exact sum would give 1.0
+    assert running_total([1.0, 1e16, -1e16]) == 0.0
+    assert running_total([]) == 0.0
+
+
+def test_ledger_totals_match_day_loop(db):
+    rnd = random.Random(3)
+    user_ids = seed_employees(db, rnd, 4)
+
+    for _ in range(150):
+        user_id = rnd.choice(user_ids)
+        start_date = FIRST_DAY + timedelta(days=rnd.randint(0, 900))
+        end_date = min(start_date + timedelta(days=rnd.randint(0, 600)), LAST_DAY)
+
+        expected = day_loop_totals(db, user_id, start_date, end_date)
+        results = [calculate_user_balance(db, user_id, start_date, end_date, detail='none')] + [
+            ledger_balance(db, user_id, start_date, end_date, detail=detail) for detail in ('none', 'days')
+        ]
+        for result in results:
+            assert {key: result[key] for key in expected} == expected, (user_id, start_date, end_date)
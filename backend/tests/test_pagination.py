@@ -0,0 +1,103 @@
+"""Keyset pagination of the list endpoints: cursor round-trips and filters."""
+from datetime import date, datetime
+import pytest
+from app.models import User, Absence
+
+CURSOR = "X-Next-Cursor"
+
+
+@pytest.fixture
+def employee(db):
+    user = User(username="employee", email="employee@example.com", password_hash="-", role="employee", is_active=True)
+    db.add(user)
+    db.commit()
+    return user
+
+
+@pytest.fixture
+def admin(db):
+    user = User(username="admin", email="admin@example.com", password_hash="-", role="admin", is_active=True)
+    db.add(user)
+    db.commit()
+    return user
+
+
+def add_absences(db, user, spans, status='approved', created_at=None):
+    absences = [
+        Absence(
+            user_id=user.id, start_date=start, end_date=end, type='vacation', reason="Test",
+            status=status, created_at=created_at or datetime(2026, 1, 1, 12)
+        )
+        for start, end in spans
+    ]
+    db.add_all(absences)
+    db.commit()
+    return [absence.id for absence in absences]
+
+
+def walk(client, path, headers, params):
+    """Ids of every page of a list endpoint, following the cursor, and the page sizes."""
+
+    ids, sizes, cursor = [], [], None
+    while True:
+        response = client.get(path, params={**params, 'cursor': cursor} if cursor else params, headers=headers)
+        assert response.status_code == 200
+        ids += [row['id'] for row in response.json()]
+        sizes.append(len(response.json()))
+        cursor = response.headers.get(CURSOR)
+        if cursor is None:
+            return ids, sizes
+
+
+def test_ties_on_the_sort_key_are_split_by_id(client, db, admin, employee, auth_headers):
+    # Eight absences created at the same moment: only the id orders them
+    ids = add_absences(db, employee, [(date(2026, 3, day), date(2026, 3, day)) for day in range(1, 9)])
+    newer = add_absences(db, employee, [(date(2026, 3, 20), None)], created_at=datetime(2026, 1, 2))
+
+    walked, sizes = walk(client, "/api/absences/all", auth_headers(admin), {'limit': 3})
+
+    assert walked == newer + sorted(ids, reverse=True)
+    assert sizes == [3, 3, 3]
+
+
+def test_last_full_page_has_no_cursor(client, db, admin, employee, auth_headers):
+    created_at = datetime(2026, 2, 1, 9)
+    ids = add_absences(db, employee, [(date(2026, 4, day), date(2026, 4, day)) for day in range(1, 5)], created_at=created_at)
+
+    first = client.get("/api/absences/all", params={'limit': 2}, headers=auth_headers(admin))
+    assert CURSOR in first.headers
+    second = client.get(
+        "/api/absences/all", params={'limit': 2, 'cursor': first.headers[CURSOR]}, headers=auth_headers(admin)
+    )
+
+    assert second.status_code == 200
+    assert CURSOR not in second.headers
+    assert [row['id'] for row in first.json() + second.json()] == sorted(ids, reverse=True)
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", "WzFd", "WyJ4IiwgMV0", "WyIyMDI2LTAxLTAxIiwgMSwgMl0"])
+def test_bad_cursor_is_rejected(client, employee, auth_headers, cursor):
+    # Garbage, [1] (too few values), ["x", 1] (not a date), three values
+    response = client.get("/api/absences/my-absences", params={'cursor': cursor}, headers=auth_headers(employee))
+
+    assert response.status_code == 400
+    assert response.json()['detail'] == "Invalid cursor"
+
+
+def test_absences_filtered_by_overlap_and_status(client, db, employee, auth_headers):
+    before, covering, open_ended, after = add_absences(db, employee, [
+        (date(2026, 5, 1), date(2026, 5, 3)),
+        (date(2026, 5, 8), date(2026, 5, 12)),
+        (date(2026, 5, 4), None),
+        (date(2026, 5, 20), date(2026, 5, 21)),
+    ])
+    pending, = add_absences(db, employee, [(date(2026, 5, 9), date(2026, 5, 10))], status='pending')
+    headers = auth_headers(employee)
+
+    response = client.get("/api/absences/my-absences", params={'from': '2026-05-10', 'to': '2026-05-10'}, headers=headers)
+    assert sorted(row['id'] for row in response.json()) == sorted([covering, open_ended, pending])
+
+    response = client.get(
+        "/api/absences/my-absences", params={'from': '2026-05-10', 'to': '2026-05-10', 'status': 'approved'}, headers=headers
+    )
+    assert sorted(row['id'] for row in response.json()) == sorted([covering, open_ended])
@@ -0,0 +1,25 @@
+"""List endpoints stay within their query budgets (see benchmarks/query_budgets.py)."""
+import sys
+from pathlib import Path
+import pytest
+from app.security import create_access_token
+from app.utils.query_stats import assert_query_budget
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "benchmarks"))
+from query_budgets import BUDGETS, EMPLOYEES, budget_params, seed_requests  # noqa: E402
+from run_benchmarks import seed_database  # noqa: E402
+
+
+@pytest.fixture
+def admin_headers(db):
+    admin, user_ids, _, _ = seed_database(db, EMPLOYEES, 1, 1)
+    seed_requests(db, admin, user_ids)
+    return {"Authorization": f"Bearer {create_access_token(data={'sub': str(admin.id)})}"}
+
+
+@pytest.mark.parametrize("path", list(BUDGETS))
+def test_list_endpoint_within_budget(client, admin_headers, path):
+    response = client.get(path, params=budget_params().get(path), headers=admin_headers)
+
+    assert response.status_code == 200
+    assert_query_budget(response, BUDGETS[path])
@@ -0,0 +1,57 @@
+"""The today-status stream's subscriber cap: 503 over the cap, slots released."""
+import asyncio
+import gc
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from app.config import settings
+from app.database import create_async_db_engine
+from app.models import User
+from app.routes.reports import stream_today_status
+from app.utils import presence_board
+
+
+@pytest.fixture
+def admin(db):
+    user = User(username="admin", email="admin@example.com", password_hash="-", role="admin", is_active=True)
+    db.add(user)
+    db.commit()
+    return user
+
+
+def test_stream_cap(engine, admin, monkeypatch):
+    monkeypatch.setattr(settings, "TODAY_STATUS_STREAM_MAX_SUBSCRIBERS", 1)
+    async_engine = create_async_db_engine(str(engine.url))
+    AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False)
+
+    async def open_stream():
+        async with AsyncSessionLocal() as db:
+            return await stream_today_status(db=db, current_user=admin)
+
+    async def scenario():
+        response = await open_stream()
+        assert presence_board.subscriber_count() == 1
+
+        # The slot is taken before the first stream sends anything
+        with pytest.raises(HTTPException) as over_cap:
+            await open_stream()
+        assert over_cap.value.status_code == 503
+
+        # A streaming client that hangs up releases its slot
+        first = await response.body_iterator.__anext__()
+        assert first.startswith("event: snapshot\n")
+        await response.body_iterator.aclose()
+        assert presence_board.subscriber_count() == 0
+
+        # So does a response dropped before its body started
+        response = await open_stream()
+        assert presence_board.subscriber_count() == 1
+        del response
+        gc.collect()
+        assert presence_board.subscriber_count() == 0
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        asyncio.run(async_engine.dispose())
+    assert presence_board.subscriber_count() == 0
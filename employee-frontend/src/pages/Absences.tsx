@@ -1,8 +1,8 @@
 import { useState } from 'react';
-import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query';
+import { useInfiniteQuery, useMutation, useQueryClient } from '@tanstack/react-query';
 import { useNavigate } from 'react-router-dom';
 import { Activity, Palmtree, FileText } from 'lucide-react';
-import { api } from '../utils/api';
+import { api, getPage } from '../utils/api';
 import type { Absence } from '../types/api';
 
 export default function Absences() {
@@ -10,14 +10,14 @@ export default function Absences() {
   const queryClient = useQueryClient();
   const [deletingId, setDeletingId] = useState<number | null>(null);
 
-  // Fetch user's absences
-  const { data: absences = [], isLoading } = useQuery({
-    queryKey: ['absences', 'mine'],
-    queryFn: async () => {
-      const response = await api.get<Absence[]>('/api/absences/my-absences');
-      return response.data;
-    },
+  // Fetch user's absences, one page at a time (latest first)
+  const { data, isLoading, hasNextPage, fetchNextPage, isFetchingNextPage } = useInfiniteQuery({
+    queryKey: ['absences', 'mine', 'list'],
+    queryFn: ({ pageParam }) => getPage<Absence>('/api/absences/my-absences', {}, pageParam),
+    initialPageParam: undefined as string | undefined,
+    getNextPageParam: (lastPage) => lastPage.nextCursor,
   });
+  const absences = data?.pages.flatMap((page) => page.rows) ?? [];
 
   // Delete mutation
   const deleteMutation = useMutation({
@@ -85,6 +85,15 @@ export default function Absences() {
               isDeleting={deletingId === absence.id}
             />
           ))}
+          {hasNextPage && (
+            <button
+              onClick={() => fetchNextPage()}
+              disabled={isFetchingNextPage}
+              className="w-full py-3 bg-neutral-800 hover:bg-neutral-700 disabled:opacity-50 text-white rounded-lg transition"
+            >
+              {isFetchingNextPage ? 'Laden...' : 'Meer laden'}
+            </button>
+          )}
         </div>
       )}
     </div>
@@ -2,7 +2,7 @@ import { useState } from 'react';
 import { useQuery } from '@tanstack/react-query';
 import { useNavigate } from 'react-router-dom';
 import { Palmtree, FileText, Calendar as CalendarIcon, Clock, Sparkles, Activity } from 'lucide-react';
-import { api } from '../utils/api';
+import { getAllPages } from '../utils/api';
 import type { Absence } from '../types/api';
 
 // Helper function to get icon for events
@@ -54,8 +54,9 @@ export default function Calendar() {
   const { data: myAbsences = [] } = useQuery({
     queryKey: ['absences', 'mine', monthRange.start, monthRange.end],
     queryFn: async () => {
-      const response = await api.get<Absence[]>('/api/absences/my-absences');
-      const allAbsences = response.data;
+      const allAbsences = await getAllPages<Absence>('/api/absences/my-absences', {
+        params: { from: monthRange.start, to: monthRange.end, status: 'approved' },
+      });
 
       return allAbsences.filter((absence: Absence) => {
         if (absence.status !== 'approved') return false;
@@ -72,11 +73,12 @@ export default function Calendar() {
 
   // Fetch company events
   const { data: companyEvents = [] } = useQuery({
-    queryKey: ['calendar', 'events'],
+    queryKey: ['calendar', 'events', monthRange.start, monthRange.end],
     queryFn: async () => {
       try {
-        const response = await api.get('/api/calendar/events');
-        return response.data;
+        return await getAllPages('/api/calendar/events', {
+          params: { from: monthRange.start, to: monthRange.end },
+        });
       } catch (error) {
         console.error('Failed to fetch company events:', error);
         return [];
@@ -86,11 +88,12 @@ export default function Calendar() {
 
   // Fetch company holidays
   const { data: companyHolidays = [] } = useQuery({
-    queryKey: ['calendar', 'holidays'],
+    queryKey: ['calendar', 'holidays', monthRange.start, monthRange.end],
     queryFn: async () => {
       try {
-        const response = await api.get('/api/calendar/holidays');
-        return response.data;
+        return await getAllPages('/api/calendar/holidays', {
+          params: { from: monthRange.start, to: monthRange.end },
+        });
       } catch (error) {
         console.error('Failed to fetch company holidays:', error);
         return [];
@@ -1,7 +1,7 @@
 import { useState } from 'react';
 import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query';
 import { Home as HomeIcon, Trash2 } from 'lucide-react';
-import { api } from '../utils/api';
+import { api, getAllPages } from '../utils/api';
 import { useAuth } from '../contexts/AuthContext';
 import type { ClockEvent, ClockInRequest, UpdateClockEventRequest, CreateClockEventRequest, Absence } from '../types/api';
 
@@ -827,8 +827,10 @@ export default function Clock() {
     queryFn: async () => {
       const week = getCurrentWeek();
 
-      const response = await api.get<ClockEvent[]>('/api/clock/my-events');
-      const allEvents = response.data;
+      // Only this week's events
+      const allEvents = await getAllPages<ClockEvent>('/api/clock/my-events', {
+        params: { from: week.start, to: week.end },
+      });
 
 
       // Use string comparison instead of Date objects to avoid timezone issues
@@ -844,12 +846,14 @@ export default function Clock() {
     },
   });
 
-  // Fetch absences
+  // Fetch absences overlapping this week
   const { data: myAbsences = [] } = useQuery({
-    queryKey: ['absences', 'mine'],
+    queryKey: ['absences', 'mine', 'week'],
     queryFn: async () => {
-      const response = await api.get<Absence[]>('/api/absences/my-absences');
-      return response.data;
+      const week = getCurrentWeek();
+      return getAllPages<Absence>('/api/absences/my-absences', {
+        params: { from: week.start, to: week.end, status: 'approved' },
+      });
     },
   });
 
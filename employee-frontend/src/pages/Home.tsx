@@ -1,7 +1,7 @@
 import { useState } from 'react';
 import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query';
 import { Activity, Palmtree, FileText, Clock as ClockIcon, CheckCircle, XCircle, Euro, MapPin, Car, Home as HomeIcon } from 'lucide-react';
-import { api } from '../utils/api';
+import { api, getPage } from '../utils/api';
 import { useAuth } from '../contexts/AuthContext';
 import type { MyBalance, Absence, TeamStatus } from '../types/api';
 
@@ -64,8 +64,10 @@ function ClockStatusCard() {
     queryFn: async () => {
       try {
         const today = new Date().toISOString().split('T')[0];
-        const response = await api.get('/api/absences/my-absences');
-        const absences = response.data;
+        // Approved absences covering today: a single short page
+        const { rows: absences } = await getPage<Absence>('/api/absences/my-absences', {
+          params: { from: today, to: today, status: 'approved' },
+        });
 
         // Find absence covering today
         const absence = absences.find((a: Absence) => {
@@ -342,6 +344,7 @@ function WeekStatsCard() {
         params: {
           start_date: week.start,
           end_date: week.end,
+          detail: 'none',
         },
       });
       return response.data;